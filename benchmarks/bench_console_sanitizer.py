@@ -0,0 +1,103 @@
+"""Micro-benchmark of the console log sanitizer.
+
+Compares the single pass ``_ConsoleSanitizer`` used by ``_LogWrapper`` with
+the previous per-line regex implementation. Run it with::
+
+    python benchmarks/bench_console_sanitizer.py
+"""
+
+from __future__ import annotations
+
+import re
+import timeit
+from typing import Any, Callable
+
+from boardfarm3.lib.boardfarm_pexpect import _ConsoleSanitizer
+
+_CHUNK_SIZE = 2000  # pexpect default maxread
+_REPEAT = 3
+
+_LEGACY_CHARS_TO_REMOVE = re.compile(
+    r"\x1B(?:[@-Z\\-_]|\[[0-?]*["
+    r" -/]*[@-~])|\r|\n|\x1B[78]|\x07|(\x1b\x5b\x48\x1b\x5b\x4a)",
+)
+
+
+def _legacy_apply_backspace(string: str) -> str:
+    while True:
+        char_with_backspace = re.sub(
+            r"(.\x08\x1b\x5b\x4b)|(.\x08\x20\x08)",
+            "",
+            string,
+            count=1,
+        )
+        if len(string) == len(char_with_backspace):
+            return re.sub(r"(\x08\x1b\x5b\x4b)|(\x08\x20\x08)", "", char_with_backspace)
+        string = char_with_backspace
+
+
+class _LegacySanitizer:  # pylint: disable=too-few-public-methods
+    """Per-line regex pipeline previously used by ``_LogWrapper.write``."""
+
+    def __init__(self) -> None:
+        self._lastline = ""
+
+    def feed(self, string: str) -> list[str]:
+        string = self._lastline + string
+        lines = [line for line in string.splitlines(True) if line != "\r"]
+        if lines and not string.endswith("\n"):
+            self._lastline = lines[-1]
+            lines = lines[:-1]
+        else:
+            self._lastline = ""
+        return [
+            _LEGACY_CHARS_TO_REMOVE.sub("", _legacy_apply_backspace(line))
+            .replace("\t", "  ")
+            .rstrip()
+            for line in lines
+        ]
+
+
+def _workloads() -> dict[str, str]:
+    boot_log = "".join(
+        f"[{i:5d}.000000] \x1b[1;32mOK\x1b[0m Started service number {i}\r\n"
+        for i in range(5000)
+    )
+    # wget/tftp style progress bar, redrawn with erase sequences on one line
+    progress = "".join(
+        f"{i:3d}%" + "\x08 \x08" * 4 for i in range(100) for _ in range(20)
+    )
+    # hash marks without any line break, e.g. flashing an image
+    hash_marks = "#" * 200000 + "\r\n"
+    return {
+        "boot log": boot_log,
+        "progress bar": progress + "\r\n",
+        "hash marks": hash_marks,
+    }
+
+
+def _run(sanitizer_class: Callable[[], Any], text: str) -> None:
+    sanitizer = sanitizer_class()
+    for index in range(0, len(text), _CHUNK_SIZE):
+        sanitizer.feed(text[index : index + _CHUNK_SIZE])
+
+
+def main() -> None:
+    """Print the best run time of both implementations for each workload."""
+    print(f"{'workload':<14}{'size':>10}{'legacy [s]':>14}{'single pass [s]':>18}")
+    for name, text in _workloads().items():
+        legacy, single_pass = (
+            min(
+                timeit.repeat(
+                    lambda cls=cls, text=text: _run(cls, text),
+                    number=1,
+                    repeat=_REPEAT,
+                )
+            )
+            for cls in (_LegacySanitizer, _ConsoleSanitizer)
+        )
+        print(f"{name:<14}{len(text):>10}{legacy:>14.4f}{single_pass:>18.4f}")
+
+
+if __name__ == "__main__":
+    main()
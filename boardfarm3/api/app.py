@@ -48,9 +48,12 @@ class ConfigOptions(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
     skip_boot: bool | None = None
+    incremental_boot: bool | None = None
     legacy: bool | None = None
     skip_contingency_checks: bool | None = None
     save_console_logs: str | None = None
+    console_log_format: Literal["text", "store", "both"] | None = None
+    boot_trace: str | None = None
     ignore_devices: str | None = None
     quiet_after: float | None = None
     plugin_args: dict[str, Any] = Field(default_factory=dict)
@@ -148,6 +151,7 @@ def create_app(  # noqa: C901, PLR0915  # pylint: disable=too-many-locals,too-ma
                 # artifact root rather than inside the console-logs archive
                 # member (Task 12 relies on this layout).
                 save_console_logs=str(artifact_dir(session_id) / "console"),
+                boot_trace=str(artifact_dir(session_id)),
             ),
         )
         state["session"] = session
@@ -27,9 +27,12 @@ class RuntimeOptions:
 
     board_name: str
     skip_boot: bool = False
+    incremental_boot: bool = False
     legacy: bool = False
     skip_contingency_checks: bool = False
     save_console_logs: str = ""
+    console_log_format: str = "text"
+    boot_trace: str = ""
     ignore_devices: str = ""
     quiet_after: float = 600.0
     plugin_args: dict[str, Any] = field(default_factory=dict)
@@ -80,8 +83,11 @@ class RuntimeContext:
             board_name=self.options.board_name,
             legacy=self.options.legacy,
             skip_boot=self.options.skip_boot,
+            incremental_boot=self.options.incremental_boot,
             skip_contingency_checks=self.options.skip_contingency_checks,
             save_console_logs=self.options.save_console_logs,
+            console_log_format=self.options.console_log_format,
+            boot_trace=self.options.boot_trace,
             ignore_devices=self.options.ignore_devices,
             inventory_config="",
             env_config="",
@@ -6,7 +6,7 @@ import contextlib
 import logging
 import time
 from functools import cached_property
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, ClassVar
 
 import pexpect
 
@@ -14,6 +14,7 @@ from boardfarm3 import hookimpl
 from boardfarm3.devices.base_devices.boardfarm_device import BoardfarmDevice
 from boardfarm3.devices.rpirdkb_cpe import RPiRDKBCPE, RPiRDKBHW, RPiRDKBSW
 from boardfarm3.exceptions import DeviceBootFailure
+from boardfarm3.lib.boot_scheduler import BootDependencies, BootDependency
 from boardfarm3.lib.connection_factory import connection_factory
 from boardfarm3.templates.acs import ACS
 from boardfarm3.templates.core_router import CoreRouter
@@ -54,7 +55,12 @@ class BananaPiRDKBHW(RPiRDKBHW):
             connection_name=f"{device_name}.console",
             conn_command=self._config["conn_cmd"][0],
             save_console_logs=self._cmdline_args.save_console_logs,
+            console_log_format=getattr(
+                self._cmdline_args, "console_log_format", "text"
+            ),
             shell_prompt=self._shell_prompt,
+            search_window=self._config.get("console_search_window"),
+            buffer_size=self._config.get("console_buffer_size"),
         )
         # Consume the lxc console detach banner if present
         with contextlib.suppress(pexpect.TIMEOUT):
@@ -170,6 +176,15 @@ class BananaPiRDKBSW(RPiRDKBSW):  # pylint: disable=R0904
 class BananaPiRDKBCPE(RPiRDKBCPE, BoardfarmDevice):
     """The BananaPi CPE class."""
 
+    # _prep_device reads the router interface and sets the ACS URL
+    boot_dependencies: ClassVar[BootDependencies] = {
+        "boardfarm_device_boot": (
+            *RPiRDKBCPE.boot_dependencies["boardfarm_device_boot"],
+            BootDependency(CoreRouter, "boardfarm_server_configure"),
+            BootDependency(ACS, "boardfarm_server_configure"),
+        ),
+    }
+
     def __init__(self, config: dict[str, Any], cmdline_args: Namespace) -> None:
         """Initialize BananaPi CPE container.
 
@@ -223,24 +238,17 @@ class BananaPiRDKBCPE(RPiRDKBCPE, BoardfarmDevice):
         if "default" not in console.execute_command("ip -6 route show default"):
             console.execute_command(f"ip -6 route add default via {ipv6_hop}")
 
-        self._sw.dmcli.SPV(
-            param="Device.ManagementServer.EnableCWMP",
-            value="false",
-            type_set="bool",
-        )
-        self._sw.dmcli.SPV(
-            param="Device.ManagementServer.URL",
-            value=acs.config["acs_mib"],  # type: ignore[attr-defined]
-        )
-        self._sw.dmcli.SPV(
-            param="Device.ManagementServer.PeriodicInformInterval",
-            value="10",
-            type_set="uint",
-        )
-        self._sw.dmcli.SPV(
-            param="Device.ManagementServer.EnableCWMP",
-            value="true",
-            type_set="bool",
+        self._sw.dmcli.SPV_batch(
+            [
+                ("Device.ManagementServer.EnableCWMP", "false", "bool"),
+                (
+                    "Device.ManagementServer.URL",
+                    acs.config["acs_mib"],  # type: ignore[attr-defined]
+                    "string",
+                ),
+                ("Device.ManagementServer.PeriodicInformInterval", "10", "uint"),
+                ("Device.ManagementServer.EnableCWMP", "true", "bool"),
+            ]
         )
 
     @hookimpl
@@ -1,13 +1,24 @@
 """Boardfarm base device template."""
 
-from argparse import Namespace
+from __future__ import annotations
 
-from boardfarm3.lib.boardfarm_pexpect import BoardfarmPexpect
+from typing import TYPE_CHECKING, ClassVar
+
+if TYPE_CHECKING:
+    from argparse import Namespace
+
+    from boardfarm3.lib.boardfarm_config import BoardfarmConfig
+    from boardfarm3.lib.boardfarm_pexpect import BoardfarmPexpect
+    from boardfarm3.lib.boot_scheduler import BootDependencies
+    from boardfarm3.lib.device_manager import DeviceManager
 
 
 class BoardfarmDevice:
     """Boardfarm base device which all devices inherit from."""
 
+    # boot stages waiting for some devices only, see boot_scheduler
+    boot_dependencies: ClassVar[BootDependencies] = {}
+
     def __init__(self, config: dict, cmdline_args: Namespace) -> None:
         """Initialize boardfarm base device.
 
@@ -47,3 +58,33 @@ class BoardfarmDevice:
         :returns: interactive consoles of the device
         """
         return {}
+
+    def boot_fingerprint(
+        self,
+        config: BoardfarmConfig,  # noqa: ARG002
+        device_manager: DeviceManager,  # noqa: ARG002
+    ) -> str | None:
+        """Get the fingerprint of the inputs of the boot of the device.
+
+        With --incremental-boot the device is not booted again while the
+        fingerprint of its last successful boot matches, see boot_fingerprint.
+
+        :param config: boardfarm config
+        :type config: BoardfarmConfig
+        :param device_manager: device manager
+        :type device_manager: DeviceManager
+        :returns: fingerprint, None when the device is always booted
+        """
+        return None
+
+    def boot_health_probe(
+        self,
+        device_manager: DeviceManager,  # noqa: ARG002
+    ) -> bool:
+        """Check the device still works as booted, once its skip boot hook ran.
+
+        :param device_manager: device manager
+        :type device_manager: DeviceManager
+        :returns: True if the device does not need to be booted
+        """
+        return True
@@ -5,13 +5,17 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import re
+import shlex
+import subprocess
 import tempfile
 from functools import cached_property
 from ipaddress import IPv4Address, IPv4Interface, IPv6Address, IPv6Interface
 from pathlib import Path
 from time import sleep
+from time import time as epoch_time
 from typing import TYPE_CHECKING, Any, Literal
 
 import jc.parsers.ping
@@ -23,26 +27,79 @@ from boardfarm3.exceptions import (
     BoardfarmException,
     CodeError,
     ConfigurationFailure,
+    DeviceConnectionError,
     NotSupportedError,
     SCPConnectionError,
 )
 from boardfarm3.lib.connection_factory import connection_factory
 from boardfarm3.lib.connections.local_cmd import LocalCmd
+from boardfarm3.lib.connections.ssh_connection import (
+    SSH_MULTIPLEXING_OPTIONS,
+    SSHConnection,
+)
+from boardfarm3.lib.console_pool import ConsolePool
+from boardfarm3.lib.facts_cache import (
+    DATE,
+    HOSTNAME,
+    INTERFACES,
+    PROCESSES,
+    ROUTES,
+    FactsCache,
+    cached_fact,
+    invalidates_facts,
+)
+from boardfarm3.lib.file_transfer import FileTransfer
+from boardfarm3.lib.image_cache import image_cache
+from boardfarm3.lib.link_monitor import wait_for_interface
 from boardfarm3.lib.network_utils import NetworkUtility
 from boardfarm3.lib.networking import HTTPResult, dns_lookup, http_get, is_link_up
 from boardfarm3.lib.networking import start_tcpdump as start_dump
 from boardfarm3.lib.networking import stop_tcpdump as stop_dump
 from boardfarm3.lib.networking import tcpdump_read as read_dump
+from boardfarm3.lib.parsers.ip_json_parser import (
+    IP_JSON_ADDR_COMMAND,
+    is_ip_json_unsupported,
+    parse_ip_json_addr,
+)
 from boardfarm3.lib.regexlib import AllValidIpv6AddressesRegex, LinuxMacFormat
+from boardfarm3.lib.remote_agent import RemoteAgent, install_agent
 from boardfarm3.lib.shell_prompt import DEFAULT_BASH_SHELL_PROMPT_PATTERN
 
 if TYPE_CHECKING:
     from argparse import Namespace
+    from collections.abc import Callable
 
-    from boardfarm3.lib.boardfarm_pexpect import BoardfarmPexpect
+    from boardfarm3.lib.boardfarm_pexpect import BoardfarmPexpect, CommandStream
+    from boardfarm3.lib.dataclass.interface import InterfaceFacts
+    from boardfarm3.lib.device_manager import DeviceManager
     from boardfarm3.lib.multicast import MulticastGroupRecord
 
 _LOGGER = logging.getLogger(__name__)
+_MULTI_SESSION_CONNECTIONS = ("ssh_connection", "authenticated_ssh")
+_MAX_SECONDARY_CONSOLES = 4
+# ip -batch input sent per command, below the 4 KiB line limit of a tty
+_IP_BATCH_SIZE = 3000
+
+
+def _ip_batch_scripts(commands: list[str]) -> list[str]:
+    """Pack ``ip`` commands into as few ``ip -batch`` shell commands as possible.
+
+    :param commands: ``ip`` commands without the leading ``ip``
+    :type commands: list[str]
+    :return: shell commands feeding the commands to ``ip -force -batch``
+    :rtype: list[str]
+    """
+    chunks: list[list[str]] = []
+    size = 0
+    for command in map(shlex.quote, commands):
+        if not chunks or size + len(command) > _IP_BATCH_SIZE:
+            chunks.append([])
+            size = 0
+        chunks[-1].append(command)
+        size += len(command) + 1
+    return [
+        f"printf '%s\\n' {' '.join(chunk)} | ip -force -batch -" for chunk in chunks
+    ]
 
 
 # pylint: disable-next=too-many-instance-attributes,too-many-public-methods
@@ -63,6 +120,13 @@ class LinuxDevice(BoardfarmDevice):
         """
         super().__init__(config, cmdline_args)
         self._console: BoardfarmPexpect = None
+        self._capture_consoles: dict[str, BoardfarmPexpect] = {}
+        # None until the first query tells if ``ip -json`` is available
+        self._ip_json_supported: bool | None = None
+        self.facts_cache = FactsCache()
+        # structured queries go through the helper agent, see get_agent
+        self._use_agent = "rpc-agent" in self._parse_device_suboptions()
+        self._agent: RemoteAgent | None = None
         self._shell_prompt = [DEFAULT_BASH_SHELL_PROMPT_PATTERN]
         self._static_route = ""
         self.dante = False
@@ -104,49 +168,101 @@ class LinuxDevice(BoardfarmDevice):
 
         return parsed_options
 
-    async def _setup_static_routes_async(self) -> None:
-        """Set up static routes for the device.
+    def _get_static_route_commands(self) -> list[str]:
+        """Get the commands which set up the static routes from the inventory.
 
+        :return: ``ip`` commands, without the leading ``ip``
+        :rtype: list[str]
         :raises ValueError: if the syntax is incorrect in inventory
         """
+        commands: list[str] = []
         options = self._parse_device_suboptions()
         for option, opt_val in options.items():
             if option == "static-route":
                 for route_entry in opt_val.split(";"):
                     try:
                         destination, gateway = map(str.strip, route_entry.split("-"))
-                        await self._console.execute_command_async(
-                            f"ip route del {destination}"
-                        )
-                        await self._console.execute_command_async(
-                            f"ip route add {destination} via {gateway}"
-                        )
-                    except pexpect.TIMEOUT:  # noqa: PERF203
-                        _LOGGER.exception("Failed to set up route %s", route_entry)
-                    except TypeError as exc:
+                    except (TypeError, ValueError) as exc:
                         msg = f"Validate the syntax of static-route for {opt_val}."
                         raise ValueError(msg) from exc
+                    commands.append(f"route replace {destination} via {gateway}")
+        return commands
+
+    def _ip_batch(self, commands: list[str]) -> None:
+        """Apply ``ip`` commands, e.g. routes, through ``ip -batch``.
+
+        A failed command does not stop the following ones.
+
+        :param commands: ``ip`` commands without the leading ``ip``
+        :type commands: list[str]
+        :raises ValueError: if any of the commands failed
+        """
+        if self._use_agent:
+            results = [self.get_agent().ip_batch(commands, force=True)]
+        else:
+            results = [self.exec(script) for script in _ip_batch_scripts(commands)]
+        if errors := [
+            result.stdout + result.stderr for result in results if result.returncode
+        ]:
+            msg = f"Failed to apply {commands}: {''.join(errors)}"
+            raise ValueError(msg)
 
+    async def _ip_batch_async(self, commands: list[str]) -> None:
+        """Apply ``ip`` commands, e.g. routes, through ``ip -batch``.
+
+        :param commands: ``ip`` commands without the leading ``ip``
+        :type commands: list[str]
+        :raises ValueError: if any of the commands failed
+        """
+        if self._use_agent:
+            # the agent is blocking, its first use even installs it
+            await asyncio.to_thread(self._ip_batch, commands)
+            return
+        results = [
+            await self.exec_async(script) for script in _ip_batch_scripts(commands)
+        ]
+        if errors := [
+            result.stdout + result.stderr for result in results if result.returncode
+        ]:
+            msg = f"Failed to apply {commands}: {''.join(errors)}"
+            raise ValueError(msg)
+
+    def _has_static_routes(self) -> bool:
+        """Check the static routes from the inventory are set up.
+
+        :return: True if every static route goes via its gateway
+        :rtype: bool
+        """
+        for command in self._get_static_route_commands():
+            _, _, destination, _, gateway = command.split()
+            routes = self.exec(f"ip route show {destination}").stdout
+            if f"via {gateway} " not in f"{routes} ":
+                return False
+        return True
+
+    @invalidates_facts(ROUTES)
+    async def _setup_static_routes_async(self) -> None:
+        """Set up static routes for the device.
+
+        All the routes are applied by a single ``ip -batch``.
+        """
+        if commands := self._get_static_route_commands():
+            try:
+                await self._ip_batch_async(commands)
+            except (ValueError, pexpect.TIMEOUT):
+                _LOGGER.exception("Failed to set up routes %s", commands)
+
+    @invalidates_facts(ROUTES)
     def _setup_static_routes(self) -> None:
         """Set up static routes for the device.
 
-        :raises ValueError: if the syntax is incorrect in inventory
+        All the routes are applied by a single ``ip -batch``.
         """
-        options = self._parse_device_suboptions()
-        for option, opt_val in options.items():
-            if option == "static-route":
-                for route_entry in opt_val.split(";"):
-                    try:
-                        destination, gateway = map(str.strip, route_entry.split("-"))
-                        self._console.execute_command(f"ip route del {destination}")
-                        self._console.execute_command(
-                            f"ip route add {destination} via {gateway}"
-                        )
-                    except pexpect.TIMEOUT:  # noqa: PERF203
-                        _LOGGER.exception("Failed to set up route %s", route_entry)
-                    except TypeError as exc:
-                        msg = f"Validate the syntax of static-route for {opt_val}."
-                        raise ValueError(msg) from exc
+        if commands := self._get_static_route_commands():
+            try:
+                self._ip_batch(commands)
+            except (ValueError, pexpect.TIMEOUT):
+                _LOGGER.exception("Failed to set up routes %s", commands)
 
     @property
     def _ipaddr(self) -> str:
@@ -184,7 +300,7 @@ class LinuxDevice(BoardfarmDevice):
         """
         return self._config.get("password", "bigfoot1")
 
-    @cached_property
+    @property
     def ipv4_addr(self) -> str:
         """Return the IPv4 address on IFACE facing DUT.
 
@@ -193,7 +309,7 @@ class LinuxDevice(BoardfarmDevice):
         """
         return self._get_nw_interface_ipv4_address(self.eth_interface)
 
-    @cached_property
+    @property
     def ipv6_addr(self) -> str:
         """Return the IPv6 address on IFACE facing DUT.
 
@@ -205,9 +321,8 @@ class LinuxDevice(BoardfarmDevice):
         )
 
     def clear_cache(self) -> None:
-        """To clear all the cached properties."""
-        self.__dict__.pop("ipv4_addr", None)
-        self.__dict__.pop("ipv6_addr", None)
+        """To clear all the cached facts of the device."""
+        self.facts_cache.invalidate()
 
     def _connect(self) -> None:
         """Establish connection to the device via SSH."""
@@ -221,12 +336,21 @@ class LinuxDevice(BoardfarmDevice):
                 port=self._port,
                 shell_prompt=self._shell_prompt,
                 save_console_logs=self._cmdline_args.save_console_logs,
+                console_log_format=getattr(
+                    self._cmdline_args, "console_log_format", "text"
+                ),
+                search_window=self._config.get("console_search_window"),
+                buffer_size=self._config.get("console_buffer_size"),
             )
             self._console.login_to_server(password=self._password)
             # This fixes the terminal prompt on long lines
             self._console.execute_command(
                 "stty columns 400; export TERM=xterm",
             )
+            if "framed-exec" in self._parse_device_suboptions():
+                self._console.enable_framed_execution()
+            if self._use_agent:
+                self.get_agent().call("ping")
 
     async def _connect_async(self) -> None:
         """Establish connection to the device via SSH."""
@@ -240,19 +364,143 @@ class LinuxDevice(BoardfarmDevice):
                 port=self._port,
                 shell_prompt=self._shell_prompt,
                 save_console_logs=self._cmdline_args.save_console_logs,
+                console_log_format=getattr(
+                    self._cmdline_args, "console_log_format", "text"
+                ),
+                search_window=self._config.get("console_search_window"),
+                buffer_size=self._config.get("console_buffer_size"),
             )
             await self._console.login_to_server_async(password=self._password)
             # This fixes the terminal prompt on long lines
             await self._console.execute_command_async(
                 "stty columns 400; export TERM=xterm",
             )
+            if "framed-exec" in self._parse_device_suboptions():
+                await self._console.enable_framed_execution_async()
+            if self._use_agent:
+                # the agent is installed and started through blocking calls
+                await asyncio.to_thread(lambda: self.get_agent().call("ping"))
+
+    @cached_property
+    def consoles(self) -> ConsolePool:
+        """Pool of secondary console sessions next to the primary console.
+
+        Sessions are opened on demand, at most ``max_consoles`` from the
+        inventory. Only SSH connections allow more than one session by default.
+
+        :return: console pool of the device
+        :rtype: ConsolePool
+        """
+        default_size = (
+            _MAX_SECONDARY_CONSOLES
+            if self._config.get("connection_type") in _MULTI_SESSION_CONNECTIONS
+            else 0
+        )
+        return ConsolePool(
+            self._open_secondary_console,
+            max_size=self._config.get("max_consoles", default_size),
+        )
+
+    def _open_secondary_console(self, index: int) -> BoardfarmPexpect:
+        console = connection_factory(
+            self._config.get("connection_type"),
+            f"{self.device_name}.console{index}",
+            username=self._username,
+            password=self._password,
+            ip_addr=self._ipaddr,
+            port=self._port,
+            shell_prompt=self._shell_prompt,
+            save_console_logs=self._cmdline_args.save_console_logs,
+            console_log_format=getattr(
+                self._cmdline_args, "console_log_format", "text"
+            ),
+            search_window=self._config.get("console_search_window"),
+            buffer_size=self._config.get("console_buffer_size"),
+        )
+        console.login_to_server(password=self._password)
+        console.execute_command("stty columns 400; export TERM=xterm")
+        return console
+
+    def _acquire_background_console(self) -> BoardfarmPexpect:
+        """Return a secondary session, or the primary console if none is free.
+
+        :return: console to start a background job on
+        :rtype: BoardfarmPexpect
+        """
+        try:
+            return self.consoles.acquire(timeout=0)
+        except DeviceConnectionError:
+            return self._console
+
+    def _release_background_console(self, console: BoardfarmPexpect) -> None:
+        if console is not self._console:
+            self.consoles.release(console)
+
+    def get_agent(self) -> RemoteAgent:
+        """Get the helper agent on the device serving structured JSON-RPC requests.
+
+        The agent is pushed and started on the first call, at connect time with
+        the ``rpc-agent`` device option, which also routes the interface facts
+        and process queries through it. It runs on an SSH exec channel when the
+        console is multiplexed, on a secondary console session otherwise.
+
+        :return: client of the agent
+        :rtype: RemoteAgent
+        :raises NotSupportedError: when the device is not connected, or when
+            there is neither an exec channel nor a secondary console session
+            for the agent
+        """
+        if self._agent is not None:
+            return self._agent
+        if self._console is None:
+            msg = f"{self.device_name}: the agent needs a connected device"
+            raise NotSupportedError(msg)
+        path = install_agent(self.exec)
+        if isinstance(self._console, SSHConnection) and self._console.is_exec_supported:
+            self._agent = RemoteAgent.over_exec_channel(self._console, path)
+            return self._agent
+        try:
+            console = self.consoles.acquire(timeout=0)
+        except DeviceConnectionError as exc:
+            msg = (
+                f"{self.device_name}: the agent needs a multiplexed SSH console"
+                " or a secondary console session"
+            )
+            raise NotSupportedError(msg) from exc
+        self._agent = RemoteAgent.over_console(console, path, self.consoles.release)
+        return self._agent
 
     def _disconnect(self) -> None:
         """Disconnect SSH connection to the server."""
+        if self._agent is not None:
+            self._agent.close()
+            self._agent = None
+        self.__dict__.pop("file_transfer", None)
+        if "consoles" in self.__dict__:
+            self.__dict__.pop("consoles").close()
+            self._capture_consoles.clear()
         if self._console is not None:
             self._console.close()
             self._console = None
 
+    def boot_health_probe(
+        self,
+        device_manager: DeviceManager,  # noqa: ARG002
+    ) -> bool:
+        """Check the console of the device responds, once its skip boot hook ran.
+
+        :param device_manager: device manager
+        :type device_manager: DeviceManager
+        :return: True if the device does not need to be booted
+        :rtype: bool
+        """
+        if self._console is None:
+            return False
+        try:
+            return "BOOT_OK" in self._console.execute_command("echo BOOT_OK", 10)
+        except (pexpect.TIMEOUT, pexpect.EOF):
+            return False
+
     def get_interactive_consoles(self) -> dict[str, BoardfarmPexpect]:
         """Get interactive consoles of the device.
 
@@ -263,6 +511,136 @@ class LinuxDevice(BoardfarmDevice):
             interactive_consoles["console"] = self._console
         return interactive_consoles
 
+    def exec(self, command: str, timeout: int = 30) -> subprocess.CompletedProcess:
+        """Execute a command and return its output and exit code.
+
+        On a multiplexed SSH console the command runs on a separate
+        non-interactive channel and does not touch the console. Other consoles
+        fall back to executing the command on the console, framed when the
+        shell supports it (see enable_framed_execution) or followed by
+        ``echo $?`` otherwise, where stderr is part of stdout.
+
+        :param command: command to execute
+        :type command: str
+        :param timeout: timeout in seconds, defaults to 30
+        :type timeout: int
+        :return: stdout, stderr and exit code of the command
+        :rtype: subprocess.CompletedProcess
+        """
+        if isinstance(self._console, SSHConnection) and self._console.is_exec_supported:
+            return self._console.exec(command, timeout)
+        if self._console.framed_execution:
+            output, exit_code = self._console.execute_framed_command(command, timeout)
+        else:
+            output = self._console.execute_command(command, timeout)
+            exit_code = self._parse_exit_code(
+                self._console.execute_command("echo $?", timeout)
+            )
+        return subprocess.CompletedProcess(command, exit_code, output, "")
+
+    async def exec_async(
+        self, command: str, timeout: int = 30
+    ) -> subprocess.CompletedProcess:
+        """Execute a command and return its output and exit code.
+
+        :param command: command to execute
+        :type command: str
+        :param timeout: timeout in seconds, defaults to 30
+        :type timeout: int
+        :return: stdout, stderr and exit code of the command
+        :rtype: subprocess.CompletedProcess
+        """
+        if isinstance(self._console, SSHConnection) and self._console.is_exec_supported:
+            return await self._console.exec_async(command, timeout)
+        if self._console.framed_execution:
+            output, exit_code = await self._console.execute_framed_command_async(
+                command, timeout
+            )
+        else:
+            output = await self._console.execute_command_async(command, timeout)
+            exit_code = self._parse_exit_code(
+                await self._console.execute_command_async("echo $?", timeout)
+            )
+        return subprocess.CompletedProcess(command, exit_code, output, "")
+
+    def _parse_exit_code(self, output: str) -> int:
+        if match := re.search(r"^(\d+)\s*$", output, re.MULTILINE):
+            return int(match.group(1))
+        msg = f"{self.device_name}: cannot read the exit code from {output!r}"
+        raise BoardfarmException(msg)
+
+    def stream_command(
+        self,
+        command: str,
+        stop: Callable[[str], bool] | None = None,
+        timeout: float | None = -1,
+    ) -> CommandStream:
+        """Execute a command on the console and stream its output lines.
+
+        Suited to long running commands (ping, tcpdump, iperf, logread -f)
+        whose output should be checked while it is produced, see
+        BoardfarmPexpect.stream_command.
+
+        :param command: command to execute
+        :type command: str
+        :param stop: stop the command once it returns True for a line
+        :type stop: Callable[[str], bool] | None
+        :param timeout: time limit of the whole command in seconds, None for no
+            limit. Defaults to -1 (console timeout)
+        :type timeout: float | None
+        :return: iterator over the output lines holding the exit status
+        :rtype: CommandStream
+        """
+        return self._console.stream_command(command, stop, timeout)
+
+    @cached_fact(INTERFACES)
+    def get_interface_facts(self, interface: str) -> InterfaceFacts | None:
+        """Get the addresses, MAC address and MTU of an interface at once.
+
+        The facts come from a single ``ip -json addr`` query. When the device
+        has no JSON capable ``ip`` (e.g. busybox) None is returned and the
+        interface getters fall back to ``ifconfig``.
+
+        :param interface: interface name
+        :type interface: str
+        :return: facts of the interface, None if ``ip -json`` is not available
+        :rtype: InterfaceFacts | None
+        """
+        if self._use_agent:
+            return self.get_agent().interface_facts(interface)
+        if self._ip_json_supported is False:
+            return None
+        return self._interface_facts(
+            self.exec(f"{IP_JSON_ADDR_COMMAND} {interface}"), interface
+        )
+
+    @cached_fact(INTERFACES)
+    async def get_interface_facts_async(self, interface: str) -> InterfaceFacts | None:
+        """Get the addresses, MAC address and MTU of an interface at once.
+
+        :param interface: interface name
+        :type interface: str
+        :return: facts of the interface, None if ``ip -json`` is not available
+        :rtype: InterfaceFacts | None
+        """
+        if self._ip_json_supported is False:
+            return None
+        return self._interface_facts(
+            await self.exec_async(f"{IP_JSON_ADDR_COMMAND} {interface}"), interface
+        )
+
+    def _interface_facts(
+        self, result: subprocess.CompletedProcess, interface: str
+    ) -> InterfaceFacts | None:
+        output = result.stdout or result.stderr
+        if (facts := parse_ip_json_addr(output, interface)) is not None:
+            self._ip_json_supported = True
+        elif is_ip_json_unsupported(result.returncode, output):
+            _LOGGER.debug("%s: ip -json is not supported", self.device_name)
+            self._ip_json_supported = False
+        return facts
+
+    @cached_fact(INTERFACES)
     def _get_nw_interface_ip_address(
         self,
         interface_name: str,
@@ -277,11 +655,14 @@ class LinuxDevice(BoardfarmDevice):
         """
         if not self._console:
             raise NotSupportedError
+        if (facts := self.get_interface_facts(interface_name)) is not None:
+            return [str(ip.ip) for ip in (facts.ipv6 if is_ipv6 else facts.ipv4)]
         prefix = "inet6" if is_ipv6 else "inet"
         ip_regex = prefix + r"\s(?:addr:)?\s*([^\s/]+)"
-        output = self._console.execute_command(f"ifconfig {interface_name}")
+        output = self.exec(f"ifconfig {interface_name}").stdout
         return re.findall(ip_regex, output)
 
+    @cached_fact(INTERFACES)
     async def _get_nw_interface_ip_address_async(
         self,
         interface_name: str,
@@ -293,9 +674,11 @@ class LinuxDevice(BoardfarmDevice):
         :param is_ipv6: is ipv6 address
         :returns: IP address list
         """
+        if (facts := await self.get_interface_facts_async(interface_name)) is not None:
+            return [str(ip.ip) for ip in (facts.ipv6 if is_ipv6 else facts.ipv4)]
         prefix = "inet6" if is_ipv6 else "inet"
         ip_regex = prefix + r"\s(?:addr:)?\s*([^\s/]+)"
-        output = await self._console.execute_command_async(f"ifconfig {interface_name}")
+        output = (await self.exec_async(f"ifconfig {interface_name}")).stdout
         return re.findall(ip_regex, output)
 
     def _get_nw_interface_ipv4_address(self, network_interface: str) -> str:
@@ -371,27 +754,63 @@ class LinuxDevice(BoardfarmDevice):
         :type interface: str
         :return: subnet mask of interface
         :rtype: str
+        :raises ValueError: when the interface has no IPv4 address
         """
+        if (facts := self.get_interface_facts(interface)) is not None:
+            if not facts.ipv4:
+                msg = f"{interface} has no IPv4 address"
+                raise ValueError(msg)
+            return str(facts.ipv4[0].netmask)
         return re.search(
             r"(?:net)?[Mm]ask\s+(\S+)",
-            self._console.execute_command(f"ifconfig {interface}"),
+            self.exec(f"ifconfig {interface}").stdout,
         ).group(1)
 
+    @cached_property
+    def file_transfer(self) -> FileTransfer:
+        """Checksummed and resumable file transfers over SSH exec channels.
+
+        :return: file transfer service of the device
+        :rtype: FileTransfer
+        :raises NotSupportedError: if the console is not a multiplexed SSH
+            connection
+        """
+        if not (
+            isinstance(self._console, SSHConnection) and self._console.is_exec_supported
+        ):
+            msg = f"{self.device_name}: file transfers need a multiplexed SSH console"
+            raise NotSupportedError(msg)
+        return FileTransfer(
+            self.device_name, self._console.exec, self._console.open_exec_channel
+        )
+
     def scp_device_file_to_local(self, local_path: str, source_path: str) -> None:
         """Copy a local file from a server using SCP.
 
+        A multiplexed SSH console streams the file through file_transfer,
+        other consoles fall back to an interactive scp session.
+
         :param local_path: local file path
         :param source_path: source path
         """
+        if isinstance(self._console, SSHConnection) and self._console.is_exec_supported:
+            self.file_transfer.download(source_path, local_path)
+            return
         source_path = f"{self._username}@{self._config.get('ipaddr')}:{source_path}"
         self._scp_local_files(source=source_path, destination=local_path)
 
     def scp_local_file_to_device(self, local_path: str, destination_path: str) -> None:
         """Copy a local file to a server using SCP.
 
+        A multiplexed SSH console streams the file through file_transfer,
+        other consoles fall back to an interactive scp session.
+
         :param local_path: local file path
         :param destination_path: destination path
         """
+        if isinstance(self._console, SSHConnection) and self._console.is_exec_supported:
+            self.file_transfer.upload(local_path, destination_path)
+            return
         destination_path = (
             f"{self._username}@{self._config.get('ipaddr')}:{destination_path}"
         )
@@ -410,6 +829,7 @@ class LinuxDevice(BoardfarmDevice):
             "-o UserKnownHostsFile=/dev/null",
             "-o ServerAliveInterval=60",
             "-o ServerAliveCountMax=5",
+            *SSH_MULTIPLEXING_OPTIONS,
             source,
             destination,
         ]
@@ -426,52 +846,134 @@ class LinuxDevice(BoardfarmDevice):
             [" password:", "\\d+%", pexpect.TIMEOUT, pexpect.EOF],
             timeout=20,
         )
-        if match_index in (2, 3):
+        if match_index == 2:  # noqa: PLR2004
             msg = f"Failed to perform SCP from {source} to {destination}"
             raise SCPConnectionError(
                 msg,
             )
         if match_index == 0:
             session.sendline(self._password)
-        session.expect(pexpect.EOF, timeout=90)
+        if match_index != 3:  # noqa: PLR2004
+            # a multiplexed transfer may complete before any progress is seen
+            session.expect(pexpect.EOF, timeout=90)
         if session.wait() != 0:
             msg = f"Failed to SCP file from {source} to {destination}"
             raise SCPConnectionError(
                 msg,
             )
 
-    def download_file_from_uri(
+    def _remote_sha256(self, path: str) -> str | None:
+        """Get the sha256 digest of a file on the device.
+
+        :param path: file path
+        :type path: str
+        :return: digest of the file, None if it is missing or not readable
+        :rtype: str | None
+        """
+        result = self.exec(f"sha256sum {shlex.quote(path)}", timeout=120)
+        fields = result.stdout.split()
+        return fields[0] if result.returncode == 0 and fields else None
+
+    def _stage_file_from_uri(
         self,
         file_uri: str,
         destination_dir: str,
         internet_access_cmd: str = "",
-    ) -> str:
-        """Download(wget) file from given URI.
+    ) -> tuple[str, str | None]:
+        """Download(wget) a file from given URI unless it is already there.
+
+        The file on the device is compared by checksum with the digest known
+        to the image cache, so an unchanged image costs a single ``sha256sum``
+        instead of a download.
 
         :param file_uri: file uri location
+        :type file_uri: str
         :param destination_dir: destination directory
+        :type destination_dir: str
         :param internet_access_cmd: cmd to access internet
-        :returns: downloaded file name
+        :type internet_access_cmd: str
+        :return: name and sha256 digest (None when unknown) of the file
+        :rtype: tuple[str, str | None]
+        :raises ConfigurationFailure: when file download failed from given URI
+        """
+        return self._stage_file_with_key(
+            file_uri,
+            destination_dir,
+            image_cache().key(file_uri),
+            internet_access_cmd,
+        )
+
+    def _stage_file_with_key(
+        self,
+        file_uri: str,
+        destination_dir: str,
+        cache_key: str | None,
+        internet_access_cmd: str = "",
+    ) -> tuple[str, str | None]:
+        """Download(wget) a file from given URI unless it is already there.
+
+        Same as _stage_file_from_uri with the image cache key already known,
+        which saves a HEAD request on a remote image.
+
+        :param file_uri: file uri location
+        :type file_uri: str
+        :param destination_dir: destination directory
+        :type destination_dir: str
+        :param cache_key: image cache key of the file, None when not cached
+        :type cache_key: str | None
+        :param internet_access_cmd: cmd to access internet
+        :type internet_access_cmd: str
+        :return: name and sha256 digest (None when unknown) of the file
+        :rtype: tuple[str, str | None]
         :raises ConfigurationFailure: when file download failed from given URI
         """
         file_name = file_uri.split("/")[-1]
+        file_path = f"{destination_dir}/{file_name}"
+        digest = (
+            image_cache().lookup(file_uri, cache_key) if cache_key is not None else None
+        )
+        if digest is not None and self._remote_sha256(file_path) == digest:
+            _LOGGER.info("%s: %s is up to date", self.device_name, file_path)
+            return file_name, digest
         if file_uri.startswith("file:///"):
             self.scp_local_file_to_device(
                 file_uri.replace("file://", ""), destination_dir
             )
-        else:
-            if not internet_access_cmd:
-                internet_access_cmd = self._internet_access_cmd
-            file_path = f"{destination_dir}/{file_name}"
-            cmd = (
-                f"{internet_access_cmd} wget {file_uri!r} -O {file_path}"
-                " --tries=5 --timeout=30 --waitretry=5"
-            )
-            output = self._console.execute_command(command=cmd, timeout=180)
-            if " saved [" not in output:
-                msg = f"Failed to download file from {file_uri}"
-                raise ConfigurationFailure(msg)
-        return file_name
+            return file_name, digest
+        if not internet_access_cmd:
+            internet_access_cmd = self._internet_access_cmd
+        cmd = (
+            f"{internet_access_cmd} wget {file_uri!r} -O {file_path}"
+            " --tries=5 --timeout=30 --waitretry=5"
+        )
+        output = self._console.execute_command(command=cmd, timeout=180)
+        if " saved [" not in output:
+            msg = f"Failed to download file from {file_uri}"
+            raise ConfigurationFailure(msg)
+        digest = self._remote_sha256(file_path)
+        if digest is not None and cache_key is not None:
+            image_cache().remember(file_uri, digest, cache_key)
+        return file_name, digest
+
+    def download_file_from_uri(
+        self,
+        file_uri: str,
+        destination_dir: str,
+        internet_access_cmd: str = "",
+    ) -> str:
+        """Download(wget) file from given URI.
+
+        The download is skipped when the file is already on the device, see
+        _stage_file_from_uri.
+
+        :param file_uri: file uri location
+        :param destination_dir: destination directory
+        :param internet_access_cmd: cmd to access internet
+        :returns: downloaded file name
+        """
+        return self._stage_file_from_uri(
+            file_uri, destination_dir, internet_access_cmd
+        )[0]
 
     def curl(
         self,
@@ -517,6 +1019,7 @@ class LinuxDevice(BoardfarmDevice):
             self._console.expect(self._shell_prompt)
         return index in [0, 1, 2]
 
+    @invalidates_facts(INTERFACES, ROUTES)
     def set_link_state(self, interface: str, state: str) -> None:
         """Set interface state.
 
@@ -530,17 +1033,30 @@ class LinuxDevice(BoardfarmDevice):
         self,
         interface: str,
         pattern: str = "BROADCAST,MULTICAST,UP",
+        timeout: float = 0,
     ) -> bool:
         """Check given interface is up or not.
 
+        With a timeout the link events of the interface are monitored until it
+        is up, see link_monitor.wait_for_interface.
+
         :param interface: interface name, defaults to "BROADCAST,MULTICAST,UP"
         :type interface: str
         :param pattern: interface state
         :type pattern: str
+        :param timeout: seconds to wait for the link to come up, defaults to 0
+            (checked once)
+        :type timeout: float
         :return: True if the link is up
         :rtype: bool
         """
-        return is_link_up(self._console, interface, pattern)
+        console = self._console
+        return wait_for_interface(
+            console,
+            interface,
+            lambda: is_link_up(console, interface, pattern),
+            timeout,
+        )
 
     def get_interface_ipv4addr(self, interface: str) -> str:
         """Get ipv4 address of interface.
@@ -582,6 +1098,9 @@ class LinuxDevice(BoardfarmDevice):
         :param interface: interface name
         :return: MAC address of the interface
         """
+        facts = self.get_interface_facts(interface)
+        if facts is not None and facts.mac_address:
+            return facts.mac_address
         self._console.sendline(f"cat /sys/class/net/{interface}/address | \\")
         self._console.sendline("awk '{print \"bft_macaddr : \"$1}'")
         self._console.expect(f"bft_macaddr : {LinuxMacFormat}")
@@ -589,6 +1108,26 @@ class LinuxDevice(BoardfarmDevice):
         self._console.expect(self._shell_prompt)
         return macaddr
 
+    def get_interface_mtu_size(self, interface: str) -> int:
+        """Get the MTU size of the interface in bytes.
+
+        :param interface: name of the interface
+        :type interface: str
+        :return: size of the MTU in bytes
+        :rtype: int
+        :raises ValueError: when ifconfig data is not available
+        """
+        facts = self.get_interface_facts(interface)
+        if facts is not None and facts.mtu is not None:
+            return facts.mtu
+        if ifconfig_data := jc.parse(
+            "ifconfig",
+            self._console.execute_command(f"ifconfig {interface}"),
+        ):
+            return int(ifconfig_data[0]["mtu"])  # type: ignore[index]
+        msg = f"ifconfig {interface} is not available"
+        raise ValueError(msg)
+
     def ping(  # noqa: PLR0913
         self,
         ping_ip: str,
@@ -749,6 +1288,7 @@ class LinuxDevice(BoardfarmDevice):
             self._console.expect(self._shell_prompt)
         return output
 
+    @invalidates_facts(PROCESSES)
     def start_tcpdump(
         self,
         interface: str,
@@ -772,22 +1312,36 @@ class LinuxDevice(BoardfarmDevice):
         :return: console ouput and tcpdump process id
         :rtype: str
         """
-        return start_dump(
-            console=self._console,
-            interface=interface,
-            output_file=output_file,
-            filters=filters,
-            port=port,
-            additional_filters=additional_filters,
-        )
+        console = self._acquire_background_console()
+        try:
+            process_id = start_dump(
+                console=console,
+                interface=interface,
+                output_file=output_file,
+                filters=filters,
+                port=port,
+                additional_filters=additional_filters,
+            )
+        except Exception:
+            self._release_background_console(console)
+            raise
+        self._capture_consoles[process_id] = console
+        return process_id
 
+    @invalidates_facts(PROCESSES)
     def stop_tcpdump(self, process_id: str) -> None:
         """Stop tcpdump capture.
 
+        The capture is stopped on the console session it was started on.
+
         :param process_id: tcpdump process id
         :type process_id: str
         """
-        stop_dump(self._console, process_id=process_id)
+        console = self._capture_consoles.pop(process_id, self._console)
+        try:
+            stop_dump(console, process_id=process_id)
+        finally:
+            self._release_background_console(console)
 
     def read_tcpdump(  # pylint: disable=R0917
         self,
@@ -885,6 +1439,7 @@ class LinuxDevice(BoardfarmDevice):
         self._console.expect(self._shell_prompt, timeout=timeout)
         return self._console.before
 
+    @invalidates_facts(INTERFACES, ROUTES, PROCESSES)
     def release_dhcp(self, interface: str) -> None:
         """Release ipv4 of the interface.
 
@@ -893,6 +1448,7 @@ class LinuxDevice(BoardfarmDevice):
         self._console.sudo_sendline(f"dhclient -r {interface!s}")
         self._console.expect(self._shell_prompt)
 
+    @invalidates_facts(INTERFACES, ROUTES, PROCESSES)
     async def release_dhcp_async(self, interface: str) -> None:
         """Release ipv4 of the interface.
 
@@ -901,6 +1457,7 @@ class LinuxDevice(BoardfarmDevice):
         self._console.sudo_sendline(f"dhclient -r {interface!s}")
         await self._console.expect(self._shell_prompt, async_=True)
 
+    @invalidates_facts(INTERFACES, ROUTES, PROCESSES)
     def renew_dhcp(self, interface: str) -> None:
         """Renew ipv4 of the interface.
 
@@ -914,6 +1471,7 @@ class LinuxDevice(BoardfarmDevice):
             self._console.sendcontrol("c")
             self._console.expect(self._shell_prompt)
 
+    @invalidates_facts(INTERFACES, ROUTES, PROCESSES)
     async def renew_dhcp_async(self, interface: str) -> None:
         """Renew ipv4 of the interface.
 
@@ -931,6 +1489,7 @@ class LinuxDevice(BoardfarmDevice):
             self._console.sendcontrol("c")
             self._console.expect(self._shell_prompt, async_=True)
 
+    @invalidates_facts(INTERFACES, ROUTES, PROCESSES)
     def release_ipv6(self, interface: str, stateless: bool = False) -> None:
         """Release ipv6 of the interface.
 
@@ -941,6 +1500,7 @@ class LinuxDevice(BoardfarmDevice):
         self._console.sudo_sendline(f"dhclient {mode} -r {interface!s}")
         self._console.expect(self._shell_prompt)
 
+    @invalidates_facts(INTERFACES, ROUTES, PROCESSES)
     async def release_ipv6_async(self, interface: str, stateless: bool = False) -> None:
         """Release ipv6 of the interface.
 
@@ -951,6 +1511,7 @@ class LinuxDevice(BoardfarmDevice):
         self._console.sudo_sendline(f"dhclient {mode} -r {interface!s}")
         await self._console.expect(self._shell_prompt, async_=True)
 
+    @invalidates_facts(INTERFACES, ROUTES, PROCESSES)
     def renew_ipv6(self, interface: str, stateless: bool = False) -> None:
         """Renew ipv6 of the interface.
 
@@ -966,6 +1527,7 @@ class LinuxDevice(BoardfarmDevice):
             self._console.sendcontrol("c")
             self._console.expect(self._shell_prompt)
 
+    @invalidates_facts(INTERFACES, ROUTES, PROCESSES)
     async def renew_ipv6_async(self, interface: str, stateless: bool = False) -> None:
         """Renew ipv6 of the interface.
 
@@ -1148,6 +1710,7 @@ class LinuxDevice(BoardfarmDevice):
         """Stop the Dante proxy."""
         self._console.execute_command_async("service danted stop")
 
+    @invalidates_facts(PROCESSES)
     def start_traffic_receiver(
         self,
         traffic_port: int,
@@ -1195,6 +1758,7 @@ class LinuxDevice(BoardfarmDevice):
         msg = "Unable to start iperf server"
         raise CodeError(msg)
 
+    @invalidates_facts(PROCESSES)
     def start_traffic_sender(  # pylint: disable=too-many-arguments , too-many-locals # noqa: PLR0913
         self,
         host: str,
@@ -1281,6 +1845,7 @@ class LinuxDevice(BoardfarmDevice):
         )
         return Path(log_file).read_text(encoding="utf-8")
 
+    @invalidates_facts(PROCESSES)
     def stop_traffic(self, pid: int | None = None) -> bool:
         """Stop the iPerf3 process for a specific PID or killall.
 
@@ -1326,6 +1891,24 @@ class LinuxDevice(BoardfarmDevice):
             return date.group(0)
         return None
 
+    @cached_fact(DATE)
+    def get_date_offset(self) -> float:
+        """Get the offset of the device clock from the local clock.
+
+        :return: seconds the device clock is ahead of the local clock
+        :rtype: float
+        :raises ValueError: when the device date cannot be read
+        """
+        before = epoch_time()
+        output = self.exec("date +%s.%N").stdout
+        after = epoch_time()
+        # busybox may not support %N and print it as is
+        if (match := re.search(r"\d+(?:\.\d+)?", output)) is None:
+            msg = f"Failed to read the device date: {output!r}"
+            raise ValueError(msg)
+        return float(match.group()) - (before + after) / 2
+
+    @invalidates_facts(DATE)
     def set_date(self, opt: str, date_string: str) -> bool:
         """Set the device's date and time.
 
@@ -1377,6 +1960,7 @@ class LinuxDevice(BoardfarmDevice):
             raise CodeError(msg)
         return out
 
+    @invalidates_facts(INTERFACES, ROUTES)
     def set_static_ip(
         self,
         interface: str,
@@ -1402,6 +1986,7 @@ class LinuxDevice(BoardfarmDevice):
             err_msg = f"Running IP: {ip=} is different than expected: {ip_address=}"
             raise CodeError(err_msg)
 
+    @invalidates_facts(INTERFACES, ROUTES)
     def remove_static_ip(self, interface: str) -> None:
         """Remove the static IP assigned to the interface.
 
@@ -1415,6 +2000,7 @@ class LinuxDevice(BoardfarmDevice):
             err_msg = f"IP removal failed: running IP is still {ip}"
             raise CodeError(err_msg)
 
+    @invalidates_facts(ROUTES)
     def del_default_route(self, interface: str | None = None) -> None:
         """Remove the default gateway.
 
@@ -1425,6 +2011,7 @@ class LinuxDevice(BoardfarmDevice):
         interface = f"dev {interface}" if interface else ""
         self._console.execute_command(f"ip route del default {interface}")
 
+    @invalidates_facts(ROUTES)
     def set_default_gw(self, ip_address: IPv4Address, interface: str) -> None:
         """Set given ip address as default gateway address for given interface.
 
@@ -1561,6 +2148,7 @@ class LinuxDevice(BoardfarmDevice):
         self._nw_utility = NetworkUtility(self._console)
         return self._nw_utility
 
+    @cached_fact(HOSTNAME)
     def hostname(self) -> str:
         """Get the hostname of the device.
 
@@ -1569,6 +2157,7 @@ class LinuxDevice(BoardfarmDevice):
         """
         return self._console.execute_command("echo $HOSTNAME")
 
+    @cached_fact(PROCESSES)
     def get_process_id(self, process_name: str) -> list[str] | None:
         """Return the process id to the device.
 
@@ -1577,9 +2166,13 @@ class LinuxDevice(BoardfarmDevice):
         :return: process id if the process exist, else None
         :rtype: list[str] | None
         """
-        pid_output = self._console.execute_command(f"pidof {process_name}").strip()
+        if self._use_agent:
+            processes = self.get_agent().processes(process_name)
+            return [str(process["pid"]) for process in processes] or None
+        pid_output = self.exec(f"pidof {process_name}").stdout.strip()
         return pid_output.split(" ") if pid_output else None
 
+    @invalidates_facts(PROCESSES)
     def kill_process(self, pid: int, signal: int) -> None:
         """Terminate the running process based on the process id.
 
@@ -1654,7 +2247,7 @@ class LinuxDevice(BoardfarmDevice):
         :return: resolv conf info
         :rtype: str
         """
-        resolv_conf = self._console.execute_command("cat /etc/resolv.conf")
+        resolv_conf = self.exec("cat /etc/resolv.conf").stdout
         return "\n".join(
             [
                 namserver_entries
@@ -17,11 +17,13 @@ from boardfarm3.exceptions import (
     ContingencyCheckError,
     NotSupportedError,
 )
+from boardfarm3.lib.boot_fingerprint import fingerprint
 from boardfarm3.lib.utils import retry_on_exception
 from boardfarm3.templates.acs import ACS, GpvInput, GpvResponse, SpvInput
 from boardfarm3.templates.cpe.cpe import CPE
 
 if TYPE_CHECKING:
+    from boardfarm3.lib.boardfarm_config import BoardfarmConfig
     from boardfarm3.lib.boardfarm_pexpect import BoardfarmPexpect
     from boardfarm3.lib.device_manager import DeviceManager
     from boardfarm3.lib.networking import IptablesFirewall
@@ -103,6 +105,24 @@ class GenieACS(LinuxDevice, ACS):
         self._connect()
         self._init_nbi_client()
 
+    def boot_fingerprint(
+        self,
+        config: BoardfarmConfig,  # noqa: ARG002
+        device_manager: DeviceManager,  # noqa: ARG002
+    ) -> str | None:
+        """Get the fingerprint of the config of the ACS.
+
+        Its boot only connects to it, as its skip boot does.
+
+        :param config: boardfarm config
+        :type config: BoardfarmConfig
+        :param device_manager: device manager
+        :type device_manager: DeviceManager
+        :return: fingerprint of the inputs of the boot
+        :rtype: str | None
+        """
+        return fingerprint(type(self).__name__, self.config)
+
     @hookimpl
     def boardfarm_shutdown_device(self) -> None:
         """Boardfarm hook implementation to shutdown ACS device."""
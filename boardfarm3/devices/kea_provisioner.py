@@ -28,6 +28,7 @@ from boardfarm3.exceptions import (
 )
 from boardfarm3.lib.connection_factory import connection_factory
 from boardfarm3.lib.connections.local_cmd import LocalCmd
+from boardfarm3.lib.connections.ssh_connection import SSH_MULTIPLEXING_OPTIONS
 from boardfarm3.lib.networking import IptablesFirewall
 from boardfarm3.lib.networking import start_tcpdump as start_tcp_dump
 from boardfarm3.lib.networking import stop_tcpdump as stop_tcp_dump
@@ -380,6 +381,7 @@ class KeaProvisioner(Provisioner):
             "-o UserKnownHostsFile=/dev/null",
             "-o ServerAliveInterval=60",
             "-o ServerAliveCountMax=5",
+            *SSH_MULTIPLEXING_OPTIONS,
             source,
             destination,
         ]
@@ -395,14 +397,16 @@ class KeaProvisioner(Provisioner):
             [" password:", "\\d+%", pexpect.TIMEOUT, pexpect.EOF],
             timeout=20,
         )
-        if match_index in (2, 3):
+        if match_index == 2:  # noqa: PLR2004
             msg = f"Failed to perform SCP from {source} to {destination}"
             raise SCPConnectionError(
                 msg,
             )
         if match_index == 0:
             session.sendline(_password)
-        session.expect(pexpect.EOF, timeout=90)
+        if match_index != 3:  # noqa: PLR2004
+            # a multiplexed transfer may complete before any progress is seen
+            session.expect(pexpect.EOF, timeout=90)
         if session.wait() != 0:
             msg = f"Failed to SCP file from {source} to {destination}"
             raise SCPConnectionError(
@@ -593,6 +597,11 @@ class KeaProvisioner(Provisioner):
                 port=self._config.get("port", "22"),
                 shell_prompt=self._shell_prompt,
                 save_console_logs=self._cmdline_args.save_console_logs,
+                console_log_format=getattr(
+                    self._cmdline_args, "console_log_format", "text"
+                ),
+                search_window=self._config.get("console_search_window"),
+                buffer_size=self._config.get("console_buffer_size"),
             )
 
     @hookimpl
@@ -7,14 +7,21 @@ import logging
 import re
 from argparse import Namespace
 from ipaddress import AddressValueError, IPv4Address
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, ClassVar
 
-import jc
 import pexpect
 
 from boardfarm3 import hookimpl
 from boardfarm3.devices.base_devices import LinuxDevice
 from boardfarm3.exceptions import BoardfarmException, ContingencyCheckError
+from boardfarm3.lib.boot_scheduler import BootDependencies, BootDependency
+from boardfarm3.lib.facts_cache import (
+    INTERFACES,
+    PROCESSES,
+    ROUTES,
+    cached_fact,
+    invalidates_facts,
+)
 from boardfarm3.lib.multicast import Multicast
 from boardfarm3.lib.networking import IptablesFirewall, NSLookup
 from boardfarm3.lib.utils import get_value_from_dict
@@ -34,6 +41,15 @@ _LOGGER = logging.getLogger(__name__)
 class LinuxLAN(LinuxDevice, LAN):
     """Boardfarm LAN device."""
 
+    boot_dependencies: ClassVar[BootDependencies] = {
+        "boardfarm_attached_device_boot": (
+            BootDependency(CPE, "boardfarm_device_boot"),
+        ),
+        "boardfarm_attached_device_configure": (
+            BootDependency(CPE, "boardfarm_device_configure"),
+        ),
+    }
+
     def __init__(self, config: dict, cmdline_args: Namespace) -> None:
         """Initialize linux LAN device.
 
@@ -216,6 +232,7 @@ class LinuxLAN(LinuxDevice, LAN):
         # TODO: resolve lan gateway address dynamically
         return "192.168.178.1"
 
+    @cached_fact(ROUTES)
     def get_default_gateway(self) -> IPv4Address:
         """Get default gateway from ip route output.
 
@@ -278,6 +295,7 @@ class LinuxLAN(LinuxDevice, LAN):
         self._console.sendline(f"kill $(</run/dhclient{'' if ipv4 else 6}.pid)")
         await self._console.expect(self._shell_prompt, async_=True)
 
+    @invalidates_facts(INTERFACES, ROUTES, PROCESSES)
     def start_ipv4_lan_client(  # noqa: PLR0915
         self,
         wan_gw: str | IPv4Address | None = None,
@@ -383,6 +401,7 @@ class LinuxLAN(LinuxDevice, LAN):
 
         return ipv4
 
+    @invalidates_facts(INTERFACES, ROUTES, PROCESSES)
     async def start_ipv4_lan_client_async(  # noqa: PLR0915
         self,
         wan_gw: str | IPv4Address | None = None,
@@ -492,6 +511,7 @@ class LinuxLAN(LinuxDevice, LAN):
 
         return ipv4
 
+    @invalidates_facts(INTERFACES, ROUTES, PROCESSES)
     def start_ipv6_lan_client(
         self,
         wan_gw: str | IPv4Address | None = None,
@@ -563,6 +583,7 @@ class LinuxLAN(LinuxDevice, LAN):
             )
         return ipv6
 
+    @invalidates_facts(INTERFACES, ROUTES, PROCESSES)
     async def start_ipv6_lan_client_async(
         self,
         wan_gw: str | IPv4Address | None = None,
@@ -892,23 +913,6 @@ class LinuxLAN(LinuxDevice, LAN):
         """
         raise NotImplementedError
 
-    def get_interface_mtu_size(self, interface: str) -> int:
-        """Get the MTU size of the interface in bytes.
-
-        :param interface: name of the interface
-        :type interface: str
-        :return: size of the MTU in bytes
-        :rtype: int
-        :raises ValueError: when ifconfig data is not available
-        """
-        if ifconfig_data := jc.parse(
-            "ifconfig",
-            self._console.execute_command(f"ifconfig {interface}"),
-        ):
-            return ifconfig_data[0]["mtu"]  # type: ignore[index]
-        msg = f"ifconfig {interface} is not available"
-        raise ValueError(msg)
-
     def get_hostname(self) -> str:
         """Get the hostname of the device.
 
@@ -917,11 +921,52 @@ class LinuxLAN(LinuxDevice, LAN):
         """
         return self.hostname()
 
-    def _update_file_entry(self, hosts_data: list) -> None:
-        self._console.sendline("cat > /etc/hosts << EOF")
-        for line in hosts_data:
-            self._console.sendline(line)
-        self._console.sendline("EOF")
+    def _update_hosts_entries(
+        self,
+        add: list[tuple[str, str]] | None = None,
+        remove: list[tuple[str, str]] | None = None,
+    ) -> None:
+        """Add and remove hosts file entries in one write.
+
+        Entries already present are not added again and the file is not
+        written at all when nothing changes. The new file goes through a single
+        heredoc and replaces /etc/hosts with a rename, or is copied over it
+        when /etc/hosts is a bind mount (e.g. in containers).
+
+        :param add: ip address and host name of the entries to add
+        :type add: list[tuple[str, str]] | None
+        :param remove: ip address and host name of the entries to remove
+        :type remove: list[tuple[str, str]] | None
+        """
+        current = self._console.execute_command("cat /etc/hosts").splitlines()
+        remove = remove or []
+        hosts_data = [
+            line
+            for line in current
+            if not any(
+                line.split()[:1] == [ip] and host_name in line.split()[1:]
+                for ip, host_name in remove
+            )
+        ]
+        existing = [line.split() for line in hosts_data]
+        hosts_data.extend(
+            f"{ip}    {host_name}"
+            for ip, host_name in add or []
+            if [ip, host_name] not in existing
+        )
+        if hosts_data == current:
+            return
+        self._console.sendline(
+            "\n".join(
+                [
+                    "cat > /etc/hosts.bf-new << 'EOF'",
+                    *hosts_data,
+                    "EOF",
+                    "mv -f /etc/hosts.bf-new /etc/hosts 2>/dev/null ||"
+                    " { cat /etc/hosts.bf-new > /etc/hosts; rm -f /etc/hosts.bf-new; }",
+                ]
+            )
+        )
         self._console.expect(self._shell_prompt)
 
     def add_hosts_entry(self, ip: str, host_name: str) -> None:
@@ -932,10 +977,7 @@ class LinuxLAN(LinuxDevice, LAN):
         :param host_name: host name to be added
         :type host_name: str
         """
-        hosts = self._console.execute_command("cat /etc/hosts")
-        hosts_data = hosts.splitlines()
-        hosts_data.append(f"{ip}    {host_name}")
-        self._update_file_entry(hosts_data=hosts_data)
+        self._update_hosts_entries(add=[(ip, host_name)])
 
     def delete_hosts_entry(self, host_name: str, ip: str) -> None:
         """Delete entry in hosts file.
@@ -945,13 +987,7 @@ class LinuxLAN(LinuxDevice, LAN):
         :param ip: host ip addr
         :type ip: str
         """
-        hosts = self._console.execute_command("cat /etc/hosts")
-        hosts_data = [
-            line
-            for line in hosts.splitlines()
-            if f"{host_name}{ip}" not in line.replace(" ", "")
-        ]
-        self._update_file_entry(hosts_data=hosts_data)
+        self._update_hosts_entries(remove=[(ip, host_name)])
 
     def flush_arp_cache(self) -> None:
         """Flushes arp cache entries."""
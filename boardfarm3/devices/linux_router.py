@@ -9,6 +9,7 @@ from typing import TYPE_CHECKING
 from boardfarm3 import hookimpl
 from boardfarm3.devices.base_devices import LinuxDevice
 from boardfarm3.exceptions import ConfigurationFailure
+from boardfarm3.lib.facts_cache import ROUTES, invalidates_facts
 from boardfarm3.templates.core_router import CoreRouter
 
 if TYPE_CHECKING:
@@ -79,6 +80,7 @@ class LinuxRouter(LinuxDevice, CoreRouter):
         _LOGGER.info("Shutdown %s(%s) device", self.device_name, self.device_type)
         self._disconnect()
 
+    @invalidates_facts(ROUTES)
     def add_route(
         self,
         destination: str,
@@ -94,11 +96,15 @@ class LinuxRouter(LinuxDevice, CoreRouter):
         :param gw_interface: exit interface name, or None to omit
         :type gw_interface: str | None
         """
-        cmd = f"ip route add {destination} via {hop}"
+        cmd = f"route add {destination} via {hop}"
         if gw_interface:
             cmd += f" dev {gw_interface}"
-        self._console.execute_command(cmd)
+        try:
+            self._ip_batch([cmd])
+        except ValueError:
+            _LOGGER.warning("Failed to add route to %s via %s", destination, hop)
 
+    @invalidates_facts(ROUTES)
     def delete_route(self, destination: str) -> None:
         """Delete a route to a destination.
 
@@ -8,13 +8,18 @@ import re
 import string
 from argparse import Namespace
 from ipaddress import IPv4Interface, IPv6Interface
+from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
 import jc
+import pexpect
 
 from boardfarm3 import hookimpl
 from boardfarm3.devices.base_devices import LinuxDevice
 from boardfarm3.exceptions import ContingencyCheckError
+from boardfarm3.lib.boot_fingerprint import fingerprint
+from boardfarm3.lib.facts_cache import ROUTES, invalidates_facts
+from boardfarm3.lib.image_cache import image_cache
 from boardfarm3.lib.multicast import Multicast
 from boardfarm3.lib.networking import IptablesFirewall, NSLookup
 from boardfarm3.lib.regexlib import AllValidIpv6AddressesRegex
@@ -26,6 +31,7 @@ from boardfarm3.templates.wan import WAN
 if TYPE_CHECKING:
     from collections.abc import Iterator
 
+    from boardfarm3.lib.boardfarm_config import BoardfarmConfig
     from boardfarm3.lib.boardfarm_pexpect import BoardfarmPexpect
     from boardfarm3.lib.device_manager import DeviceManager
 
@@ -104,7 +110,7 @@ class LinuxWAN(LinuxDevice, WAN):  # pylint: disable=R0902
 
         self._setup_static_routes()
 
-    def _configure_dns(self, device_manager: DeviceManager) -> None:
+    def _dns_hosts(self, device_manager: DeviceManager) -> list[str]:
         dns_hosts = []
         for device in device_manager.get_devices_by_type(LinuxDevice).values():
             device_suboptions = device._parse_device_suboptions()  # noqa: SLF001 pylint: disable=W0212
@@ -119,7 +125,10 @@ class LinuxWAN(LinuxDevice, WAN):  # pylint: disable=R0902
                 ip6 = IPv6Interface(ip6_addr).ip
                 dns_hosts.append(f"{ip6}    {name}.boardfarm.com")
                 dns_hosts.append(f"{ip6}    {name}-ipv6.boardfarm.com")
-        if dns_hosts:
+        return dns_hosts
+
+    def _configure_dns(self, device_manager: DeviceManager) -> None:
+        if dns_hosts := self._dns_hosts(device_manager):
             self._console.sendline("cat > /etc/dnsmasq.hosts << EOF")
             self._console.sendline("\n".join(dns_hosts))
             self._console.sendline("EOF")
@@ -140,12 +149,18 @@ class LinuxWAN(LinuxDevice, WAN):  # pylint: disable=R0902
             device_manager
         )  # to be revisited when docker factory is implemented
 
+    def _restore_options(self) -> None:
+        # what _setup_wan keeps on the python side, for a skipped boot
+        if "internet-access-on-mgmt" in self._parse_device_suboptions():
+            self._internet_access_cmd = "mgmt"
+
     @hookimpl
     def boardfarm_skip_boot(self) -> None:
         """Boardfarm hook implementation to initialize WAN device."""
         _LOGGER.info("Booting %s(%s) device", self.device_name, self.device_type)
         self._connect()
         self._add_multicast_to_linux_wan()
+        self._restore_options()
 
     @hookimpl
     async def boardfarm_skip_boot_async(self) -> None:
@@ -153,6 +168,51 @@ class LinuxWAN(LinuxDevice, WAN):  # pylint: disable=R0902
         _LOGGER.info("Booting %s(%s) device", self.device_name, self.device_type)
         await self._connect_async()
         self._add_multicast_to_linux_wan()
+        self._restore_options()
+
+    def boot_fingerprint(
+        self,
+        config: BoardfarmConfig,  # noqa: ARG002
+        device_manager: DeviceManager,
+    ) -> str | None:
+        """Get the fingerprint of the config and the DNS entries of the WAN.
+
+        :param config: boardfarm config
+        :type config: BoardfarmConfig
+        :param device_manager: device manager
+        :type device_manager: DeviceManager
+        :return: fingerprint of the inputs of the boot
+        :rtype: str | None
+        """
+        return fingerprint(
+            type(self).__name__, self.config, self._dns_hosts(device_manager)
+        )
+
+    def boot_health_probe(self, device_manager: DeviceManager) -> bool:
+        """Check the DUT interface, static routes and DNS entries are in place.
+
+        The DNS entries are only checked on the DNS server, with dnsmasq
+        running.
+
+        :param device_manager: device manager
+        :type device_manager: DeviceManager
+        :return: True if the device does not need to be booted
+        :rtype: bool
+        """
+        if not super().boot_health_probe(device_manager):
+            return False
+        try:
+            if not (self.is_link_up(self.iface_dut) and self._has_static_routes()):
+                return False
+            if "dns-server" not in self._parse_device_suboptions():
+                return True
+            dns_hosts = self._dns_hosts(device_manager)
+            return bool(self.get_process_id("dnsmasq")) and (
+                not dns_hosts
+                or self.exec("cat /etc/dnsmasq.hosts").stdout.splitlines() == dns_hosts
+            )
+        except (pexpect.TIMEOUT, pexpect.EOF):
+            return False
 
     @hookimpl
     def boardfarm_shutdown_device(self) -> None:
@@ -327,24 +387,48 @@ class LinuxWAN(LinuxDevice, WAN):  # pylint: disable=R0902
     def copy_local_file_to_tftpboot(self, local_file_path: str) -> None:
         """SCP local file to tftpboot directory.
 
+        The copy is skipped when the file is already in tftpboot.
+
         :param local_file_path: local file path
         :type local_file_path: str
         """
-        self.scp_local_file_to_device(local_file_path, self._tftpboot_dir)
+        self._stage_file_from_uri(
+            f"file://{Path(local_file_path).absolute()}", self._tftpboot_dir
+        )
 
     def download_image_to_tftpboot(self, image_uri: str) -> str:
         """Download image from URL to tftpboot directory.
 
+        The image is named after its digest, so an image already in tftpboot
+        is found with a single checksum instead of being downloaded again.
+
         :param image_uri: image file URI
         :type image_uri: str
         :returns: name of the image in tftpboot
         :rtype: str
         """
-        filename = "".join(
-            random.choice(string.ascii_lowercase)  # noqa: S311
-            for _ in range(10)
+        cache_key = image_cache().key(image_uri)
+        digest = (
+            image_cache().lookup(image_uri, cache_key)
+            if cache_key is not None
+            else None
+        )
+        if digest is not None and (
+            self._remote_sha256(f"{self._tftpboot_dir}/{digest[:10]}") == digest
+        ):
+            _LOGGER.info("%s: %s is already in tftpboot", self.device_name, image_uri)
+            return digest[:10]
+        tempfile, digest = self._stage_file_with_key(
+            image_uri, self._tftpboot_dir, cache_key
+        )
+        filename = (
+            digest[:10]
+            if digest is not None
+            else "".join(
+                random.choice(string.ascii_lowercase)  # noqa: S311
+                for _ in range(10)
+            )
         )
-        tempfile = self.download_file_from_uri(image_uri, self._tftpboot_dir)
         self._console.execute_command(
             f"mv {self._tftpboot_dir}/{tempfile} {self._tftpboot_dir}/{filename}",
         )
@@ -450,23 +534,7 @@ class LinuxWAN(LinuxDevice, WAN):  # pylint: disable=R0902
             self._shell_prompt,
         )
 
-    def get_interface_mtu_size(self, interface: str) -> int:
-        """Get the MTU size of the interface in bytes.
-
-        :param interface: name of the interface
-        :type interface: str
-        :return: size of the MTU in bytes
-        :rtype: int
-        :raises ValueError: when ifconfig data is not available
-        """
-        if ifconfig_data := jc.parse(
-            "ifconfig",
-            self._console.execute_command(f"ifconfig {interface}"),
-        ):
-            return int(ifconfig_data[0]["mtu"])  # type: ignore[index]
-        msg = f"ifconfig {interface} is not available"
-        raise ValueError(msg)
-
+    @invalidates_facts(ROUTES)
     def add_route(self, destination: str, gw_interface: str) -> None:
         """Add a route to a destination via a specific gateway interface.
 
@@ -481,22 +549,22 @@ class LinuxWAN(LinuxDevice, WAN):  # pylint: disable=R0902
         :raises ValueError: if method was unable to add route
         """
         gw_ipaddress = self.get_interface_ipv4addr(interface=gw_interface)
-        self._console.execute_command(
-            f"ip route add {destination} via {gw_ipaddress} dev {gw_interface}",
-        )
-        if self._console.execute_command("echo $?").strip() != "0":
-            _LOGGER.error("Failed to add route to %s via %s", destination, gw_ipaddress)
-            msg = f"Failed to add route to {destination}"
-            raise ValueError(msg)
+        try:
+            self._ip_batch(
+                [f"route add {destination} via {gw_ipaddress} dev {gw_interface}"]
+            )
+        except ValueError as exc:
+            msg = f"Failed to add route to {destination} via {gw_ipaddress}"
+            raise ValueError(msg) from exc
 
+    @invalidates_facts(ROUTES)
     def delete_route(self, destination: str) -> None:
         """Delete a route to a destination.
 
         :param destination: ip address of the destination
         :type destination: str
         """
-        self._console.execute_command("sync")
-        self._console.execute_command(f"ip route del {destination}")
+        self._console.execute_command(f"sync; ip route del {destination}")
 
     def get_hostname(self) -> str:
         """Get the hostname of the device.
@@ -8,9 +8,8 @@ import logging
 import re
 from argparse import Namespace
 from ipaddress import AddressValueError, IPv4Address, IPv4Interface, IPv4Network
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, ClassVar
 
-import jc
 import pexpect
 
 from boardfarm3 import hookimpl
@@ -18,6 +17,14 @@ from boardfarm3.devices.base_devices import LinuxDevice
 from boardfarm3.exceptions import WifiError
 from boardfarm3.lib.boardfarm_config import BoardfarmConfig
 from boardfarm3.lib.boardfarm_pexpect import BoardfarmPexpect
+from boardfarm3.lib.boot_scheduler import BootDependencies, BootDependency
+from boardfarm3.lib.facts_cache import (
+    INTERFACES,
+    PROCESSES,
+    ROUTES,
+    cached_fact,
+    invalidates_facts,
+)
 from boardfarm3.lib.multicast import Multicast
 from boardfarm3.templates.cpe import CPE
 from boardfarm3.templates.wlan import WLAN
@@ -32,6 +39,15 @@ _LOGGER = logging.getLogger(__name__)
 class LinuxWLAN(LinuxDevice, WLAN):  # pylint: disable=too-many-public-methods
     """Boardfarm WLAN device."""
 
+    boot_dependencies: ClassVar[BootDependencies] = {
+        "boardfarm_attached_device_boot": (
+            BootDependency(CPE, "boardfarm_device_boot"),
+        ),
+        "boardfarm_attached_device_configure": (
+            BootDependency(CPE, "boardfarm_device_configure"),
+        ),
+    }
+
     _wlan_interface = "wlan1"
 
     def __init__(self, config: dict, cmdline_args: Namespace) -> None:
@@ -228,6 +244,7 @@ class LinuxWLAN(LinuxDevice, WLAN):  # pylint: disable=too-many-public-methods
         """DHCP release of the wifi interface."""
         self.release_dhcp(self.iface_dut)
 
+    @invalidates_facts(INTERFACES, ROUTES, PROCESSES)
     def start_ipv4_wlan_client(self) -> bool:
         """Restart ipv4 dhclient to obtain an IP.
 
@@ -251,6 +268,7 @@ class LinuxWLAN(LinuxDevice, WLAN):  # pylint: disable=too-many-public-methods
             self._console.execute_command("killall dhclient")
             return False
 
+    @invalidates_facts(INTERFACES, ROUTES, PROCESSES)
     def start_ipv6_wlan_client(self) -> None:
         """Restart ipv6 dhclient to obtain IP."""
         # flush default ipv6 route
@@ -455,22 +473,6 @@ class LinuxWLAN(LinuxDevice, WLAN):  # pylint: disable=too-many-public-methods
             f"sysctl net.ipv6.conf.{self.iface_dut}.disable_ipv6=1"
         )
 
-    def get_interface_mtu_size(self, interface: str) -> int:
-        """Get the MTU size of the interface in bytes.
-
-        :param interface: name of the interface
-        :type interface: str
-        :return: size of the MTU in bytes
-        :rtype: int
-        :raises ValueError: when ifconfig data is not available
-        """
-        if ifconfig_data := jc.parse(
-            "ifconfig",
-            self._console.execute_command(f"ifconfig {interface}"),
-        ):
-            return ifconfig_data[0]["mtu"]  # type: ignore
-        raise ValueError(f"ifconfig {interface} is not available")
-
     def enable_monitor_mode(self) -> None:
         """Enable monitor mode on WLAN interface.
 
@@ -508,6 +510,7 @@ class LinuxWLAN(LinuxDevice, WLAN):  # pylint: disable=too-many-public-methods
         """
         return self.hostname()
 
+    @cached_fact(ROUTES)
     def get_default_gateway(self) -> IPv4Address:
         """Get default gateway from ip route output.
 
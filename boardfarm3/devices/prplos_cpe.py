@@ -7,9 +7,7 @@ import re
 from functools import cached_property
 from ipaddress import AddressValueError, IPv4Address
 from time import sleep
-from typing import TYPE_CHECKING, Any
-
-import jc
+from typing import TYPE_CHECKING, Any, ClassVar
 
 from boardfarm3 import hookimpl
 from boardfarm3.devices.base_devices.boardfarm_device import BoardfarmDevice
@@ -18,12 +16,15 @@ from boardfarm3.exceptions import (
     DeviceBootFailure,
     NotSupportedError,
 )
+from boardfarm3.lib.boot_scheduler import BootDependencies, BootDependency
 from boardfarm3.lib.connection_factory import connection_factory
 from boardfarm3.lib.cpe_sw import CPESwLibraries
+from boardfarm3.lib.link_monitor import wait_for_interface
 from boardfarm3.lib.utils import retry
 from boardfarm3.templates.acs import ACS
 from boardfarm3.templates.cpe import CPE, CPEHW
 from boardfarm3.templates.provisioner import Provisioner
+from boardfarm3.templates.wan import WAN
 
 if TYPE_CHECKING:
     from argparse import Namespace
@@ -123,7 +124,12 @@ class PrplOSx86HW(CPEHW):
             connection_name=f"{device_name}.console",
             conn_command=self._config["conn_cmd"][0],
             save_console_logs=self._cmdline_args.save_console_logs,
+            console_log_format=getattr(
+                self._cmdline_args, "console_log_format", "text"
+            ),
             shell_prompt=self._shell_prompt,
+            search_window=self._config.get("console_search_window"),
+            buffer_size=self._config.get("console_buffer_size"),
         )
         self._console.login_to_server()
 
@@ -188,11 +194,12 @@ class PrplOSx86HW(CPEHW):
 
         :raises DeviceBootFailure: if CPE is unable to bring up WAN interface
         """
-        for _ in range(20):
-            if self.wan_iface in self._console.execute_command("ip a"):
-                break
-            sleep(5)
-        else:
+        if not wait_for_interface(
+            self._console,
+            self.wan_iface,
+            lambda: self.wan_iface in self._console.execute_command("ip a"),
+            timeout=100,
+        ):
             msg = f"CPE failed to bring up WAN interface: {self.wan_iface}"
             raise DeviceBootFailure(msg)
 
@@ -375,10 +382,13 @@ class PrplOSSW(CPESwLibraries):  # pylint: disable=R0904
 
         :raises DeviceBootFailure: if board is not online
         """
-        for _ in range(20):
-            if self.is_online():
-                return
-            sleep(20)
+        if wait_for_interface(
+            self._get_console("networking"),
+            self.erouter_iface,
+            self.is_online,
+            timeout=400,
+        ):
+            return
         msg = "Board not online"
         raise DeviceBootFailure(msg)
 
@@ -428,23 +438,6 @@ class PrplOSSW(CPESwLibraries):  # pylint: disable=R0904
         """
         raise NotImplementedError
 
-    def get_interface_mtu_size(self, interface: str) -> int:
-        """Get the MTU size of the interface in bytes.
-
-        :param interface: name of the interface
-        :type interface: str
-        :return: size of the MTU in bytes
-        :rtype: int
-        :raises ValueError: when ifconfig data is not available
-        """
-        if ifconfig_data := jc.parse(
-            "ifconfig",
-            self._get_console("default_shell").execute_command(f"ifconfig {interface}"),
-        ):
-            return ifconfig_data[0]["mtu"]  # type: ignore[index]
-        msg = f"ifconfig {interface} is not available"
-        raise ValueError(msg)
-
     def dns_entry(self, device_name: str, mode: str | None = None) -> str:
         """Get the dns entry for given device and mode.
 
@@ -463,6 +456,13 @@ class PrplOSSW(CPESwLibraries):  # pylint: disable=R0904
 class PrplDockerCPE(CPE, BoardfarmDevice):
     """PrplOS device class for a docker container."""
 
+    boot_dependencies: ClassVar[BootDependencies] = {
+        "boardfarm_device_boot": (
+            BootDependency(Provisioner, "boardfarm_server_configure"),
+            BootDependency(WAN, "boardfarm_server_configure"),
+        ),
+    }
+
     def __init__(self, config: dict[str, Any], cmdline_args: Namespace) -> None:
         """Initialize PrplOS CPE container.
 
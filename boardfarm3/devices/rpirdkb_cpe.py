@@ -5,10 +5,8 @@ from __future__ import annotations
 import logging
 from functools import cached_property
 from ipaddress import AddressValueError, IPv4Address
-from time import sleep
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, ClassVar
 
-import jc
 import pexpect
 
 from boardfarm3 import hookimpl
@@ -19,13 +17,16 @@ from boardfarm3.exceptions import (
     DeviceBootFailure,
     NotSupportedError,
 )
+from boardfarm3.lib.boot_scheduler import BootDependencies, BootDependency
 from boardfarm3.lib.connection_factory import connection_factory
 from boardfarm3.lib.cpe_sw import CPESwLibraries
+from boardfarm3.lib.link_monitor import wait_for_interface
 from boardfarm3.lib.power import get_pdu
 from boardfarm3.lib.utils import retry_on_exception
 from boardfarm3.templates.acs import ACS
 from boardfarm3.templates.cpe import CPE, CPEHW
 from boardfarm3.templates.provisioner import Provisioner
+from boardfarm3.templates.wan import WAN
 
 if TYPE_CHECKING:
     from argparse import Namespace
@@ -133,7 +134,12 @@ class RPiRDKBHW(CPEHW):
             connection_name=f"{device_name}.console",
             conn_command=self._config["conn_cmd"][0],
             save_console_logs=self._cmdline_args.save_console_logs,
+            console_log_format=getattr(
+                self._cmdline_args, "console_log_format", "text"
+            ),
             shell_prompt=self._shell_prompt,
+            search_window=self._config.get("console_search_window"),
+            buffer_size=self._config.get("console_buffer_size"),
         )
         self._console.login_to_server()
         try:
@@ -207,11 +213,12 @@ class RPiRDKBHW(CPEHW):
 
         :raises DeviceBootFailure: if CPE is unable to bring up WAN interface
         """
-        for _ in range(20):
-            if self.wan_iface in self._console.execute_command("ip a"):
-                break
-            sleep(5)
-        else:
+        if not wait_for_interface(
+            self._console,
+            self.wan_iface,
+            lambda: self.wan_iface in self._console.execute_command("ip a"),
+            timeout=100,
+        ):
             msg = f"CPE failed to bring up WAN interface: {self.wan_iface}"
             raise DeviceBootFailure(msg)
 
@@ -411,10 +418,13 @@ class RPiRDKBSW(CPESwLibraries):  # pylint: disable=R0904
         :raises DeviceBootFailure: if board is not online
         """
         self._set_up_terminal()
-        for _ in range(20):
-            if retry_on_exception(self.is_online, ()):
-                return
-            sleep(20)
+        if wait_for_interface(
+            self._get_console("networking"),
+            self.erouter_iface,
+            lambda: retry_on_exception(self.is_online, ()),
+            timeout=400,
+        ):
+            return
         msg = "Board not online"
         raise DeviceBootFailure(msg)
 
@@ -427,20 +437,15 @@ class RPiRDKBSW(CPESwLibraries):  # pylint: disable=R0904
         :type url: str
         """
         retry_on_exception(
-            self.dmcli.SPV,
-            ("Device.ManagementServer.URL", url),
-        )
-        retry_on_exception(
-            self.dmcli.SPV,
-            ("Device.ManagementServer.PeriodicInformInterval", "10", "uint"),
-        )
-        retry_on_exception(
-            self.dmcli.SPV,
-            ("Device.ManagementServer.EnableCWMP", "false", "bool"),
-        )
-        retry_on_exception(
-            self.dmcli.SPV,
-            ("Device.ManagementServer.EnableCWMP", "true", "bool"),
+            self.dmcli.SPV_batch,
+            (
+                [
+                    ("Device.ManagementServer.URL", url, "string"),
+                    ("Device.ManagementServer.PeriodicInformInterval", "10", "uint"),
+                    ("Device.ManagementServer.EnableCWMP", "false", "bool"),
+                    ("Device.ManagementServer.EnableCWMP", "true", "bool"),
+                ],
+            ),
         )
         if "7547" not in url:  # Not GenieACS, a bit dirty, revisit
             self._use_oui = False
@@ -460,23 +465,6 @@ class RPiRDKBSW(CPESwLibraries):  # pylint: disable=R0904
         """
         raise NotImplementedError
 
-    def get_interface_mtu_size(self, interface: str) -> int:
-        """Get the MTU size of the interface in bytes.
-
-        :param interface: name of the interface
-        :type interface: str
-        :return: size of the MTU in bytes
-        :rtype: int
-        :raises ValueError: when ifconfig data is not available
-        """
-        if ifconfig_data := jc.parse(
-            "ifconfig",
-            self._console.execute_command(f"ifconfig {interface}"),
-        ):
-            return ifconfig_data[0]["mtu"]  # type: ignore[index]
-        msg = f"ifconfig {interface} is not available"
-        raise ValueError(msg)
-
     def dns_entry(self, device_name: str, mode: str | None = None) -> str:
         """Get the dns entry for given device and mode.
 
@@ -495,6 +483,13 @@ class RPiRDKBSW(CPESwLibraries):  # pylint: disable=R0904
 class RPiRDKBCPE(CPE, BoardfarmDevice):
     """RPiRDKB device class for an RPi4 RDKB device ."""
 
+    boot_dependencies: ClassVar[BootDependencies] = {
+        "boardfarm_device_boot": (
+            BootDependency(Provisioner, "boardfarm_server_configure"),
+            BootDependency(WAN, "boardfarm_server_configure"),
+        ),
+    }
+
     def __init__(self, config: dict[str, Any], cmdline_args: Namespace) -> None:
         """Initialize RPiRDKB CPE container.
 
@@ -559,11 +554,11 @@ class RPiRDKBCPE(CPE, BoardfarmDevice):
         self._sw = RPiRDKBSW(self._hw)
         self.hw.power_cycle()
         self.hw.wait_for_hw_boot()
-        # let the console settle
         if self.config.get("software") and self.config.get("software").get(
             "factory_reset"
         ):
-            sleep(60)
+            # let the console settle
+            self.hw.get_console("console").wait_until_quiet(idle_time=10, timeout=60)
             self.sw.factory_reset()
         self.sw.wait_device_online()
 
@@ -92,3 +92,7 @@ class CodeError(BoardfarmException):
     This exception is only meant for custom assert
     clause used inside libraries.
     """
+
+
+class RemoteAgentError(BoardfarmException):
+    """Raise this when the helper agent on a device fails a request."""
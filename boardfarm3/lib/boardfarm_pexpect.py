@@ -2,89 +2,534 @@
 
 from __future__ import annotations
 
+import codecs
+import functools
+import inspect
 import os
 import re
+import struct
+import tempfile
+import time
 from abc import ABCMeta, abstractmethod
-from logging import Formatter, Logger, getLogger
+from functools import partial
+from io import StringIO
+from logging import DEBUG, Formatter, Logger, getLogger
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
-from typing import Any
+from queue import Full, Queue
+from threading import Lock, Thread
+from typing import IO, TYPE_CHECKING, Any, Self, TypeVar
+from uuid import uuid4
 
 import pexpect
+from pexpect._async import expect_async  # private, pexpect is pinned
+from pexpect.expect import Expecter, searcher_re, searcher_string
 
+from boardfarm3.lib.boot_trace import command_span
+from boardfarm3.lib.console_log_store import ConsoleLogStoreHandler
 from boardfarm3.lib.utils import disable_logs
 
+if TYPE_CHECKING:
+    from collections.abc import Callable, Generator
 
-def _apply_backspace(string: str) -> str:
-    while True:
-        # if you find a character followed by a backspace, remove both
-        char_with_backspace = re.sub(
-            r"(.\x08\x1b\x5b\x4b)|(.\x08\x20\x08)",
-            "",
-            string,
-            count=1,
-        )
-        if len(string) == len(char_with_backspace):
-            # now remove any backspaces from beginning of the string
-            return re.sub(r"(\x08\x1b\x5b\x4b)|(\x08\x20\x08)", "", char_with_backspace)
-        string = char_with_backspace
+T = TypeVar("T")
+
+_LOGGER = getLogger(__name__)
+_FRAME_MARKER = "BFCMD"
+
+_LOG_QUEUE_SIZE = 4096
+_LOG_OVERFLOW_POLICIES = ("block", "drop", "spill")
+CONSOLE_LOG_FORMATS = ("text", "store", "both")
+_ANY_OUTPUT = re.compile(r".+", re.DOTALL)
+# timestamp and size of a chunk spilled to disk
+_SPILL_HEADER = struct.Struct("!dI")
+
+# characters which need the state machine, everything else is copied in runs
+_SPECIAL_CHARS = re.compile("[\x07\x08\n\x0b\x0c\r\x1b\x1c-\x1e\x85\u2028\u2029]")
+_LINE_BREAKS = frozenset("\n\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029")
+# sequences which are not split over two chunks skip the state machine
+_COMPLETE_SEQUENCE = re.compile(
+    r"(\r\n)|(\x08(?:\x1b\[K| \x08))|\x1b\[[0-?]*[ -/]*[@-~]"
+)
+_ERASE_GROUP = 2
+# ESC followed by one of these is a complete two character sequence
+_ESC_FINAL_CHARS = frozenset(
+    [chr(code) for code in range(ord("@"), ord("Z") + 1)] + list("\\]^_78")
+)
+
+
+def traced_command(func: Callable[..., T]) -> Callable[..., T]:
+    """Record the calls of a command execution method in the boot trace.
+
+    :param func: method of a console taking the command, or the list of
+        commands, as first argument
+    :type func: Callable[..., T]
+    :return: the traced method
+    :rtype: Callable[..., T]
+    """
+
+    def name(command: str | list[str]) -> str:
+        return command if isinstance(command, str) else "; ".join(command)
+
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(
+            self: BoardfarmPexpect,
+            command: str | list[str],
+            *args: object,
+            **kwargs: object,
+        ) -> object:
+            with command_span(self._session_name, name(command)):
+                return await func(self, command, *args, **kwargs)
+
+        return async_wrapper  # type: ignore[return-value]
+
+    @functools.wraps(func)
+    def wrapper(
+        self: BoardfarmPexpect,
+        command: str | list[str],
+        *args: object,
+        **kwargs: object,
+    ) -> T:
+        with command_span(self._session_name, name(command)):
+            return func(self, command, *args, **kwargs)
+
+    return wrapper
+
+
+class _ConsoleSanitizer:  # pylint: disable=too-few-public-methods
+    """Incremental, single pass console output sanitizer.
+
+    Splits the console output into lines and strips ANSI escape sequences,
+    bells and erased characters (char + backspace + erase sequence). Every
+    character is looked at once and the state is kept across chunks, so an
+    escape sequence or a line break split over two reads is handled as well.
+    """
+
+    # pylint: disable=missing-docstring
+
+    def __init__(self) -> None:
+        self._line: list[str] = []  # chunks of the current line
+        self._line_started = False
+        self._pending: list[str] = []
+        self._state = self._normal
+        self._after_cr = False
+
+    def feed(self, text: str) -> list[str]:
+        lines: list[str] = []
+        position, length = 0, len(text)
+        while position < length:
+            if self._after_cr:
+                self._after_cr = False
+                if text[position] == "\n":
+                    self._emit(lines)
+                    position += 1
+                    continue
+                # a lone carriage return only breaks a non empty line
+                if self._line_started:
+                    self._emit(lines)
+            if self._state == self._normal:
+                match = _SPECIAL_CHARS.search(text, position)
+                end = match.start() if match else length
+                if end > position:
+                    self._line.append(text[position:end])
+                    self._line_started = True
+                    position = end
+                    continue
+                match = _COMPLETE_SEQUENCE.match(text, position)
+                if match:
+                    position = match.end()
+                    if match.lastindex == 1:
+                        self._emit(lines)
+                    else:
+                        self._line_started = True
+                        if match.lastindex == _ERASE_GROUP:
+                            self._erase()
+                    continue
+            self._state(text[position], lines)
+            position += 1
+        return lines
+
+    def flush(self) -> list[str]:
+        # end of output, return the unterminated last line
+        lines: list[str] = []
+        self._pending.clear()
+        self._state = self._normal
+        self._after_cr = False
+        if self._line_started:
+            self._emit(lines)
+        return lines
+
+    def _emit(self, lines: list[str]) -> None:
+        lines.append("".join(self._line).replace("\t", "  ").rstrip())
+        self._line.clear()
+        self._line_started = False
+
+    def _flush_pending(self) -> None:
+        self._line.extend(self._pending)
+        self._pending.clear()
+
+    def _reprocess(self, char: str, lines: list[str]) -> None:
+        self._flush_pending()
+        self._state = self._normal
+        self._normal(char, lines)
+
+    def _normal(self, char: str, lines: list[str]) -> None:
+        if char in _LINE_BREAKS:
+            self._emit(lines)
+            return
+        if char == "\r":
+            self._flush_pending()
+            self._after_cr = True
+            return
+        self._line_started = True
+        if char == "\x1b":
+            self._pending.append(char)
+            self._state = self._escape
+        elif char == "\x08":
+            self._pending.append(char)
+            self._state = self._backspace
+        elif char != "\x07":
+            self._line.append(char)
+
+    def _escape(self, char: str, lines: list[str]) -> None:
+        if char == "[":
+            self._pending.append(char)
+            self._state = self._csi
+        elif char in _ESC_FINAL_CHARS:
+            self._pending.clear()
+            self._state = self._normal
+        else:
+            self._reprocess(char, lines)
+
+    def _csi(self, char: str, lines: list[str]) -> None:
+        if "0" <= char <= "?" and self._pending[-1] not in " !\"#$%&'()*+,-./":
+            self._pending.append(char)
+        elif " " <= char <= "/":
+            self._pending.append(char)
+        elif "@" <= char <= "~":
+            self._pending.clear()
+            self._state = self._normal
+        else:
+            self._reprocess(char, lines)
+
+    def _erase(self) -> None:
+        # drop the backspace sequence together with the erased character
+        self._pending.clear()
+        if self._line:
+            last = self._line.pop()
+            if len(last) > 1:
+                self._line.append(last[:-1])
+        self._state = self._normal
+
+    def _backspace(self, char: str, lines: list[str]) -> None:
+        # a backspace only erases when followed by "ESC [ K" or " \b"
+        if char in "\x1b ":
+            self._pending.append(char)
+            self._state = (
+                self._backspace_escape if char == "\x1b" else self._backspace_space
+            )
+        else:
+            self._reprocess(char, lines)
+
+    def _backspace_escape(self, char: str, lines: list[str]) -> None:
+        if char == "[":
+            self._pending.append(char)
+            self._state = self._backspace_csi
+        else:
+            # keep the backspace, the escape sequence may still be valid
+            self._line.append(self._pending.pop(0))
+            self._state = self._escape
+            self._escape(char, lines)
+
+    def _backspace_csi(self, char: str, lines: list[str]) -> None:
+        if char == "K":
+            self._erase()
+        else:
+            self._line.append(self._pending.pop(0))
+            self._state = self._csi
+            self._csi(char, lines)
+
+    def _backspace_space(self, char: str, lines: list[str]) -> None:
+        if char == "\x08":
+            self._erase()
+        else:
+            self._reprocess(char, lines)
 
 
 class _LogWrapper:
-    """Wrapper to log console output."""
+    """Wrapper to log console output.
 
-    # pylint: disable=missing-docstring  # wrapper to console logging
+    The raw chunks read from the console are handed to a bounded queue and a
+    writer thread does the sanitizing and the log handler I/O, so a slow log
+    directory does not delay the thread doing ``expect``. When the queue is
+    full the overflow policy decides what happens with the chunk:
 
-    _chars_to_remove = re.compile(
-        r"\x1B(?:[@-Z\\-_]|\[[0-?]*["
-        r" -/]*[@-~])|\r|\n|\x1B[78]|\x07|(\x1b\x5b\x48\x1b\x5b\x4a)",
-    )
+    - ``block``: wait until the writer thread catches up
+    - ``drop``: discard the chunk and count it in ``dropped_chunks``
+    - ``spill``: append the chunk to a temporary file, read back in order
+    """
 
-    def __init__(self, logger: Logger) -> None:
+    # pylint: disable=missing-docstring  # wrapper to console logging
+
+    def __init__(
+        self,
+        logger: Logger,
+        max_queue_size: int = _LOG_QUEUE_SIZE,
+        overflow_policy: str = "block",
+    ) -> None:
+        if overflow_policy not in _LOG_OVERFLOW_POLICIES:
+            msg = (
+                f"Invalid console log overflow policy {overflow_policy!r}, "
+                f"expected one of {', '.join(_LOG_OVERFLOW_POLICIES)}"
+            )
+            raise ValueError(msg)
         self._logger = logger
-        self._lastline = ""
+        self._overflow_policy = overflow_policy
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        self._sanitizer = _ConsoleSanitizer()
+        self._queue: Queue[tuple[float, str | bytes] | None] = Queue(max_queue_size)
+        self._lock = Lock()
+        self._spill_file: IO[bytes] | None = None
+        self._spilled = False
+        self._writer: Thread | None = None
+        self._closed = False
+        self.dropped_chunks = 0
 
     def write(self, string: str | bytes) -> None:
-        if isinstance(string, bytes):
-            string = string.decode("utf-8", errors="ignore")
-        string = self._lastline + string
-        lines: list[str] = [line for line in string.splitlines(True) if line != "\r"]
-        if lines and not string.endswith("\n"):
-            self._lastline = lines[-1]
-            lines = lines[:-1]
-        else:
-            self._lastline = ""
-        for _line in lines:
-            line = _apply_backspace(_line)
-            self._logger.debug(
-                self._chars_to_remove.sub("", line).replace("\t", "  ").rstrip(),
+        if self._closed:
+            self._process(time.time(), string)
+            return
+        if self._writer is None:
+            self._writer = Thread(
+                target=self._write_logs,
+                name=f"console-log-{self._logger.name}",
+                daemon=True,
             )
+            self._writer.start()
+        item = (time.time(), string)
+        if self._overflow_policy == "block":
+            self._queue.put(item)
+            return
+        with self._lock:
+            # keep the order, nothing goes to the queue while data is spilled
+            if not self._spilled:
+                try:
+                    self._queue.put_nowait(item)
+                except Full:
+                    pass
+                else:
+                    return
+            if self._overflow_policy == "drop":
+                self.dropped_chunks += 1
+            else:
+                self._spill(*item)
 
     def flush(self) -> None:
+        # called by pexpect after every write, close() waits for the writer
         pass
 
+    def close(self) -> None:
+        """Write all the queued console output and stop the writer thread."""
+        if self._closed:
+            return
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+        self._closed = True
+        self._process(time.time(), self._decoder.decode(b"", final=True))
+        self._log_lines(time.time(), [line for line in self._sanitizer.flush() if line])
+        if self.dropped_chunks:
+            self._logger.warning(
+                "%s console output chunks were dropped from the log",
+                self.dropped_chunks,
+            )
+        for handler in self._logger.handlers:
+            handler.flush()
+
+    def _spill(self, timestamp: float, string: str | bytes) -> None:
+        if self._spill_file is None:
+            self._spill_file = tempfile.TemporaryFile()  # noqa: SIM115
+        data = string.encode() if isinstance(string, str) else string
+        self._spill_file.write(_SPILL_HEADER.pack(timestamp, len(data)) + data)
+        self._spilled = True
+
+    def _read_spilled(self) -> list[tuple[float, bytes]]:
+        with self._lock:
+            if not self._spilled or self._spill_file is None:
+                return []
+            self._spill_file.seek(0)
+            data = self._spill_file.read()
+            self._spill_file.seek(0)
+            self._spill_file.truncate()
+            self._spilled = False
+        chunks, offset = [], 0
+        while offset < len(data):
+            timestamp, size = _SPILL_HEADER.unpack_from(data, offset)
+            offset += _SPILL_HEADER.size
+            chunks.append((timestamp, data[offset : offset + size]))
+            offset += size
+        return chunks
+
+    def _write_logs(self) -> None:
+        while (item := self._queue.get()) is not None:
+            self._process(*item)
+            # the queue only holds data older than the spilled data
+            if self._queue.empty():
+                for chunk in self._read_spilled():
+                    self._process(*chunk)
+        for chunk in self._read_spilled():
+            self._process(*chunk)
+        if self._spill_file is not None:
+            self._spill_file.close()
+
+    def _process(self, timestamp: float, string: str | bytes) -> None:
+        if isinstance(string, bytes):
+            string = self._decoder.decode(string)
+        self._log_lines(timestamp, self._sanitizer.feed(string))
+
+    def _log_lines(self, timestamp: float, lines: list[str]) -> None:
+        if not lines or not self._logger.isEnabledFor(DEBUG):
+            return
+        for line in lines:
+            # keep the time the output was read, not the time it was written
+            record = self._logger.makeRecord(
+                self._logger.name, DEBUG, __file__, 0, line, None, None
+            )
+            record.created = timestamp
+            record.msecs = (timestamp - int(timestamp)) * 1000
+            self._logger.handle(record)
+
+
+class _RingBuffer(StringIO):
+    """Text buffer which only keeps the newest characters written to it.
+
+    The buffer is cut back to its capacity once it holds twice as much, so
+    the copy is amortized over the writes.
+    """
+
+    # pylint: disable=missing-docstring
+
+    def __init__(self, capacity: int) -> None:
+        super().__init__()
+        self._capacity = capacity
+
+    def write(self, data: str) -> int:
+        written = super().write(data)
+        if self.tell() > 2 * self._capacity:
+            newest = self.getvalue()[-self._capacity :]
+            self.seek(0)
+            self.truncate()
+            super().write(newest)
+        return written
+
+
+class _ScanCountingExpecter(Expecter):
+    """Expecter which counts the characters searched for a pattern."""
+
+    # pylint: disable=missing-docstring
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:  # noqa: ANN401
+        super().__init__(*args, **kwargs)
+        self.scanned_chars = 0
+        self.searches = 0
+
+    def do_search(self, window: str, freshlen: int) -> int | None:
+        self.scanned_chars += len(window)
+        self.searches += 1
+        return super().do_search(window, freshlen)
+
+
+class CommandStream:
+    """Output lines of a command as they are read from the console.
+
+    The exit status is set once the last line was read and stays None when
+    the command was stopped before completion.
+    """
+
+    def __init__(self, lines: Generator[str, None, int | None]) -> None:
+        """Initialize the command stream.
+
+        :param lines: generator yielding the lines, returning the exit status
+        :type lines: Generator[str, None, int | None]
+        """
+        self._lines = lines
+        self.exit_status: int | None = None
+
+    def __iter__(self) -> Self:
+        """Return the iterator over the output lines.
+
+        :return: the command stream
+        :rtype: Self
+        """
+        return self
+
+    def __next__(self) -> str:
+        """Return the next output line.
+
+        :return: next output line
+        :rtype: str
+        """
+        try:
+            return next(self._lines)
+        except StopIteration as stop:
+            self.exit_status = stop.value
+            raise
+
+    def __enter__(self) -> Self:
+        """Return the command stream.
+
+        :return: the command stream
+        :rtype: Self
+        """
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Stop the command if it is still running.
+
+        :param args: exception details, unused
+        :type args: object
+        """
+        self.close()
+
+    def close(self) -> None:
+        """Stop the command if it is still running."""
+        self._lines.close()
+
 
 class BoardfarmPexpect(pexpect.spawn, metaclass=ABCMeta):
     """Boardfarm pexpect session."""
 
-    def __init__(
+    _shell_prompt: list[str]
+    # console logs are written by a thread, see _LogWrapper for the policies
+    console_log_queue_size = _LOG_QUEUE_SIZE
+    console_log_overflow_policy = "block"
+
+    def __init__(  # pylint: disable=too-many-arguments
         self,
         session_name: str,
-        command: str,
+        command: str | None,
         save_console_logs: str,
         args: list[str],
+        console_log_format: str = "text",
         **kwargs: dict[str, Any],
     ) -> None:
         """Initialize boardfarm pexpect.
 
         :param session_name: pexpect session name
         :type session_name: str
-        :param command: command to start pexpect session
-        :type command: str
+        :param command: command to start pexpect session, None when the
+            subclass provides the file descriptor itself
+        :type command: str | None
         :param save_console_logs: save console logs to the disk
         :type save_console_logs: str
         :param args: additional arguments to the command
         :type args: list[str]
+        :param console_log_format: format of the saved console logs, text for
+            rotated plain text logs, store for a time indexed compressed store
+            (see console_log_store) or both, defaults to text
+        :type console_log_format: str
         :param kwargs: may contains the 'env' for pexpect, optional
         :type kwargs: dict[str, Any]
         """
@@ -97,22 +542,206 @@ class BoardfarmPexpect(pexpect.spawn, metaclass=ABCMeta):
             codec_errors="ignore",
             env=kwargs.get("env"),
         )
+        self._session_name = session_name
+        self.console_log_format = console_log_format
         self._configure_logging(session_name, save_console_logs)
+        self.framed_execution = False
+        self.scanned_chars = 0
 
     def _configure_logging(self, session_name: str, save_console_logs: str) -> None:
         logger = getLogger(f"pexpect.{session_name}")
+        if self.console_log_format not in CONSOLE_LOG_FORMATS:
+            msg = f"Unknown console log format {self.console_log_format!r}"
+            raise ValueError(msg)
         if bool(save_console_logs):
             logs_directory = Path(save_console_logs)
             logs_directory.mkdir(parents=True, exist_ok=True)
-            handler = RotatingFileHandler(
-                logs_directory / f"{session_name.replace('.', '_')}.txt",
-                backupCount=2,
-                maxBytes=25000000,
-                encoding="utf-8",
+            file_name = session_name.replace(".", "_")
+            if self.console_log_format != "store":
+                handler = RotatingFileHandler(
+                    logs_directory / f"{file_name}.txt",
+                    backupCount=2,
+                    maxBytes=25000000,
+                    encoding="utf-8",
+                )
+                handler.setFormatter(Formatter("%(asctime)s %(message)s"))
+                logger.addHandler(handler)
+            if self.console_log_format != "text":
+                # a reconnected session takes over the store of the previous one
+                for previous in logger.handlers[:]:
+                    if isinstance(previous, ConsoleLogStoreHandler):
+                        logger.removeHandler(previous)
+                        previous.close()
+                logger.addHandler(
+                    ConsoleLogStoreHandler(logs_directory / f"{file_name}.clog")
+                )
+        self.logfile_read = _LogWrapper(
+            logger,
+            self.console_log_queue_size,
+            self.console_log_overflow_policy,
+        )
+
+    def close(self, force: bool = True) -> None:
+        """Close the session and write the pending console output to the logs.
+
+        :param force: True to send a SIGKILL, False for SIGINT/UP, default True
+        :type force: bool
+        """
+        super().close(force=force)
+        self._close_console_log()
+
+    def _close_console_log(self) -> None:
+        if isinstance(self.logfile_read, _LogWrapper):
+            self.logfile_read.close()
+
+    def set_search_window(
+        self,
+        search_window: int | None,
+        buffer_size: int | None = None,
+    ) -> None:
+        """Bound the console output looked at and kept by expect.
+
+        With a ``search_window`` patterns are only searched in the newest
+        ``search_window`` characters. With a ``buffer_size`` only the newest
+        ``buffer_size`` (up to twice as many) characters are kept for
+        ``before``, older output is discarded from the buffer but is still
+        written to the console log. Either can be set on its own.
+
+        :param search_window: number of newest characters searched, None to
+            search the whole buffer
+        :type search_window: int | None
+        :param buffer_size: number of newest characters kept, defaults to None
+        :type buffer_size: int | None
+        :raises ValueError: if the buffer is smaller than the search window
+        """
+        if (
+            search_window is not None
+            and buffer_size is not None
+            and buffer_size < search_window
+        ):
+            msg = (
+                f"Console buffer size {buffer_size} is smaller than the "
+                f"search window {search_window}"
             )
-            handler.setFormatter(Formatter("%(asctime)s %(message)s"))
-            logger.addHandler(handler)
-        self.logfile_read = _LogWrapper(logger)
+            raise ValueError(msg)
+        if search_window is not None:
+            self.searchwindowsize = search_window
+        if buffer_size is not None:
+            self.buffer_type = partial(_RingBuffer, buffer_size)
+            for name in ("_buffer", "_before"):
+                buffer = self.buffer_type()
+                buffer.write(getattr(self, name).getvalue())
+                setattr(self, name, buffer)
+
+    def expect_list(
+        self,
+        pattern_list: list[Any],
+        timeout: float | None = -1,
+        searchwindowsize: int | None = -1,
+        async_: bool = False,
+        **kw: Any,  # noqa: ANN401
+    ) -> Any:  # noqa: ANN401
+        """Wait for one of the compiled patterns, see pexpect.spawn.expect_list.
+
+        :param pattern_list: compiled regular expressions, EOF or TIMEOUT
+        :type pattern_list: list[Any]
+        :param timeout: timeout in seconds, defaults to -1 (session timeout)
+        :type timeout: float | None
+        :param searchwindowsize: search window, defaults to -1 (session window)
+        :type searchwindowsize: int | None
+        :param async_: return a coroutine, defaults to False
+        :type async_: bool
+        :param kw: ``async`` alias of ``async_``
+        :type kw: Any
+        :return: index of the matching pattern or a coroutine returning it
+        :rtype: Any
+        """
+        async_ = kw.pop("async", async_)
+        if kw:
+            msg = f"Unknown keyword arguments: {kw}"
+            raise TypeError(msg)
+        return self._expect_with_stats(
+            searcher_re(pattern_list), timeout, searchwindowsize, async_
+        )
+
+    def expect_exact(
+        self,
+        pattern_list: Any,  # noqa: ANN401
+        timeout: float | None = -1,
+        searchwindowsize: int | None = -1,
+        async_: bool = False,
+        **kw: Any,  # noqa: ANN401
+    ) -> Any:  # noqa: ANN401
+        """Wait for one of the plain strings, see pexpect.spawn.expect_exact.
+
+        :param pattern_list: string or list of strings, EOF or TIMEOUT
+        :type pattern_list: Any
+        :param timeout: timeout in seconds, defaults to -1 (session timeout)
+        :type timeout: float | None
+        :param searchwindowsize: search window, defaults to -1 (session window)
+        :type searchwindowsize: int | None
+        :param async_: return a coroutine, defaults to False
+        :type async_: bool
+        :param kw: ``async`` alias of ``async_``
+        :type kw: Any
+        :return: index of the matching string or a coroutine returning it
+        :rtype: Any
+        """
+        async_ = kw.pop("async", async_)
+        if kw:
+            msg = f"Unknown keyword arguments: {kw}"
+            raise TypeError(msg)
+        if isinstance(pattern_list, self.allowed_string_types) or pattern_list in (
+            pexpect.EOF,
+            pexpect.TIMEOUT,
+        ):
+            pattern_list = [pattern_list]
+        searcher = searcher_string(
+            [
+                pattern
+                if pattern in (pexpect.EOF, pexpect.TIMEOUT)
+                else self._coerce_expect_string(pattern)
+                for pattern in pattern_list
+            ]
+        )
+        return self._expect_with_stats(searcher, timeout, searchwindowsize, async_)
+
+    def _expect_with_stats(
+        self,
+        searcher: searcher_re | searcher_string,
+        timeout: float | None,
+        searchwindowsize: int | None,
+        async_: bool,
+    ) -> Any:  # noqa: ANN401
+        if timeout == -1:
+            timeout = self.timeout
+        expecter = _ScanCountingExpecter(self, searcher, searchwindowsize)
+        if async_:
+            return self._expect_async_with_stats(expecter, timeout)
+        try:
+            return expecter.expect_loop(timeout)
+        finally:
+            self._log_expect_stats(expecter)
+
+    async def _expect_async_with_stats(
+        self,
+        expecter: _ScanCountingExpecter,
+        timeout: float | None,
+    ) -> int:
+        try:
+            return await expect_async(expecter, timeout)
+        finally:
+            self._log_expect_stats(expecter)
+
+    def _log_expect_stats(self, expecter: _ScanCountingExpecter) -> None:
+        self.scanned_chars += expecter.scanned_chars
+        _LOGGER.debug(
+            "%s: expect scanned %s chars in %s searches, %s chars buffered",
+            self._session_name,
+            expecter.scanned_chars,
+            expecter.searches,
+            self._before.tell(),
+        )
 
     def get_last_output(self) -> str:
         """Get last output from the buffer.
@@ -139,6 +768,350 @@ class BoardfarmPexpect(pexpect.spawn, metaclass=ABCMeta):
         """
         raise NotImplementedError
 
+    @staticmethod
+    def _wrap_in_markers(command: str) -> tuple[str, str]:
+        frame_id = uuid4().hex[:12]
+        body = command.rstrip() or ":"
+        # the group is closed on its own line: a trailing comment, a heredoc
+        # or a multi-line command cannot swallow the end marker
+        framed_command = (
+            f"echo {_FRAME_MARKER}''_B_{frame_id}; {{ {body}\n}}; "
+            f"echo {_FRAME_MARKER}''_E_{frame_id}:$?"
+        )
+        return framed_command, frame_id
+
+    def _frame_command(self, command: str) -> tuple[str, str]:
+        """Wrap the command in unique begin/end markers.
+
+        The markers are split by an empty quote pair on the command line so
+        that the echoed command never matches the expected pattern. The
+        command is grouped in braces, hence the shell parses it as a whole
+        before running it and its echo never interleaves with the output. The
+        end marker carries the exit status and is followed by the shell
+        prompt, so output, exit status and prompt are matched by a single
+        expect.
+
+        :param command: command to frame
+        :type command: str
+        :return: framed command line and the pattern matching its output
+        :rtype: tuple[str, str]
+        """
+        framed_command, frame_id = self._wrap_in_markers(command)
+        prompt = "|".join(f"(?:{pattern})" for pattern in self._shell_prompt)
+        pattern = (
+            rf"{_FRAME_MARKER}_B_{frame_id}\r?\n(.*?)"
+            rf"{_FRAME_MARKER}_E_{frame_id}:(\d+).*?(?:{prompt})"
+        )
+        return framed_command, pattern
+
+    @traced_command
+    def execute_framed_command(
+        self, command: str, timeout: int = -1
+    ) -> tuple[str, int]:
+        """Execute a command delimited by begin/end markers.
+
+        :param command: command to execute
+        :type command: str
+        :param timeout: timeout in seconds. Defaults to -1
+        :type timeout: int
+        :return: command output and exit status
+        :rtype: tuple[str, int]
+        """
+        framed_command, pattern = self._frame_command(command)
+        self.sendline(framed_command)
+        self.expect(pattern, timeout=timeout)
+        return self.match.group(1).strip(), int(self.match.group(2))
+
+    @traced_command
+    async def execute_framed_command_async(
+        self, command: str, timeout: int = -1
+    ) -> tuple[str, int]:
+        """Execute a command delimited by begin/end markers using asyncio.
+
+        :param command: command to execute
+        :type command: str
+        :param timeout: timeout in seconds. Defaults to -1
+        :type timeout: int
+        :return: command output and exit status
+        :rtype: tuple[str, int]
+        """
+        framed_command, pattern = self._frame_command(command)
+        self.sendline(framed_command)
+        await self.expect(pattern, timeout=timeout, async_=True)
+        return self.match.group(1).strip(), int(self.match.group(2))
+
+    def _frame_batch(self, commands: list[str]) -> tuple[str, list[str]]:
+        """Wrap a list of commands into a single framed shell script.
+
+        The commands are grouped with braces, one per line, hence the shell
+        parses the whole group before running it and the command echo never
+        interleaves with the output.
+
+        :param commands: commands to frame
+        :type commands: list[str]
+        :return: framed script and the patterns matching each command output
+        :rtype: tuple[str, list[str]]
+        """
+        frame_id = uuid4().hex[:12]
+        lines = ["{"]
+        patterns = []
+        for index, command in enumerate(commands):
+            lines.extend(
+                (
+                    f"echo {_FRAME_MARKER}''_B_{frame_id}_{index}",
+                    command,
+                    f"echo {_FRAME_MARKER}''_E_{frame_id}_{index}:$?",
+                )
+            )
+            patterns.append(
+                rf"{_FRAME_MARKER}_B_{frame_id}_{index}\r?\n(.*?)"
+                rf"{_FRAME_MARKER}_E_{frame_id}_{index}:(\d+)"
+            )
+        lines.append("}")
+        prompt = "|".join(f"(?:{pattern})" for pattern in self._shell_prompt)
+        patterns[-1] += rf".*?(?:{prompt})"
+        return "\n".join(lines), patterns
+
+    @traced_command
+    def execute_batch(
+        self, commands: list[str], timeout: int = -1
+    ) -> list[tuple[str, int]]:
+        """Execute a list of commands in a single round trip.
+
+        :param commands: commands to execute
+        :type commands: list[str]
+        :param timeout: timeout in seconds for each command. Defaults to -1
+        :type timeout: int
+        :return: output and exit status of each command
+        :rtype: list[tuple[str, int]]
+        """
+        if not commands:
+            return []
+        script, patterns = self._frame_batch(commands)
+        self.sendline(script)
+        results = []
+        for pattern in patterns:
+            self.expect(pattern, timeout=timeout)
+            results.append((self.match.group(1).strip(), int(self.match.group(2))))
+        return results
+
+    @traced_command
+    async def execute_batch_async(
+        self, commands: list[str], timeout: int = -1
+    ) -> list[tuple[str, int]]:
+        """Execute a list of commands in a single round trip using asyncio.
+
+        :param commands: commands to execute
+        :type commands: list[str]
+        :param timeout: timeout in seconds for each command. Defaults to -1
+        :type timeout: int
+        :return: output and exit status of each command
+        :rtype: list[tuple[str, int]]
+        """
+        if not commands:
+            return []
+        script, patterns = self._frame_batch(commands)
+        self.sendline(script)
+        results = []
+        for pattern in patterns:
+            await self.expect(pattern, timeout=timeout, async_=True)
+            results.append((self.match.group(1).strip(), int(self.match.group(2))))
+        return results
+
+    def stream_command(
+        self,
+        command: str,
+        stop: Callable[[str], bool] | None = None,
+        timeout: float | None = -1,
+    ) -> CommandStream:
+        """Execute a command and stream its output lines as they are read.
+
+        The lines are read one by one instead of being buffered until the
+        prompt returns. The command is interrupted with Ctrl-C when the stop
+        predicate returns True for a line (the line is still yielded), when
+        the stream is closed before the command completed or on timeout.
+
+        .. code-block:: python
+
+            with console.stream_command("ping -c 1000 10.0.0.1") as lines:
+                for line in lines:
+                    ...
+            print(lines.exit_status)
+
+        :param command: command to execute
+        :type command: str
+        :param stop: stop the command once it returns True for a line
+        :type stop: Callable[[str], bool] | None
+        :param timeout: time limit of the whole command in seconds, None for no
+            limit. Defaults to -1 (session timeout)
+        :type timeout: float | None
+        :return: iterator over the output lines holding the exit status
+        :rtype: CommandStream
+        """
+        return CommandStream(self._stream_lines(command, stop, timeout))
+
+    def _stream_lines(
+        self,
+        command: str,
+        stop: Callable[[str], bool] | None,
+        timeout: float | None,
+    ) -> Generator[str, None, int | None]:
+        if timeout == -1:
+            timeout = self.timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        def remaining() -> float | None:
+            return None if deadline is None else max(0, deadline - time.monotonic())
+
+        framed_command, frame_id = self._wrap_in_markers(command)
+        patterns = [rf"{_FRAME_MARKER}_E_{frame_id}:(\d+)\r?\n", r"\r?\n"]
+        completed = False
+        self.sendline(framed_command)
+        try:
+            self.expect(rf"{_FRAME_MARKER}_B_{frame_id}\r?\n", timeout=remaining())
+            while self.expect(patterns, timeout=remaining()):
+                line = self.before
+                yield line
+                if stop is not None and stop(line):
+                    return None
+            exit_status = int(self.match.group(1))
+            self.expect(self._shell_prompt, timeout=remaining())
+            completed = True
+            return exit_status
+        finally:
+            if not completed:
+                self._interrupt_command()
+
+    def _interrupt_command(self, attempts: int = 3, timeout: float = 5) -> None:
+        """Interrupt the running command and wait for the shell prompt.
+
+        A single ^C can be lost while the shell itself is between two commands
+        of a loop, it is sent again until the prompt shows up.
+
+        :param attempts: number of ^C sent at most, defaults to 3
+        :type attempts: int
+        :param timeout: seconds to wait for the prompt after each ^C,
+            defaults to 5
+        :type timeout: float
+        :raises pexpect.TIMEOUT: when the prompt did not show up
+        """
+        prompts = [*self._shell_prompt, pexpect.TIMEOUT]
+        for _ in range(attempts):
+            self.sendcontrol("c")
+            if self.expect(prompts, timeout=timeout) < len(prompts) - 1:
+                return
+        msg = f"{self.name}: command could not be interrupted"
+        raise pexpect.TIMEOUT(msg)
+
+    def _quiet_wait(self, idle_time: float, deadline: float | None) -> float:
+        if deadline is None:
+            return idle_time
+        return min(idle_time, deadline - time.monotonic())
+
+    def wait_until_quiet(
+        self,
+        idle_time: float = 1.0,
+        timeout: float | None = -1,
+    ) -> str:
+        """Wait until the console stays silent for the given idle time.
+
+        Returns as soon as no output arrived for ``idle_time`` seconds instead
+        of always waiting out a fixed timeout.
+
+        :param idle_time: seconds without output considered quiet, defaults
+            to 1
+        :type idle_time: float
+        :param timeout: maximum seconds to wait, None for no limit. Defaults
+            to -1 (console timeout)
+        :type timeout: float | None
+        :return: console output received until the console went quiet, with
+            the output already buffered by earlier expect calls
+        :rtype: str
+        """
+        if timeout == -1:
+            timeout = self.timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        output = []
+        while (wait := self._quiet_wait(idle_time, deadline)) > 0:
+            if self.expect([_ANY_OUTPUT, pexpect.TIMEOUT], timeout=wait):
+                break
+            # the match only starts at the search window, if any
+            output.append(self.before + self.after)
+        return "".join(output)
+
+    async def wait_until_quiet_async(
+        self,
+        idle_time: float = 1.0,
+        timeout: float | None = -1,
+    ) -> str:
+        """Wait until the console stays silent for the given idle time.
+
+        :param idle_time: seconds without output considered quiet, defaults
+            to 1
+        :type idle_time: float
+        :param timeout: maximum seconds to wait, None for no limit. Defaults
+            to -1 (console timeout)
+        :type timeout: float | None
+        :return: console output received until the console went quiet
+        :rtype: str
+        """
+        if timeout == -1:
+            timeout = self.timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        output = []
+        while (wait := self._quiet_wait(idle_time, deadline)) > 0:
+            if await self.expect(
+                [_ANY_OUTPUT, pexpect.TIMEOUT], timeout=wait, async_=True
+            ):
+                break
+            # the match only starts at the search window, if any
+            output.append(self.before + self.after)
+        return "".join(output)
+
+    def enable_framed_execution(self, timeout: int = 10) -> bool:
+        """Switch execute_command to framed execution if the shell supports it.
+
+        The shell is probed with a framed no-op command. Shells which cannot
+        be framed (e.g. non POSIX CLIs) keep the prompt based execution.
+
+        :param timeout: probe timeout in seconds, defaults to 10
+        :type timeout: int
+        :return: True if framed execution is enabled
+        :rtype: bool
+        """
+        try:
+            self.framed_execution = self.execute_framed_command(":", timeout)[1] == 0
+        except pexpect.TIMEOUT:
+            _LOGGER.warning(
+                "%s: shell cannot be framed, using prompt based execution",
+                self.name,
+            )
+            self.sendcontrol("c")
+            self.expect(self._shell_prompt)
+            self.framed_execution = False
+        return self.framed_execution
+
+    async def enable_framed_execution_async(self, timeout: int = 10) -> bool:
+        """Switch execute_command to framed execution if the shell supports it.
+
+        :param timeout: probe timeout in seconds, defaults to 10
+        :type timeout: int
+        :return: True if framed execution is enabled
+        :rtype: bool
+        """
+        try:
+            output = await self.execute_framed_command_async(":", timeout)
+            self.framed_execution = output[1] == 0
+        except pexpect.TIMEOUT:
+            _LOGGER.warning(
+                "%s: shell cannot be framed, using prompt based execution",
+                self.name,
+            )
+            self.sendcontrol("c")
+            await self.expect(self._shell_prompt, async_=True)
+            self.framed_execution = False
+        return self.framed_execution
+
     def start_interactive_session(self) -> None:
         """Start interactive pexpect session."""
         with disable_logs("pexpect"):
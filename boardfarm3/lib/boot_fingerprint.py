@@ -0,0 +1,157 @@
+"""Fingerprints of the inputs of the last successful boot of each device.
+
+With ``--incremental-boot``, a device whose fingerprint matches the one of its
+last successful boot is not flashed, provisioned or configured again, only
+its skip boot hook is run, as with ``--skip-boot``. Then a cheap health probe
+of what its boot established must pass, otherwise it is booted after all.
+
+A device opts in by returning a fingerprint from ``boot_fingerprint``, a hash
+of everything its boot depends on: its inventory and environment config, its
+image and its provisioning input. Its skip boot hook must leave it as usable
+as its boot does.
+
+.. code-block:: python
+
+    def boot_fingerprint(self, config, device_manager):
+        return fingerprint(type(self).__name__, self.config, self._image_uri)
+
+
+    def boot_health_probe(self, device_manager):
+        return self.sw.is_online()
+
+A device is only kept when none of the devices it waits for during the boot,
+see boot_scheduler, is booted, since their boot may disturb it.
+
+The fingerprints are kept in a JSON file in ``$BOARDFARM_BOOT_CACHE``,
+``~/.cache/boardfarm`` by default. The one of a device is forgotten before it
+is booted and recorded once the whole boot succeeded.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from functools import cache
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Collection
+
+    from boardfarm3.lib.boot_scheduler import BootStep
+
+_LOGGER = logging.getLogger(__name__)
+_INDEX_NAME = "fingerprints.json"
+
+
+def fingerprint(*inputs: object) -> str:
+    """Hash the inputs of the boot of a device.
+
+    :param inputs: JSON serializable inputs, other objects are hashed by
+        their string representation
+    :type inputs: object
+    :return: sha256 digest of the inputs
+    :rtype: str
+    """
+    canonical = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class FingerprintStore:
+    """Remembers the fingerprints of the last successful boot of the devices."""
+
+    def __init__(self, directory: str | Path) -> None:
+        """Initialize the fingerprint store.
+
+        :param directory: directory of the store, created when needed
+        :type directory: str | Path
+        """
+        self._index_path = Path(directory) / _INDEX_NAME
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict[str, str]:
+        try:
+            return json.loads(self._index_path.read_text())
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            _LOGGER.warning("Ignoring corrupted fingerprints %s", self._index_path)
+            return {}
+
+    def lookup(self, device: str) -> str | None:
+        """Get the fingerprint of the last successful boot of a device.
+
+        :param device: device key, e.g. board and device names
+        :type device: str
+        :return: fingerprint, None when unknown
+        :rtype: str | None
+        """
+        with self._lock:
+            return self._load().get(device)
+
+    def update(self, fingerprints: dict[str, str | None]) -> None:
+        """Record or forget the fingerprints of devices.
+
+        :param fingerprints: fingerprint of each device key, None to forget it
+        :type fingerprints: dict[str, str | None]
+        """
+        with self._lock:
+            # merge the entries written by other boardfarm processes meanwhile
+            index = self._load()
+            for device, value in fingerprints.items():
+                if value is None:
+                    index.pop(device, None)
+                else:
+                    index[device] = value
+            self._index_path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", dir=self._index_path.parent, delete=False
+            ) as temporary:
+                json.dump(index, temporary, indent=1, sort_keys=True)
+            Path(temporary.name).replace(self._index_path)
+
+
+@cache
+def fingerprint_store() -> FingerprintStore:
+    """Get the fingerprint store shared by all devices.
+
+    :return: fingerprint store in ``$BOARDFARM_BOOT_CACHE``,
+        ``~/.cache/boardfarm`` by default
+    :rtype: FingerprintStore
+    """
+    directory = os.environ.get("BOARDFARM_BOOT_CACHE")
+    return FingerprintStore(directory or Path.home() / ".cache" / "boardfarm")
+
+
+def settled_devices(steps: list[BootStep], unchanged: Collection[str]) -> set[str]:
+    """Get the unchanged devices waiting for unchanged devices only.
+
+    :param steps: boot steps of all devices, see build_boot_graph
+    :type steps: list[BootStep]
+    :param unchanged: devices matching the fingerprint of their last boot
+    :type unchanged: Collection[str]
+    :return: devices which do not need to be booted
+    :rtype: set[str]
+    """
+    settled = set(unchanged)
+    changed = True
+    while changed:
+        changed = False
+        for step in steps:
+            if step.plugin_name not in settled:
+                continue
+            booted = {requirement.plugin_name for requirement in step.requires}
+            if booted := booted - settled:
+                _LOGGER.info(
+                    "%s is booted, its %s waits for %s",
+                    step.plugin_name,
+                    step.stage,
+                    ", ".join(sorted(booted)),
+                )
+                settled.discard(step.plugin_name)
+                changed = True
+    return settled
@@ -0,0 +1,308 @@
+"""Dependency graph scheduler of the boot stages.
+
+By default the boot stages run one after the other, every device waiting for
+all the devices to complete the previous stage. With
+``--boot-scheduler dag`` each boot step, i.e. the stage hook of one device,
+starts as soon as its own prerequisites are done:
+
+- the earlier stages of the same device
+- the stages of the other devices declared in the ``boot_dependencies`` of
+  the device (none for an empty declaration), or every step of the earlier
+  stages when the stage of the device is not declared there
+
+.. code-block:: python
+
+    class MyCPE(CPE, BoardfarmDevice):
+        boot_dependencies: ClassVar[BootDependencies] = {
+            "boardfarm_device_boot": (
+                BootDependency(Provisioner, "boardfarm_server_configure"),
+                BootDependency(WAN, "boardfarm_server_configure"),
+            ),
+        }
+
+A step only waits for earlier stages and for the tryfirst and regular steps of
+its own stage (see below), so the graph has no cycles.
+
+In both modes the async hook implementations are awaited, while the blocking
+ones of the devices without an async implementation run next to them in a
+bounded pool of worker threads, see run_stage. Within a stage the ``tryfirst``
+implementations complete before the others start, and the ``trylast`` ones
+start once all the others completed, as when pluggy calls them in turn.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
+from boardfarm3.exceptions import NotSupportedError
+from boardfarm3.lib.boot_trace import span
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Collection
+
+    from pluggy import HookImpl, PluginManager
+
+_LOGGER = logging.getLogger(__name__)
+
+# blocking hook implementations running at once by default
+DEFAULT_BOOT_WORKERS = 8
+
+BOOT_STAGES = (
+    "boardfarm_server_boot",
+    "boardfarm_server_configure",
+    "boardfarm_device_boot",
+    "boardfarm_device_configure",
+    "boardfarm_attached_device_boot",
+    "boardfarm_attached_device_configure",
+)
+
+
+@dataclass(frozen=True)
+class BootDependency:
+    """Boot stage all the devices of a type must have completed."""
+
+    device_type: type
+    stage: str
+
+
+# boot stage of a device -> what the stage waits for
+BootDependencies = dict[str, tuple[BootDependency, ...]]
+
+
+@dataclass(eq=False)
+class BootStep:
+    """Boot stage hook implementation of a plugin."""
+
+    plugin_name: str
+    plugin: object
+    stage: str
+    function: Callable[..., Any]
+    argnames: tuple[str, ...]
+    is_async: bool
+    tryfirst: bool = False
+    trylast: bool = False
+    requires: list[BootStep] = field(default_factory=list)
+
+    @property
+    def rank(self) -> int:
+        """Position of the step in its stage, i.e. tryfirst, regular or trylast.
+
+        :return: 0 for tryfirst, 1 for regular and 2 for trylast steps
+        :rtype: int
+        """
+        if self.tryfirst:
+            return 0
+        return 2 if self.trylast else 1
+
+    @property
+    def mode(self) -> str:
+        """How the hook implementation runs, i.e. asyncio or thread.
+
+        :return: run mode of the step
+        :rtype: str
+        """
+        return "asyncio" if self.is_async else "thread"
+
+    async def run(
+        self, hook_kwargs: dict[str, Any], executor: ThreadPoolExecutor
+    ) -> None:
+        """Run the hook implementation.
+
+        :param hook_kwargs: arguments of the hook, only the ones the
+            implementation accepts are passed
+        :type hook_kwargs: dict[str, Any]
+        :param executor: worker threads of the blocking implementations
+        :type executor: ThreadPoolExecutor
+        """
+        args = [hook_kwargs[name] for name in self.argnames]
+        start_time = time.monotonic()
+        with span(self.stage, "hook", device=self.plugin_name, mode=self.mode):
+            if self.is_async:
+                await self.function(*args)
+            else:
+                # the commands of the thread belong to the span of the step
+                context = contextvars.copy_context()
+                await asyncio.get_running_loop().run_in_executor(
+                    executor, partial(context.run, self.function, *args)
+                )
+        _LOGGER.debug(
+            "%s of %s ran for %ss (%s).",
+            self.stage,
+            self.plugin_name,
+            time.monotonic() - start_time,
+            self.mode,
+        )
+
+
+def _hook_impls(plugin_manager: PluginManager, hook_name: str) -> dict[str, HookImpl]:
+    hook = getattr(plugin_manager.hook, hook_name, None)
+    if hook is None:
+        return {}
+    impls = hook.get_hookimpls()
+    if any(impl.hookwrapper or impl.wrapper for impl in impls):
+        msg = f"{hook_name} wrappers cannot be scheduled per device"
+        raise NotSupportedError(msg)
+    return {impl.plugin_name: impl for impl in impls}
+
+
+def _requirements(step: BootStep, steps: list[BootStep]) -> list[BootStep]:
+    index = BOOT_STAGES.index(step.stage)
+    earlier = [other for other in steps if BOOT_STAGES.index(other.stage) < index]
+    # tryfirst and trylast order the steps within the stage
+    ranked_before = [
+        other for other in steps if other.stage == step.stage and other.rank < step.rank
+    ]
+    declared: BootDependencies = getattr(step.plugin, "boot_dependencies", {})
+    if step.stage not in declared:
+        return earlier + ranked_before
+    requires = [other for other in earlier if other.plugin is step.plugin]
+    requires.extend(ranked_before)
+    for dependency in declared[step.stage]:
+        if BOOT_STAGES.index(dependency.stage) >= index:
+            msg = (
+                f"{step.plugin_name}: {step.stage} can only wait for earlier"
+                f" stages, not {dependency.stage}"
+            )
+            raise ValueError(msg)
+        requires.extend(
+            other
+            for other in earlier
+            if isinstance(other.plugin, dependency.device_type)
+            and BOOT_STAGES.index(other.stage) <= BOOT_STAGES.index(dependency.stage)
+        )
+    return list(dict.fromkeys(requires))
+
+
+def stage_steps(
+    plugin_manager: PluginManager, stage: str, exclude: Collection[str] = ()
+) -> list[BootStep]:
+    """Get the steps of a stage, the async implementation of each plugin if any.
+
+    :param plugin_manager: plugin manager with the devices registered
+    :type plugin_manager: PluginManager
+    :param stage: stage hook name, e.g. boardfarm_device_boot
+    :type stage: str
+    :param exclude: plugins not running the stage, defaults to none
+    :type exclude: Collection[str]
+    :return: one step per plugin implementing the stage
+    :rtype: list[BootStep]
+    :raises NotSupportedError: when the stage hook has wrappers
+    """
+    sync_impls = _hook_impls(plugin_manager, stage)
+    async_impls = _hook_impls(plugin_manager, f"{stage}_async")
+    steps = []
+    for name in dict.fromkeys([*sync_impls, *async_impls]):
+        if name in exclude:
+            continue
+        impl = async_impls.get(name) or sync_impls[name]
+        steps.append(
+            BootStep(
+                name,
+                impl.plugin,
+                stage,
+                impl.function,
+                tuple(impl.argnames),
+                is_async=name in async_impls,
+                tryfirst=impl.tryfirst,
+                trylast=impl.trylast,
+            )
+        )
+    return steps
+
+
+def build_boot_graph(
+    plugin_manager: PluginManager, exclude: Collection[str] = ()
+) -> list[BootStep]:
+    """Get the boot steps of all plugins with their prerequisites.
+
+    :param plugin_manager: plugin manager with the devices registered
+    :type plugin_manager: PluginManager
+    :param exclude: plugins not booted, defaults to none
+    :type exclude: Collection[str]
+    :return: boot steps in stage order
+    :rtype: list[BootStep]
+    """
+    steps = [
+        step
+        for stage in BOOT_STAGES
+        for step in stage_steps(plugin_manager, stage, exclude)
+    ]
+    for step in steps:
+        step.requires = _requirements(step, steps)
+    return steps
+
+
+def _log_modes(name: str, steps: list[BootStep]) -> None:
+    for mode in ("asyncio", "thread"):
+        if plugins := [step.plugin_name for step in steps if step.mode == mode]:
+            _LOGGER.info("%s ran in %s mode: %s", name, mode, ", ".join(plugins))
+
+
+async def run_stage(
+    steps: list[BootStep],
+    hook_kwargs: dict[str, Any],
+    max_workers: int = DEFAULT_BOOT_WORKERS,
+) -> None:
+    """Run the steps of a stage side by side.
+
+    The async implementations are awaited while the blocking ones run in at
+    most max_workers threads, so a device without an async implementation
+    does not hold the others back. The ``tryfirst`` steps run before the
+    others and the ``trylast`` ones after them.
+
+    :param steps: steps of the stage, see stage_steps
+    :type steps: list[BootStep]
+    :param hook_kwargs: arguments of the hook
+    :type hook_kwargs: dict[str, Any]
+    :param max_workers: blocking implementations running at once at most,
+        defaults to 8
+    :type max_workers: int
+    """
+    if not steps:
+        return
+    _log_modes(steps[0].stage, steps)
+    with ThreadPoolExecutor(max_workers, thread_name_prefix="boot") as executor:
+        for rank in sorted({step.rank for step in steps}):
+            async with asyncio.TaskGroup() as task_group:
+                for step in steps:
+                    if step.rank == rank:
+                        task_group.create_task(step.run(hook_kwargs, executor))
+
+
+async def run_boot_graph(
+    steps: list[BootStep],
+    hook_kwargs: dict[str, Any],
+    max_workers: int = DEFAULT_BOOT_WORKERS,
+) -> None:
+    """Run every boot step once its prerequisites are done.
+
+    A failing step cancels the steps still running, like a stage failure.
+
+    :param steps: boot steps, see build_boot_graph
+    :type steps: list[BootStep]
+    :param hook_kwargs: arguments of the hooks
+    :type hook_kwargs: dict[str, Any]
+    :param max_workers: blocking implementations running at once at most,
+        defaults to 8
+    :type max_workers: int
+    """
+    _log_modes("Boot graph", steps)
+    done = {step: asyncio.Event() for step in steps}
+
+    async def run(step: BootStep, executor: ThreadPoolExecutor) -> None:
+        for requirement in step.requires:
+            await done[requirement].wait()
+        await step.run(hook_kwargs, executor)
+        done[step].set()
+
+    with ThreadPoolExecutor(max_workers, thread_name_prefix="boot") as executor:
+        async with asyncio.TaskGroup() as task_group:
+            for step in steps:
+                task_group.create_task(run(step, executor))
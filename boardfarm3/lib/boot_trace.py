@@ -0,0 +1,330 @@
+"""Timeline of the boot of the devices.
+
+While tracing, the environment setup, its stages, the boot steps of each
+device and the commands executed on their consoles are recorded as spans.
+They are written out as a Chrome trace, to open with https://ui.perfetto.dev
+or chrome://tracing, with a process per device holding a thread for its boot
+steps and one per console, and as a summary table of the steps.
+
+The summary marks the critical path of the boot, from the step ending last
+back through the step which ended last before each one started, i.e. the one
+it most likely waited for.
+
+.. code-block:: python
+
+    with tracing("/var/log/boardfarm/session"):
+        with span("boardfarm_device_boot", "hook", device="board"):
+            board.boot()
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+_LOGGER = logging.getLogger(__name__)
+
+TRACE_FILE_NAME = "boot_trace.json"
+SUMMARY_FILE_NAME = "boot_summary.txt"
+
+# process of the spans outside of any device
+FRAMEWORK_PROCESS = "boardfarm"
+# thread of the boot steps of a device and of the framework spans
+BOOT_THREAD = "boot"
+_NAME_LENGTH = 80
+
+_DEVICE: ContextVar[str] = ContextVar("boot_trace_device", default=FRAMEWORK_PROCESS)
+_IN_COMMAND: ContextVar[bool] = ContextVar("boot_trace_in_command", default=False)
+_TRACE: BootTrace | None = None
+
+
+@dataclass(frozen=True)
+class Span:
+    """Timed operation, the times in seconds since the start of the trace."""
+
+    name: str
+    category: str
+    process: str
+    thread: str
+    start: float
+    duration: float
+    args: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def end(self) -> float:
+        """End time of the span.
+
+        :return: seconds since the start of the trace
+        :rtype: float
+        """
+        return self.start + self.duration
+
+
+class BootTrace:
+    """Thread safe recorder of the spans of a boot."""
+
+    def __init__(self) -> None:
+        """Start the trace clock."""
+        self._origin = time.perf_counter()
+        self._lock = Lock()
+        self.spans: list[Span] = []
+
+    @contextmanager
+    def span(
+        self, name: str, category: str, process: str, thread: str, **args: object
+    ) -> Iterator[None]:
+        """Record the time spent in the context as a span.
+
+        :param name: name of the span, e.g. the hook or the command
+        :type name: str
+        :param category: kind of span, i.e. setup, stage, hook or command
+        :type category: str
+        :param process: device of the span
+        :type process: str
+        :param thread: thread of the device, the boot steps or a console
+        :type thread: str
+        :param args: details shown with the span
+        :type args: object
+        :yield: once the span started
+        :rtype: Iterator[None]
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as exception:
+            args["error"] = type(exception).__name__
+            raise
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self.spans.append(
+                    Span(
+                        name,
+                        category,
+                        process,
+                        thread,
+                        start - self._origin,
+                        end - start,
+                        args,
+                    )
+                )
+
+    def chrome_trace(self) -> dict[str, Any]:
+        """Get the spans in the Chrome trace event format.
+
+        :return: JSON object with the trace events
+        :rtype: dict[str, Any]
+        """
+        processes: dict[str, int] = {FRAMEWORK_PROCESS: 0}
+        threads: dict[tuple[str, str], int] = {}
+        events: list[dict[str, Any]] = []
+        for span in sorted(self.spans, key=lambda span: span.start):
+            if span.process not in processes:
+                processes[span.process] = len(processes)
+            if (span.process, span.thread) not in threads:
+                # the boot steps come first in each process
+                threads[span.process, span.thread] = (
+                    0
+                    if span.thread == BOOT_THREAD
+                    else sum(process == span.process for process, _ in threads) + 1
+                )
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": round(span.start * 1e6),
+                    "dur": round(span.duration * 1e6),
+                    "pid": processes[span.process],
+                    "tid": threads[span.process, span.thread],
+                    "args": span.args,
+                }
+            )
+        metadata = [
+            {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": name}}
+            for name, pid in processes.items()
+        ]
+        metadata.extend(
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": processes[process],
+                "tid": tid,
+                "args": {"name": thread},
+            }
+            for (process, thread), tid in threads.items()
+        )
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+    def critical_path(self) -> list[Span]:
+        """Get the boot steps on the critical path of the boot.
+
+        :return: boot steps in start order
+        :rtype: list[Span]
+        """
+        steps = [span for span in self.spans if span.category == "hook"]
+        path = []
+        current = max(steps, key=lambda step: step.end, default=None)
+        while current is not None:
+            path.append(current)
+            start = current.start
+            current = max(
+                (step for step in steps if step.end <= start),
+                key=lambda step: step.end,
+                default=None,
+            )
+        return path[::-1]
+
+    def summary(self) -> str:
+        """Get a table of the stages and the boot steps of the devices.
+
+        :return: table with a line per stage and per boot step
+        :rtype: str
+        """
+        critical = {id(step) for step in self.critical_path()}
+        commands = [span for span in self.spans if span.category == "command"]
+        total = max((span.end for span in self.spans), default=0.0)
+        lines = [
+            f"Boot took {total:.1f}s, * marks the critical path",
+            "",
+            f"  {'start':>8} {'duration':>9} {'commands':>8} {'in cmds':>9}"
+            "  device / step",
+        ]
+        for span in sorted(self.spans, key=lambda span: span.start):
+            if span.category == "command":
+                continue
+            # the framework spans hold the commands of all the devices
+            in_span = [
+                command
+                for command in commands
+                if span.start <= command.start < span.end
+                and span.process in (FRAMEWORK_PROCESS, command.process)
+            ]
+            error = f" ({span.args['error']})" if "error" in span.args else ""
+            lines.append(
+                f"{'*' if id(span) in critical else ' '} {span.start:>7.1f}s"
+                f" {span.duration:>8.1f}s {len(in_span):>8}"
+                f" {sum(command.duration for command in in_span):>8.1f}s"
+                f"  {span.process} / {span.name}{error}"
+            )
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory: Path) -> None:
+        """Write the Chrome trace and the summary table.
+
+        :param directory: directory of the trace files, created if needed
+        :type directory: Path
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / TRACE_FILE_NAME).write_text(
+            json.dumps(self.chrome_trace()), encoding="utf-8"
+        )
+        (directory / SUMMARY_FILE_NAME).write_text(self.summary(), encoding="utf-8")
+
+
+@contextmanager
+def tracing(directory: str) -> Iterator[BootTrace | None]:
+    """Trace the boot in the context and write the trace files at its end.
+
+    The files are also written when the boot failed. Writing them is best
+    effort, an unwritable directory is logged and ignored.
+
+    :param directory: directory of the trace files, no tracing when empty
+    :type directory: str
+    :yield: the trace, None when not tracing
+    :rtype: Iterator[BootTrace | None]
+    """
+    global _TRACE  # noqa: PLW0603  # pylint: disable=global-statement
+    if not directory or _TRACE is not None:
+        yield None
+        return
+    trace = _TRACE = BootTrace()
+    try:
+        yield trace
+    finally:
+        _TRACE = None
+        try:
+            trace.write(Path(directory))
+        except OSError as exception:
+            _LOGGER.warning("could not write the boot trace: %s", exception)
+        else:
+            _LOGGER.info("Boot trace written to %s", Path(directory) / TRACE_FILE_NAME)
+
+
+@contextmanager
+def span(
+    name: str,
+    category: str,
+    device: str | None = None,
+    thread: str = BOOT_THREAD,
+    **args: object,
+) -> Iterator[None]:
+    """Record the context as a span of the current trace, if any.
+
+    The spans opened within the span of a device, also from the threads it
+    runs its blocking code in when the context is copied to them, belong to
+    that device.
+
+    :param name: name of the span, truncated to 80 characters
+    :type name: str
+    :param category: kind of span, i.e. setup, stage, hook or command
+    :type category: str
+    :param device: device of the span, defaults to the device of the
+        enclosing span
+    :type device: str | None
+    :param thread: thread of the device, defaults to its boot steps
+    :type thread: str
+    :param args: details shown with the span
+    :type args: object
+    :yield: once the span started
+    :rtype: Iterator[None]
+    """
+    trace = _TRACE
+    if trace is None:
+        yield
+        return
+    if len(name) > _NAME_LENGTH:
+        args.setdefault("full_name", name)
+        name = name[: _NAME_LENGTH - 3] + "..."
+    token = _DEVICE.set(device) if device is not None else None
+    try:
+        with trace.span(name, category, _DEVICE.get(), thread, **args):
+            yield
+    finally:
+        if token is not None:
+            _DEVICE.reset(token)
+
+
+@contextmanager
+def command_span(console: str, command: str) -> Iterator[None]:
+    """Record a command executed on a console of the current device.
+
+    The commands a command execution runs for it, e.g. execute_command
+    running execute_framed_command, are not recorded again.
+
+    :param console: name of the console session
+    :type console: str
+    :param command: command line
+    :type command: str
+    :yield: once the span started
+    :rtype: Iterator[None]
+    """
+    if _TRACE is None or _IN_COMMAND.get():
+        yield
+        return
+    token = _IN_COMMAND.set(True)
+    try:
+        with span(command, "command", thread=console):
+            yield
+    finally:
+        _IN_COMMAND.reset(token)
@@ -7,7 +7,10 @@ from boardfarm3.lib.boardfarm_pexpect import BoardfarmPexpect
 from boardfarm3.lib.connections.ldap_authenticated_serial import LdapAuthenticatedSerial
 from boardfarm3.lib.connections.local_cmd import LocalCmd
 from boardfarm3.lib.connections.ser2net_connection import Ser2NetConnection
-from boardfarm3.lib.connections.serial_connection import SerialConnection
+from boardfarm3.lib.connections.serial_connection import (
+    DirectSerialConnection,
+    SerialConnection,
+)
 from boardfarm3.lib.connections.ssh_connection import SSHConnection
 from boardfarm3.lib.connections.telnet import TelnetConnection
 
@@ -21,16 +24,20 @@ def connection_factory(
 
     :param connection_type: type of the connection
     :param connection_name: name of the connection
-    :param kwargs: arguments to the connection
+    :param kwargs: arguments to the connection, the optional ``search_window``
+        and ``buffer_size`` bound the output searched and kept by expect
     :returns: BoardfarmPexpect: connection of given type
     :raises EnvConfigError: when given connection type is not supported
     """
+    search_window = kwargs.pop("search_window", None)
+    buffer_size = kwargs.pop("buffer_size", None)
     connection_dispatcher = {
         "ssh_connection": SSHConnection,
         "authenticated_ssh": SSHConnection,
         "ldap_authenticated_serial": LdapAuthenticatedSerial,
         "local_cmd": LocalCmd,
         "serial": SerialConnection,
+        "direct_serial": DirectSerialConnection,
         "ser2net": _ser2net_param_parser,
         "telnet": _telnet_param_parser,
     }
@@ -38,7 +45,10 @@ def connection_factory(
     if connection_obj is not None and callable(connection_obj):
         if connection_type == "ssh_connection":
             kwargs.pop("password")
-        return connection_obj(connection_name, **kwargs)
+        connection = connection_obj(connection_name, **kwargs)
+        if search_window is not None or buffer_size is not None:
+            connection.set_search_window(search_window, buffer_size)
+        return connection
     # Handle unsupported connection types
     msg = f"Unsupported connection type: {connection_type}"
     raise EnvConfigError(msg)
@@ -57,6 +67,7 @@ def _telnet_param_parser(
             kwargs["port"],
             kwargs["shell_prompt"],
         ],
+        console_log_format=kwargs.get("console_log_format") or "text",
     )
 
 
@@ -73,4 +84,5 @@ def _ser2net_param_parser(
             kwargs["port"],
             kwargs["shell_prompt"],
         ],
+        kwargs.get("console_log_format") or "text",
     )
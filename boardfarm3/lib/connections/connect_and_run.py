@@ -1,17 +1,39 @@
-"""Connect and run module."""
+"""Connect and run module.
 
+Keeps runtime consoles connected across calls with a connection manager. The
+connection is opened on first use, probed by a keepalive thread and reopened
+with exponential backoff when it is found dead.
+"""
+
+import functools
+import logging
+import random
+import weakref
+from threading import Event, RLock, Thread
 from time import sleep
 from typing import Callable, ParamSpec, Protocol, TypeVar, runtime_checkable
 
+import pexpect
+
 from boardfarm3.exceptions import DeviceConnectionError
 
 P = ParamSpec("P")
 T = TypeVar("T")
 
+_LOGGER = logging.getLogger(__name__)
+_MANAGER_ATTRIBUTE = "_connection_manager"
+_MANAGER_LOCK = RLock()
+
 
 @runtime_checkable
 class RuntimeConnectable(Protocol):
-    """Runtine connectable protocol class."""
+    """Runtine connectable protocol class.
+
+    An implementation may also provide a ``keepalive_console()`` method which
+    raises DeviceConnectionError or pexpect.EOF when the console is dead. The
+    keepalive probes the connected consoles with it, without it a dead console
+    is only reconnected by the next call.
+    """
 
     def connect_console(self) -> None:
         """Connect to the console."""
@@ -23,48 +45,213 @@ class RuntimeConnectable(Protocol):
         """Get status of the connection."""
 
 
+class ConnectionManager:
+    """Keep the console of a runtime connectable instance connected."""
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        connectable: RuntimeConnectable,
+        keepalive_interval: float = 60.0,
+        max_attempts: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+    ) -> None:
+        """Initialize the connection manager.
+
+        :param connectable: instance owning the console
+        :type connectable: RuntimeConnectable
+        :param keepalive_interval: seconds between two console probes, 0 to
+            disable the keepalive. Defaults to 60
+        :type keepalive_interval: float
+        :param max_attempts: connection attempts before giving up, defaults to 5
+        :type max_attempts: int
+        :param backoff_base: delay before the second attempt, defaults to 1
+        :type backoff_base: float
+        :param backoff_max: upper bound of the delay between attempts, defaults
+            to 30
+        :type backoff_max: float
+        """
+        self._connectable = connectable
+        self._keepalive_interval = keepalive_interval
+        self._max_attempts = max_attempts
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+        self._lock = RLock()
+        self._stop = Event()
+        self._keepalive_thread: Thread | None = None
+
+    def _backoff_delay(self, attempt: int) -> float:
+        delay = min(self._backoff_max, self._backoff_base * 2**attempt)
+        # jitter spreads the reconnects of consoles which failed together
+        return random.uniform(delay / 2, delay)  # noqa: S311
+
+    def ensure_connected(self) -> None:
+        """Connect the console unless it is already connected.
+
+        :raises DeviceConnectionError: when all the connection attempts failed
+        """
+        with self._lock:
+            if self._connectable.is_console_connected():
+                return
+            for attempt in range(self._max_attempts):
+                try:
+                    self._connectable.connect_console()
+                    break
+                except DeviceConnectionError as exc:
+                    if attempt == self._max_attempts - 1:
+                        raise
+                    delay = self._backoff_delay(attempt)
+                    _LOGGER.warning(
+                        "Connection attempt %s failed (%s), retrying in %.1fs",
+                        attempt + 1,
+                        exc,
+                        delay,
+                    )
+                    sleep(delay)
+            self._start_keepalive()
+
+    def run(self, func: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        """Run the function with the console connected.
+
+        The console stays connected afterwards. It is disconnected when the
+        function fails with a connection error, so the next call reconnects.
+
+        :param func: function using the console
+        :type func: Callable[P, T]
+        :param args: positional arguments of the function
+        :param kwargs: keyword arguments of the function
+        :return: return value of the function
+        :rtype: T
+        """
+        with self._lock:
+            self.ensure_connected()
+            try:
+                return func(*args, **kwargs)
+            except (DeviceConnectionError, pexpect.EOF):
+                self._drop_connection()
+                raise
+
+    def check(self) -> None:
+        """Probe the console and reconnect it when it is dead.
+
+        A console which is not connected, e.g. disconnected on purpose, is
+        left alone.
+        """
+        with self._lock:
+            keepalive = getattr(self._connectable, "keepalive_console", None)
+            if not (callable(keepalive) and self._connectable.is_console_connected()):
+                return
+            try:
+                keepalive()
+            except (DeviceConnectionError, pexpect.EOF) as exc:
+                _LOGGER.warning("Dead console detected (%s), reconnecting", exc)
+                self._drop_connection()
+                self.ensure_connected()
+
+    def close(self) -> None:
+        """Stop the keepalive and disconnect the console."""
+        self._stop.set()
+        with self._lock:
+            self._drop_connection()
+
+    def _drop_connection(self) -> None:
+        try:
+            if self._connectable.is_console_connected():
+                self._connectable.disconnect_console()
+        except (DeviceConnectionError, pexpect.ExceptionPexpect, OSError):
+            _LOGGER.debug("Failed to disconnect a dead console", exc_info=True)
+
+    def _start_keepalive(self) -> None:
+        if not self._keepalive_interval or self._keepalive_thread is not None:
+            return
+        self._keepalive_thread = Thread(
+            target=_keepalive,
+            args=(weakref.ref(self), self._stop, self._keepalive_interval),
+            name=f"keepalive-{type(self._connectable).__name__}",
+            daemon=True,
+        )
+        self._keepalive_thread.start()
+
+    def check_if_idle(self) -> None:
+        """Probe the console unless a call is using it."""
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self.check()
+        except DeviceConnectionError:
+            _LOGGER.exception("Keepalive failed to reconnect the console")
+        finally:
+            self._lock.release()
+
+
+def _keepalive(
+    manager_ref: weakref.ReferenceType[ConnectionManager],
+    stop: Event,
+    interval: float,
+) -> None:
+    # only a weak reference, the thread ends once the instance is collected
+    while not stop.wait(interval):
+        manager = manager_ref()
+        if manager is None:
+            return
+        manager.check_if_idle()
+        del manager
+
+
+def get_connection_manager(instance: RuntimeConnectable) -> ConnectionManager:
+    """Return the connection manager of the given instance.
+
+    :param instance: instance owning the console
+    :type instance: RuntimeConnectable
+    :return: connection manager, created on first use
+    :rtype: ConnectionManager
+    """
+    with _MANAGER_LOCK:
+        manager = getattr(instance, _MANAGER_ATTRIBUTE, None)
+        if manager is None:
+            manager = ConnectionManager(instance)
+            setattr(instance, _MANAGER_ATTRIBUTE, manager)
+        return manager
+
+
+def close_connection_manager(instance: RuntimeConnectable) -> None:
+    """Stop the keepalive of the given instance and disconnect its console.
+
+    A later call of a connect_and_run method connects the console again.
+
+    :param instance: instance owning the console
+    :type instance: RuntimeConnectable
+    """
+    with _MANAGER_LOCK:
+        manager = getattr(instance, _MANAGER_ATTRIBUTE, None)
+        if manager is None:
+            return
+        delattr(instance, _MANAGER_ATTRIBUTE)
+    manager.close()
+
+
 def connect_and_run(func: Callable[P, T]) -> Callable[P, T]:
-    """Connect run and disconnect to console at runtime.
+    """Run the decorated method with the console of the instance connected.
+
+    The console is connected on first use and kept open across calls by the
+    ConnectionManager of the instance.
 
     Note: This is implemented only for instance methods
 
     :param func: the decorated method
-    :return: True or False
+    :return: the wrapped method
     :rtype: Callable[P, T]
     """
 
+    @functools.wraps(func)
     def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
         instance = args[0]
-        exc_to_raise = None
-        conn_exception = None
         if not isinstance(instance, RuntimeConnectable):
             msg = (
                 f"Provided instance {instance} do not ,"
                 f"follows the protocol RuntimeConnectable .i.e {RuntimeConnectable}"
             )
             raise TypeError(msg)
-
-        if not instance.is_console_connected():
-            # Adding a retry
-            for _ in range(10):
-                try:
-                    instance.connect_console()
-                    break
-                except DeviceConnectionError as exc:
-                    conn_exception = exc
-                    sleep(15)
-            else:
-                raise conn_exception
-
-        try:
-            output = func(*args, **kwargs)
-        except Exception as e:  # noqa: BLE001 pylint: disable=W0718
-            exc_to_raise = e
-        finally:
-            if instance.is_console_connected():
-                instance.disconnect_console()
-        if exc_to_raise:
-            raise exc_to_raise
-        return output
+        return get_connection_manager(instance).run(func, *args, **kwargs)
 
     return wrapper
@@ -24,6 +24,7 @@ class LdapAuthenticatedSerial(SSHConnection):
         shell_prompt: list[str],
         port: int = 22,
         save_console_logs: str = "",
+        console_log_format: str = "text",
         **kwargs: dict[str, Any],  # ignore other arguments  # noqa: ARG002
     ) -> None:
         """Initialize ldap authenticated serial connection.
@@ -40,6 +41,9 @@ class LdapAuthenticatedSerial(SSHConnection):
         :type port: int
         :param save_console_logs: save console logs to disk, defaults to ""
         :type save_console_logs: str
+        :param console_log_format: format of the saved console logs,
+            defaults to text
+        :type console_log_format: str
         :param kwargs: other keyword arguments
         :raises ValueError: invalid LDAP credentials
         """
@@ -55,6 +59,8 @@ class LdapAuthenticatedSerial(SSHConnection):
             port,
             password,
             save_console_logs,
+            multiplex=False,
+            console_log_format=console_log_format,
         )
 
     def login_to_server(self, password: str | None = None) -> None:
@@ -82,10 +88,11 @@ class LdapAuthenticatedSerial(SSHConnection):
         # The SSH channel does not start to display data post connection.
         # Instead the user needs to enter some key to refresh. e.g. ENTER
         # This is generally due to poor connection.
-        # Providing a few input below and flushing the buffer after 5 sec.
+        # Providing a few input below and flushing the buffer once the console
+        # is quiet, after 5 sec at most.
         self.sendline()
         self.sendline()
-        self.expect(pexpect.TIMEOUT, timeout=5)
+        self.wait_until_quiet(idle_time=2, timeout=5)
 
     async def login_to_server_async(self, password: str | None = None) -> None:
         """Login to serial server.
@@ -113,7 +120,8 @@ class LdapAuthenticatedSerial(SSHConnection):
         # The SSH channel does not start to display data post connection.
         # Instead the user needs to enter some key to refresh. e.g. ENTER
         # This is generally due to poor connection.
-        # Providing a few input below and flushing the buffer after 5 sec.
+        # Providing a few input below and flushing the buffer once the console
+        # is quiet, after 5 sec at most.
         self.sendline()
         self.sendline()
-        await self.expect(pexpect.TIMEOUT, timeout=5, async_=True)
+        await self.wait_until_quiet_async(idle_time=2, timeout=5)
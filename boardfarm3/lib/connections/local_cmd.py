@@ -7,7 +7,7 @@ from typing import Any
 import pexpect
 
 from boardfarm3.exceptions import DeviceConnectionError
-from boardfarm3.lib.boardfarm_pexpect import BoardfarmPexpect
+from boardfarm3.lib.boardfarm_pexpect import BoardfarmPexpect, traced_command
 
 _CONNECTION_ERROR_THRESHOLD = 2
 _CONNECTION_FAILED_STR: str = "Connection failed with Local Command"
@@ -38,16 +38,19 @@ class LocalCmd(BoardfarmPexpect):
         :type shell_prompt: list[str]
         :param args: arguments to the command, defaults to None
         :type args: list[str], optional
-        :param kwargs: additional keyword args
+        :param kwargs: additional keyword args, ``console_log_format`` is the
+            format of the saved console logs
         """
         self._shell_prompt = shell_prompt
         if args is None:
             args = []
+        console_log_format = str(kwargs.pop("console_log_format", None) or "text")
         super().__init__(
             name,
             conn_command,
             save_console_logs,
             args,
+            console_log_format,
             **kwargs,
         )
 
@@ -80,6 +83,36 @@ class LocalCmd(BoardfarmPexpect):
         ):
             raise DeviceConnectionError(_CONNECTION_FAILED_STR)
 
+    async def login_to_server_async(self, password: str | None = None) -> None:
+        """Login using asyncio.
+
+        :param password: ssh password
+        :raises DeviceConnectionError: connection failed via local command
+        :raises ValueError: if shell prompt is unavailable
+        """
+        if password is not None:
+            if await self.expect(
+                ["password:", pexpect.EOF, pexpect.TIMEOUT],
+                async_=True,
+            ):
+                raise DeviceConnectionError(_CONNECTION_FAILED_STR)
+            self.sendline(password)
+        if not self._shell_prompt:
+            raise ValueError(_SHELL_PROMPT_UNAVAILABLE_STR)
+        if (
+            await self.expect(
+                [
+                    pexpect.EOF,
+                    pexpect.TIMEOUT,
+                    *self._shell_prompt,
+                ],
+                async_=True,
+            )
+            < _CONNECTION_ERROR_THRESHOLD
+        ):
+            raise DeviceConnectionError(_CONNECTION_FAILED_STR)
+
+    @traced_command
     def execute_command(self, command: str, timeout: int = -1) -> str:
         """Execute a command in the local command session.
 
@@ -87,6 +120,8 @@ class LocalCmd(BoardfarmPexpect):
         :param timeout: timeout in seconds. defaults to -1
         :returns: command output
         """
+        if self.framed_execution:
+            return self.execute_framed_command(command, timeout)[0]
         self.sendline(command)
         self.expect_exact(command)
         self.expect(self.linesep)
@@ -94,4 +129,21 @@ class LocalCmd(BoardfarmPexpect):
         self.expect(self._shell_prompt, timeout=timeout)
         return self.get_last_output()
 
+    @traced_command
+    async def execute_command_async(self, command: str, timeout: int = -1) -> str:
+        """Execute a command in the local command session using asyncio.
+
+        :param command: command to execute
+        :param timeout: timeout in seconds. defaults to -1
+        :returns: command output
+        """
+        if self.framed_execution:
+            output = await self.execute_framed_command_async(command, timeout)
+            return output[0]
+        self.sendline(command)
+        await self.expect_exact(command, async_=True)
+        await self.expect(self.linesep, async_=True)
+        await self.expect(self._shell_prompt, timeout=timeout, async_=True)
+        return self.get_last_output()
+
     # pylint: enable=duplicate-code
@@ -31,6 +31,7 @@ class Ser2NetConnection(TelnetConnection):
         command: str,
         save_console_logs: str,
         args: list[str],
+        console_log_format: str = "text",
     ) -> None:
         """Initialize the Ser2Net connection.
 
@@ -42,6 +43,9 @@ class Ser2NetConnection(TelnetConnection):
         :type save_console_logs: str
         :param args: additional arguments to the command
         :type args: list[str  |  list[str]]
+        :param console_log_format: format of the saved console logs,
+            defaults to text
+        :type console_log_format: str
         """
         self._ip_addr, self._port = args[0], args[1]
         super().__init__(
@@ -49,6 +53,7 @@ class Ser2NetConnection(TelnetConnection):
             command,
             save_console_logs,
             args,
+            console_log_format,
         )
 
     async def login_to_server_async(self, password: str | None = None) -> None:
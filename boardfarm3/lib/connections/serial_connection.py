@@ -6,13 +6,35 @@ Basically a local command with no authentication on connection.
 from __future__ import annotations
 
 import os
+import termios
 from typing import Any
 
-from pexpect import EOF
+from pexpect import EOF, TIMEOUT
+from pexpect.spawnbase import SpawnBase
+from pexpect.utils import select_ignore_interrupts
 
 from boardfarm3.exceptions import DeviceConnectionError
+from boardfarm3.lib.boardfarm_pexpect import BoardfarmPexpect, traced_command
 from boardfarm3.lib.connections.local_cmd import LocalCmd
 
+_BAUD_RATE = 115200
+_READ_CHUNK_SIZE = 2000
+# control characters sent for the non alphabetic sendcontrol() arguments
+_CONTROL = {
+    "@": 0,
+    "`": 0,
+    "[": 27,
+    "{": 27,
+    "\\": 28,
+    "|": 28,
+    "]": 29,
+    "}": 29,
+    "^": 30,
+    "~": 30,
+    "_": 31,
+    "?": 127,
+}
+
 
 class SerialConnection(LocalCmd):
     """Connect to a device with local serail command.
@@ -44,7 +66,6 @@ class SerialConnection(LocalCmd):
         :param args: arguments to the command, defaults to None
         :type args: list[str], optional
         :param kwargs: additional keyword args
-        :raises DeviceConnectionError: on connection failure
         """
         if args is None:
             args = conn_command.split()
@@ -58,18 +79,34 @@ class SerialConnection(LocalCmd):
         super().__init__(
             name, conn_command, save_console_logs, shell_prompt, args, **kwargs
         )
+
+    # pylint: disable=duplicate-code
+    def login_to_server(self, password: str | None = None) -> None:  # noqa: ARG002
+        """No authentication, wait for the serial terminal to be ready.
+
+        :param password: unused
+        :raises DeviceConnectionError: on connection failure
+        """
         try:
             self.expect("Terminal ready", 5)
         except EOF as exc:
             raise DeviceConnectionError(self.before) from exc
 
-    # pylint: disable=duplicate-code
-    def login_to_server(self, password: str | None = None) -> None:
-        """Do not do anything, just connect.
+    async def login_to_server_async(
+        self,
+        password: str | None = None,  # noqa: ARG002
+    ) -> None:
+        """No authentication, wait for the serial terminal to be ready.
 
         :param password: unused
+        :raises DeviceConnectionError: on connection failure
         """
+        try:
+            await self.expect("Terminal ready", 5, async_=True)
+        except EOF as exc:
+            raise DeviceConnectionError(self.before) from exc
 
+    @traced_command
     def execute_command(self, command: str, timeout: int = -1) -> str:
         """Execute a command in the local command session.
 
@@ -77,6 +114,8 @@ class SerialConnection(LocalCmd):
         :param timeout: timeout in seconds. defaults to -1
         :returns: command output
         """
+        if self.framed_execution:
+            return self.execute_framed_command(command, timeout)[0]
         self.sendline(command)
         self.expect_exact(command)
         self.expect(self.linesep)
@@ -84,4 +123,237 @@ class SerialConnection(LocalCmd):
         self.expect(self._shell_prompt, timeout=timeout)
         return self.get_last_output()
 
+    @traced_command
+    async def execute_command_async(self, command: str, timeout: int = -1) -> str:
+        """Execute a command in the local command session using asyncio.
+
+        :param command: command to execute
+        :param timeout: timeout in seconds. defaults to -1
+        :returns: command output
+        """
+        if self.framed_execution:
+            output = await self.execute_framed_command_async(command, timeout)
+            return output[0]
+        self.sendline(command)
+        await self.expect_exact(command, async_=True)
+        await self.expect(self.linesep, async_=True)
+        await self.expect(self._shell_prompt, timeout=timeout, async_=True)
+        return self.get_last_output()
+
     # pylint: enable=duplicate-code
+
+
+class DirectSerialConnection(SerialConnection):
+    """Connect to a device by opening its serial tty directly.
+
+    No terminal program is spawned, the console reads and writes the tty
+    file descriptor. The connection command is the tty path optionally
+    followed by the baud rate and the flow control, e.g.
+    ``/dev/ttyUSB0 115200 rtscts``.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,super-init-not-called
+        self,
+        name: str,
+        conn_command: str,
+        save_console_logs: str,
+        shell_prompt: list[str] | None = None,
+        args: list[str] | None = None,  # noqa: ARG002
+        **kwargs: Any,  # noqa: ANN401
+    ) -> None:
+        """Open and configure the serial tty.
+
+        :param name: connection name
+        :type name: str
+        :param conn_command: tty path, optional baud rate and flow control
+        :type conn_command: str
+        :param save_console_logs: save console logs to disk
+        :type save_console_logs: str
+        :param shell_prompt: shell prompt pattern, defaults to None
+        :type shell_prompt: list[str]
+        :param args: unused, kept for the connection factory
+        :type args: list[str], optional
+        :param kwargs: ``baud_rate``, ``flow_control`` (none, xonxoff or
+            rtscts) and ``read_chunk_size`` override the connection command,
+            ``console_log_format`` is the format of the saved console logs,
+            other keyword args are ignored
+        :raises DeviceConnectionError: when the tty cannot be opened
+        """
+        port, *settings = conn_command.split()
+        # missing settings default to 115200 baud without flow control
+        settings += [str(_BAUD_RATE), "none"][len(settings) :]
+        baud_rate = int(kwargs.get("baud_rate") or settings[0])
+        flow_control = str(kwargs.get("flow_control") or settings[1])
+        self._shell_prompt = shell_prompt
+        try:
+            fd = os.open(port, os.O_RDWR | os.O_NOCTTY)
+        except OSError as exc:
+            msg = f"Failed to open {port}: {exc}"
+            raise DeviceConnectionError(msg) from exc
+        try:
+            _configure_tty(fd, baud_rate, flow_control)
+        except (ValueError, termios.error):
+            os.close(fd)
+            raise
+        BoardfarmPexpect.__init__(
+            self,
+            name,
+            None,
+            save_console_logs,
+            [],
+            kwargs.get("console_log_format") or "text",
+        )
+        self.child_fd = fd
+        self.name = f"<{port}>"
+        self.maxread = int(kwargs.get("read_chunk_size") or _READ_CHUNK_SIZE)
+        self._flag_eof = False
+
+    @property
+    def flag_eof(self) -> bool:
+        """Return True once the tty reported end of file.
+
+        :return: True on end of file
+        :rtype: bool
+        """
+        return self._flag_eof
+
+    @flag_eof.setter
+    def flag_eof(self, value: bool) -> None:
+        self._flag_eof = value
+
+    def login_to_server(self, password: str | None = None) -> None:
+        """Do not do anything, the tty is ready once opened.
+
+        :param password: unused
+        """
+
+    async def login_to_server_async(
+        self,
+        password: str | None = None,
+    ) -> None:
+        """Do not do anything, the tty is ready once opened.
+
+        :param password: unused
+        """
+
+    def read_nonblocking(self, size: int = 1, timeout: float | None = -1) -> str:
+        """Read at most size characters from the tty.
+
+        :param size: maximum number of bytes read, defaults to 1
+        :type size: int
+        :param timeout: seconds to wait for data, defaults to -1 (session timeout)
+        :type timeout: float | None
+        :raises TIMEOUT: when no data was received in time
+        :return: data read from the tty
+        :rtype: str
+        """
+        if timeout == -1:
+            timeout = self.timeout
+        readable, _, _ = select_ignore_interrupts([self.child_fd], [], [], timeout)
+        if not readable:
+            msg = "Timeout exceeded."
+            raise TIMEOUT(msg)
+        return SpawnBase.read_nonblocking(self, size)
+
+    def sendcontrol(self, char: str) -> int:
+        """Send a control character, e.g. "c" for Ctrl-C.
+
+        :param char: control character
+        :type char: str
+        :return: number of bytes written
+        :rtype: int
+        """
+        char = char.lower()
+        code = ord(char) - ord("a") + 1 if "a" <= char <= "z" else _CONTROL[char]
+        return self.send(chr(code))
+
+    def sendintr(self) -> int:
+        """Send Ctrl-C.
+
+        :return: number of bytes written
+        :rtype: int
+        """
+        return self.sendcontrol("c")
+
+    def sendeof(self) -> int:
+        """Send Ctrl-D.
+
+        :return: number of bytes written
+        :rtype: int
+        """
+        return self.sendcontrol("d")
+
+    def setwinsize(self, rows: int, cols: int) -> None:
+        """Do not do anything, the size of a serial terminal is not negotiated.
+
+        :param rows: unused
+        :type rows: int
+        :param cols: unused
+        :type cols: int
+        """
+
+    def isalive(self) -> bool:
+        """Return True while the tty is open.
+
+        :return: True while the tty is open
+        :rtype: bool
+        """
+        if self.child_fd == -1:
+            return False
+        try:
+            os.fstat(self.child_fd)
+        except OSError:
+            return False
+        return True
+
+    def close(self, force: bool = True) -> None:  # noqa: ARG002
+        """Close the tty.
+
+        :param force: unused, there is no child process
+        :type force: bool
+        """
+        if self.child_fd != -1:
+            os.close(self.child_fd)
+            self.child_fd = -1
+            self.closed = True
+        self._close_console_log()
+
+
+def _configure_tty(fd: int, baud_rate: int, flow_control: str) -> None:
+    speed = getattr(termios, f"B{baud_rate}", None)
+    if speed is None:
+        msg = f"Unsupported baud rate {baud_rate}"
+        raise ValueError(msg)
+    if flow_control not in ("none", "xonxoff", "rtscts"):
+        msg = f"Unsupported flow control {flow_control!r}"
+        raise ValueError(msg)
+    iflag, oflag, cflag, lflag, _, _, control_chars = termios.tcgetattr(fd)
+    # raw 8N1, the device does the line editing
+    iflag &= ~(
+        termios.IGNBRK
+        | termios.BRKINT
+        | termios.PARMRK
+        | termios.ISTRIP
+        | termios.INLCR
+        | termios.IGNCR
+        | termios.ICRNL
+        | termios.IXON
+        | termios.IXOFF
+        | termios.IXANY
+    )
+    oflag &= ~termios.OPOST
+    lflag &= ~(termios.ECHO | termios.ECHONL | termios.ICANON | termios.ISIG)
+    lflag &= ~termios.IEXTEN
+    cflag &= ~(termios.CSIZE | termios.PARENB | termios.CSTOPB | termios.CRTSCTS)
+    cflag |= termios.CS8 | termios.CREAD | termios.CLOCAL
+    if flow_control == "xonxoff":
+        iflag |= termios.IXON | termios.IXOFF
+    elif flow_control == "rtscts":
+        cflag |= termios.CRTSCTS
+    control_chars[termios.VMIN] = 1
+    control_chars[termios.VTIME] = 0
+    termios.tcsetattr(
+        fd,
+        termios.TCSANOW,
+        [iflag, oflag, cflag, lflag, speed, speed, control_chars],
+    )
@@ -2,15 +2,34 @@
 
 from __future__ import annotations
 
+import asyncio
+import subprocess
 from typing import Any
 
 import pexpect
 
-from boardfarm3.exceptions import BoardfarmException, DeviceConnectionError
-from boardfarm3.lib.boardfarm_pexpect import BoardfarmPexpect
+from boardfarm3.exceptions import (
+    BoardfarmException,
+    DeviceConnectionError,
+    NotSupportedError,
+)
+from boardfarm3.lib.boardfarm_pexpect import BoardfarmPexpect, traced_command
 
 _CONNECTION_ERROR_THRESHOLD = 2
 _CONNECTION_FAILED_STR: str = "Connection failed to SSH server"
+_PASSWORD_INDEX = 0
+_EOF_TIMEOUT_INDEXES = (1, 2)
+_MASTER_CHECK_TIMEOUT = 10
+
+# OpenSSH connection multiplexing options. The first connection to a host
+# becomes the master, every later ssh/scp to the same user@host:port reuses
+# its socket and skips the TCP, key exchange and password handshake. The
+# socket is per local user (%i), the one of another user cannot be opened.
+SSH_MULTIPLEXING_OPTIONS = (
+    "-o ControlMaster=auto",
+    "-o ControlPath=/tmp/bf-ssh-%i-%C",
+    "-o ControlPersist=300",
+)
 
 
 class SSHConnection(BoardfarmPexpect):
@@ -25,6 +44,8 @@ class SSHConnection(BoardfarmPexpect):
         port: int = 22,
         password: str | None = None,
         save_console_logs: str = "",
+        multiplex: bool = True,
+        console_log_format: str = "text",
         **kwargs: dict[str, Any],  # ignore other arguments  # noqa: ARG002
     ) -> None:
         """Initialize SSH connection.
@@ -43,6 +64,11 @@ class SSHConnection(BoardfarmPexpect):
         :type password: str
         :param save_console_logs: save console logs, defaults to ""
         :type save_console_logs: str
+        :param multiplex: share one ssh master connection, defaults to True
+        :type multiplex: bool
+        :param console_log_format: format of the saved console logs,
+            defaults to text
+        :type console_log_format: str
         :param kwargs: other keyword arguments
         """
         self._shell_prompt = shell_prompt
@@ -58,7 +84,124 @@ class SSHConnection(BoardfarmPexpect):
             "-o IdentitiesOnly=yes",
             "-o HostKeyAlgorithms=+ssh-rsa",
         ]
-        super().__init__(name, "ssh", save_console_logs, args)
+        if multiplex:
+            args.extend(SSH_MULTIPLEXING_OPTIONS)
+        self._ssh_args = args
+        self._multiplex = multiplex
+        self._master_up = False
+        super().__init__(name, "ssh", save_console_logs, args, console_log_format)
+
+    @property
+    def is_exec_supported(self) -> bool:
+        """Whether commands can run out of band through :meth:`exec`.
+
+        The master connection lives at least as long as the console session,
+        so it is only checked until it is found.
+
+        :return: True if the connection is multiplexed and its master
+            connection is up, see ``ssh -O check``
+        :rtype: bool
+        """
+        if not self._multiplex or self._master_up:
+            return self._master_up
+        try:
+            self._master_up = (
+                subprocess.run(  # noqa: S603
+                    ["ssh", *self._ssh_args, "-O", "check"],  # noqa: S607
+                    capture_output=True,
+                    timeout=_MASTER_CHECK_TIMEOUT,
+                    check=False,
+                ).returncode
+                == 0
+            )
+        except subprocess.TimeoutExpired:
+            return False
+        return self._master_up
+
+    def _get_exec_args(self, command: str) -> list[str]:
+        if not self._multiplex:
+            msg = "exec requires a multiplexed SSH connection"
+            raise NotSupportedError(msg)
+        # BatchMode avoids hanging on a password prompt when the master
+        # connection is gone, no pty keeps stdout and stderr separated
+        return ["ssh", *self._ssh_args, "-T", "-o BatchMode=yes", command]
+
+    def exec(self, command: str, timeout: int = 30) -> subprocess.CompletedProcess:
+        """Execute a command over a separate non-interactive SSH channel.
+
+        The interactive console is not touched, hence the command neither
+        waits for nor disturbs whatever currently runs on the console.
+
+        :param command: command to execute
+        :type command: str
+        :param timeout: timeout in seconds, defaults to 30
+        :type timeout: int
+        :return: stdout, stderr and exit code of the command
+        :rtype: subprocess.CompletedProcess
+        :raises pexpect.TIMEOUT: when the command did not complete in time
+        """
+        try:
+            return subprocess.run(  # noqa: S603
+                self._get_exec_args(command),
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+                check=False,
+            )
+        except subprocess.TimeoutExpired as exception:
+            msg = f"{self.name}: {command!r} did not complete in {timeout}s"
+            raise pexpect.TIMEOUT(msg) from exception
+
+    def open_exec_channel(self, command: str) -> subprocess.Popen:
+        """Start a command on a separate channel and talk to it through pipes.
+
+        Suited to long running helpers reading requests on their stdin, the
+        caller owns the returned process and must close it.
+
+        :param command: command to start
+        :type command: str
+        :return: the ssh process, with binary stdin and stdout pipes
+        :rtype: subprocess.Popen
+        """
+        return subprocess.Popen(  # noqa: S603
+            self._get_exec_args(command),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    async def exec_async(
+        self, command: str, timeout: int = 30
+    ) -> subprocess.CompletedProcess:
+        """Execute a command over a separate non-interactive SSH channel.
+
+        :param command: command to execute
+        :type command: str
+        :param timeout: timeout in seconds, defaults to 30
+        :type timeout: int
+        :return: stdout, stderr and exit code of the command
+        :rtype: subprocess.CompletedProcess
+        :raises pexpect.TIMEOUT: when the command did not complete in time
+        """
+        args = self._get_exec_args(command)
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except TimeoutError as exception:
+            process.kill()
+            await process.wait()
+            msg = f"{self.name}: {command!r} did not complete in {timeout}s"
+            raise pexpect.TIMEOUT(msg) from exception
+        return subprocess.CompletedProcess(
+            args,
+            process.returncode,
+            stdout.decode("utf-8", errors="ignore"),
+            stderr.decode("utf-8", errors="ignore"),
+        )
 
     async def login_to_server_async(self, password: str | None = None) -> None:
         """Login to SSH session.
@@ -68,11 +211,15 @@ class SSHConnection(BoardfarmPexpect):
         """
         if password is None:
             password = self._password
-        if await self.expect(
-            ["password:", pexpect.EOF, pexpect.TIMEOUT],
+        index = await self.expect(
+            ["password:", pexpect.EOF, pexpect.TIMEOUT, *self._shell_prompt],
             async_=True,
-        ):
+        )
+        if index in _EOF_TIMEOUT_INDEXES:
             raise DeviceConnectionError(_CONNECTION_FAILED_STR)
+        if index != _PASSWORD_INDEX:
+            # already authenticated through the multiplexed master connection
+            return
         self.sendline(password)
         if (
             await self.expect(
@@ -95,10 +242,14 @@ class SSHConnection(BoardfarmPexpect):
         """
         if password is None:
             password = self._password
-        if self.expect(
-            ["password:", pexpect.EOF, pexpect.TIMEOUT],
-        ):
+        index = self.expect(
+            ["password:", pexpect.EOF, pexpect.TIMEOUT, *self._shell_prompt],
+        )
+        if index in _EOF_TIMEOUT_INDEXES:
             raise DeviceConnectionError(_CONNECTION_FAILED_STR)
+        if index != _PASSWORD_INDEX:
+            # already authenticated through the multiplexed master connection
+            return
         self.sendline(password)
         if (
             self.expect(
@@ -112,6 +263,7 @@ class SSHConnection(BoardfarmPexpect):
         ):
             raise DeviceConnectionError(_CONNECTION_FAILED_STR)
 
+    @traced_command
     def execute_command(self, command: str, timeout: int = -1) -> str:
         """Execute a command in the SSH session.
 
@@ -119,12 +271,15 @@ class SSHConnection(BoardfarmPexpect):
         :param timeout: timeout in seconds. defaults to -1
         :returns: command output
         """
+        if self.framed_execution:
+            return self.execute_framed_command(command, timeout)[0]
         self.sendline(command)
         self.expect_exact(command)
         self.expect(self.linesep)
         self.expect(self._shell_prompt, timeout=timeout)
         return self.get_last_output()
 
+    @traced_command
     async def execute_command_async(self, command: str, timeout: int = -1) -> str:
         """Execute a command in the SSH session.
 
@@ -132,6 +287,9 @@ class SSHConnection(BoardfarmPexpect):
         :param timeout: timeout in seconds. defaults to -1
         :returns: command output
         """
+        if self.framed_execution:
+            output = await self.execute_framed_command_async(command, timeout)
+            return output[0]
         self.sendline(command)
         await self.expect_exact(command, async_=True)
         await self.expect(self.linesep, async_=True)
@@ -5,7 +5,7 @@ from __future__ import annotations
 import pexpect
 
 from boardfarm3.exceptions import DeviceConnectionError
-from boardfarm3.lib.boardfarm_pexpect import BoardfarmPexpect
+from boardfarm3.lib.boardfarm_pexpect import BoardfarmPexpect, traced_command
 
 
 class TelnetConnection(BoardfarmPexpect):
@@ -17,6 +17,7 @@ class TelnetConnection(BoardfarmPexpect):
         command: str,
         save_console_logs: str,
         args: list[str],
+        console_log_format: str = "text",
     ) -> None:
         """Initialize the Ser2Net connection.
 
@@ -28,13 +29,22 @@ class TelnetConnection(BoardfarmPexpect):
         :type save_console_logs: str
         :param args: additional arguments to the command
         :type args: list[str]
+        :param console_log_format: format of the saved console logs,
+            defaults to text
+        :type console_log_format: str
         """
-        self._ip_addr, self._port, self._shell_prompt = args[0], args[1], args.pop(2)
+        self._ip_addr, self._port = args[0], args[1]
+        # the devices pass the list of their prompts
+        shell_prompt = args.pop(2)
+        self._shell_prompt = (
+            [shell_prompt] if isinstance(shell_prompt, str) else list(shell_prompt)
+        )
         super().__init__(
             session_name=session_name,
             command=command,
             save_console_logs=save_console_logs,
             args=args,
+            console_log_format=console_log_format,
         )
 
     async def login_to_server_async(self, password: str | None = None) -> None:
@@ -83,6 +93,7 @@ class TelnetConnection(BoardfarmPexpect):
                 msg,
             )
 
+    @traced_command
     def execute_command(self, command: str, timeout: int = 30) -> str:
         """Execute a command in the Telnet session.
 
@@ -93,11 +104,14 @@ class TelnetConnection(BoardfarmPexpect):
         :return: command output
         :rtype: str
         """
+        if self.framed_execution:
+            return self.execute_framed_command(command, timeout)[0]
         self.sendline(command)
         self.expect_exact(command)
         self.expect(self._shell_prompt, timeout=timeout)
         return self.get_last_output()
 
+    @traced_command
     async def execute_command_async(self, command: str, timeout: int = -1) -> str:
         """Execute a command in the Telnet session.
 
@@ -105,6 +119,9 @@ class TelnetConnection(BoardfarmPexpect):
         :param timeout: timeout in seconds. defaults to -1
         :returns: command output
         """
+        if self.framed_execution:
+            output = await self.execute_framed_command_async(command, timeout)
+            return output[0]
         self.sendline(command)
         await self.expect_exact(command, async_=True)
         await self.expect(self.linesep, async_=True)
@@ -0,0 +1,269 @@
+"""Time indexed compressed console log store.
+
+Console lines are written to a data file as independently compressed
+segments. A sparse index file holds the time range and the location of each
+segment, so the lines around a timestamp are found with a binary search and
+only the matching segments are decompressed. Nothing is rotated away.
+
+Segments are compressed with zstd when the ``zstandard`` package is installed,
+zlib otherwise. The codec is recorded in the index.
+"""
+
+from __future__ import annotations
+
+import struct
+import time
+import zlib
+from bisect import bisect_left
+from itertools import accumulate
+from logging import Handler, LogRecord
+from pathlib import Path
+from typing import IO, TYPE_CHECKING
+
+try:
+    import zstandard
+except ImportError:  # optional, segments are compressed with zlib without it
+    zstandard = None
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+_INDEX_MAGIC = b"BFCLIDX1"
+# magic, codec name
+_INDEX_HEADER = struct.Struct("!8s8s")
+# first timestamp, last timestamp, data file offset, compressed size
+_INDEX_ENTRY = struct.Struct("!ddQQ")
+_CODECS = ("zstd", "zlib")
+_SEGMENT_SIZE = 256 * 1024
+_SEGMENT_AGE = 60.0
+
+
+def _default_codec() -> str:
+    return "zlib" if zstandard is None else "zstd"
+
+
+def _compress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return zlib.compress(data, 6)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            msg = "zstandard package is required to read this console log store"
+            raise ValueError(msg)
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def _index_path(path: Path) -> Path:
+    return path.with_name(f"{path.name}.idx")
+
+
+def _read_index(path: Path) -> tuple[str, list[tuple[float, float, int, int]]]:
+    data = _index_path(path).read_bytes()
+    magic, codec_name = _INDEX_HEADER.unpack_from(data)
+    codec = codec_name.rstrip(b"\0").decode()
+    if magic != _INDEX_MAGIC or codec not in _CODECS:
+        msg = f"{_index_path(path)} is not a console log store index"
+        raise ValueError(msg)
+    body = data[_INDEX_HEADER.size :]
+    # a partially written last entry is ignored
+    body = body[: len(body) - len(body) % _INDEX_ENTRY.size]
+    return codec, list(_INDEX_ENTRY.iter_unpack(body))
+
+
+def _format_line(timestamp: float, text: str) -> str:
+    # same layout as the "%(asctime)s %(message)s" plain text console logs
+    seconds = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
+    return f"{seconds},{int(timestamp % 1 * 1000):03d} {text}\n"
+
+
+class ConsoleLogStoreHandler(Handler):
+    """Logging handler writing console lines to a time indexed store."""
+
+    def __init__(
+        self,
+        path: Path,
+        codec: str | None = None,
+        segment_size: int = _SEGMENT_SIZE,
+        segment_age: float = _SEGMENT_AGE,
+    ) -> None:
+        """Initialize the console log store handler.
+
+        An existing store is appended to, using the codec it was created with.
+
+        :param path: data file of the store, the index is written next to it
+            with an ``.idx`` suffix
+        :type path: Path
+        :param codec: zstd or zlib, defaults to zstd when available
+        :type codec: str | None
+        :param segment_size: uncompressed bytes per segment, defaults to 256 KiB
+        :type segment_size: int
+        :param segment_age: seconds after which a segment is written even if
+            it is not full, defaults to 60
+        :type segment_age: float
+        :raises ValueError: on an unknown codec
+        """
+        super().__init__()
+        self.path = path
+        self._segment_size = segment_size
+        self._segment_age = segment_age
+        self._lines: list[bytes] = []
+        self._pending = 0
+        self._first = 0.0
+        self._last = 0.0
+        end = 0
+        if _index_path(path).exists() and path.exists():
+            self.codec, entries = _read_index(path)
+            if entries:
+                end = entries[-1][2] + entries[-1][3]
+        else:
+            self.codec = codec or _default_codec()
+            if self.codec not in _CODECS:
+                msg = f"Unknown console log store codec {self.codec!r}"
+                raise ValueError(msg)
+            _index_path(path).write_bytes(
+                _INDEX_HEADER.pack(_INDEX_MAGIC, self.codec.encode())
+            )
+            path.write_bytes(b"")
+        self._data: IO[bytes] = path.open("r+b")
+        # drop a segment written without its index entry by a crashed run
+        self._data.truncate(end)
+        self._data.seek(end)
+        self._index: IO[bytes] = _index_path(path).open("ab")
+
+    def emit(self, record: LogRecord) -> None:
+        """Buffer the lines of the record and write a segment when full.
+
+        :param record: log record of console output
+        :type record: LogRecord
+        """
+        try:
+            timestamp = record.created
+            if not self._lines:
+                self._first = self._last = timestamp
+            self._first = min(self._first, timestamp)
+            self._last = max(self._last, timestamp)
+            for line in record.getMessage().splitlines() or [""]:
+                encoded = f"{timestamp:.6f} {line}\n".encode()
+                self._lines.append(encoded)
+                self._pending += len(encoded)
+            if (
+                self._pending >= self._segment_size
+                or self._last - self._first >= self._segment_age
+            ):
+                self._write_segment()
+        except Exception:  # noqa: BLE001
+            self.handleError(record)
+
+    def flush(self) -> None:
+        """Write the buffered lines as a segment."""
+        with self.lock:
+            self._write_segment()
+
+    def close(self) -> None:
+        """Write the buffered lines and close the store files."""
+        with self.lock:
+            if not self._data.closed:
+                self._write_segment()
+                self._data.close()
+                self._index.close()
+        super().close()
+
+    def _write_segment(self) -> None:
+        if not self._lines or self._data.closed:
+            return
+        data = _compress(self.codec, b"".join(self._lines))
+        offset = self._data.tell()
+        self._data.write(data)
+        self._data.flush()
+        self._index.write(_INDEX_ENTRY.pack(self._first, self._last, offset, len(data)))
+        self._index.flush()
+        self._lines = []
+        self._pending = 0
+
+
+class ConsoleLogStore:
+    """Reader of a store written by ConsoleLogStoreHandler."""
+
+    def __init__(self, path: Path | str) -> None:
+        """Load the index of the store.
+
+        :param path: data file of the store
+        :type path: Path | str
+        :raises ValueError: when the index is not a console log store index
+        """
+        self.path = Path(path)
+        self.codec, self._entries = _read_index(self.path)
+        # running maximum, keeps the bisect valid if the clock went backwards
+        self._last_times = list(accumulate((entry[1] for entry in self._entries), max))
+
+    @property
+    def time_range(self) -> tuple[float, float] | None:
+        """Timestamps of the first and last lines in the store.
+
+        :return: first and last timestamps, None for an empty store
+        :rtype: tuple[float, float] | None
+        """
+        if not self._entries:
+            return None
+        return min(entry[0] for entry in self._entries), self._last_times[-1]
+
+    def read(
+        self,
+        start: float | None = None,
+        end: float | None = None,
+    ) -> Iterator[tuple[float, str]]:
+        """Iterate over the lines logged between two timestamps.
+
+        :param start: epoch timestamp of the first line, defaults to the
+            beginning of the store
+        :type start: float | None
+        :param end: epoch timestamp of the last line, defaults to the end of
+            the store
+        :type end: float | None
+        :yield: timestamp and text of each line
+        """
+        first = 0 if start is None else bisect_left(self._last_times, start)
+        with self.path.open("rb") as data_file:
+            for first_time, _, offset, size in self._entries[first:]:
+                if end is not None and first_time > end:
+                    return
+                data_file.seek(offset)
+                segment = _decompress(self.codec, data_file.read(size))
+                for line in segment.decode(errors="replace").splitlines():
+                    timestamp_text, _, text = line.partition(" ")
+                    timestamp = float(timestamp_text)
+                    if start is not None and timestamp < start:
+                        continue
+                    if end is not None and timestamp > end:
+                        return
+                    yield timestamp, text
+
+    def export(
+        self,
+        destination: Path | str,
+        start: float | None = None,
+        end: float | None = None,
+    ) -> int:
+        """Write the lines between two timestamps to a plain text log.
+
+        :param destination: text file to write
+        :type destination: Path | str
+        :param start: epoch timestamp of the first line, defaults to the
+            beginning of the store
+        :type start: float | None
+        :param end: epoch timestamp of the last line, defaults to the end of
+            the store
+        :type end: float | None
+        :return: number of lines written
+        :rtype: int
+        """
+        count = 0
+        with Path(destination).open("w", encoding="utf-8") as text_file:
+            for timestamp, text in self.read(start, end):
+                text_file.write(_format_line(timestamp, text))
+                count += 1
+        return count
@@ -0,0 +1,141 @@
+"""Pool of secondary console sessions of a device.
+
+The primary console of a device runs the commands of the test, long running
+background jobs (tcpdump, iperf server, logread follower) are better started
+on a secondary session so that their output does not interleave with it.
+"""
+
+from __future__ import annotations
+
+import logging
+from contextlib import contextmanager, suppress
+from threading import Condition
+from typing import TYPE_CHECKING
+
+import pexpect
+
+from boardfarm3.exceptions import DeviceConnectionError
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Generator
+
+    from boardfarm3.lib.boardfarm_pexpect import BoardfarmPexpect
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ConsolePool:
+    """Pool of independent console sessions opened on demand."""
+
+    def __init__(
+        self,
+        factory: Callable[[int], BoardfarmPexpect],
+        max_size: int,
+    ) -> None:
+        """Initialize the console pool.
+
+        :param factory: open and log into a new session, called with a
+            counter starting at 1 to name the session
+        :type factory: Callable[[int], BoardfarmPexpect]
+        :param max_size: maximum number of sessions open at once, 0 when the
+            device connection does not allow more than one session
+        :type max_size: int
+        """
+        self._factory = factory
+        self.max_size = max_size
+        self._idle: list[BoardfarmPexpect] = []
+        self._in_use: set[BoardfarmPexpect] = set()
+        self._opening = 0
+        self._opened = 0
+        self._condition = Condition()
+
+    @property
+    def size(self) -> int:
+        """Number of open sessions.
+
+        :return: idle and in use sessions
+        :rtype: int
+        """
+        with self._condition:
+            return len(self._idle) + len(self._in_use)
+
+    def acquire(self, timeout: float | None = None) -> BoardfarmPexpect:
+        """Take a session from the pool, opening a new one if needed.
+
+        :param timeout: seconds to wait for a session to be released when the
+            pool is full, None to wait forever. Defaults to None
+        :type timeout: float | None
+        :raises DeviceConnectionError: when no session is available in time
+        :return: logged in console session reserved for the caller
+        :rtype: BoardfarmPexpect
+        """
+        with self._condition:
+            if not self._condition.wait_for(self._has_capacity, timeout):
+                msg = f"No console session available out of {self.max_size}"
+                raise DeviceConnectionError(msg)
+            while self._idle:
+                console = self._idle.pop()
+                if console.isalive():
+                    self._in_use.add(console)
+                    return console
+                _LOGGER.debug("Discarding dead console session %s", console.name)
+            self._opening += 1
+            self._opened += 1
+            index = self._opened
+        # the login may be slow, the other sessions stay available meanwhile
+        try:
+            console = self._factory(index)
+        finally:
+            with self._condition:
+                self._opening -= 1
+                self._condition.notify()
+        with self._condition:
+            self._in_use.add(console)
+        return console
+
+    def release(self, console: BoardfarmPexpect) -> None:
+        """Give a session back to the pool.
+
+        :param console: session returned by acquire
+        :type console: BoardfarmPexpect
+        :raises ValueError: when the session does not belong to the pool
+        """
+        with self._condition:
+            if console not in self._in_use:
+                msg = f"{console.name} is not in use from this pool"
+                raise ValueError(msg)
+            self._in_use.remove(console)
+            if console.isalive():
+                self._idle.append(console)
+            self._condition.notify()
+
+    @contextmanager
+    def session(
+        self, timeout: float | None = None
+    ) -> Generator[BoardfarmPexpect, None, None]:
+        """Reserve a session for the duration of a with block.
+
+        :param timeout: seconds to wait for a session, None to wait forever
+        :type timeout: float | None
+        :yield: logged in console session
+        """
+        console = self.acquire(timeout)
+        try:
+            yield console
+        finally:
+            self.release(console)
+
+    def close(self) -> None:
+        """Close all the sessions of the pool, including the ones in use."""
+        with self._condition:
+            consoles = [*self._idle, *self._in_use]
+            self._idle.clear()
+            self._in_use.clear()
+            self._condition.notify_all()
+        for console in consoles:
+            # a session which died with its connection has nothing left to close
+            with suppress(pexpect.ExceptionPexpect, OSError):
+                console.close()
+
+    def _has_capacity(self) -> bool:
+        return bool(self._idle) or (len(self._in_use) + self._opening < self.max_size)
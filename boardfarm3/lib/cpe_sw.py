@@ -6,13 +6,17 @@ import re
 from ipaddress import IPv4Address, IPv4Network, IPv6Address, IPv6Interface
 from typing import TYPE_CHECKING, Any, cast
 
-import pexpect
 from jc import parse
 
 from boardfarm3.exceptions import BoardfarmException
 from boardfarm3.lib.dmcli import DMCLIAPI
+from boardfarm3.lib.link_monitor import wait_for_interface
 from boardfarm3.lib.network_utils import NetworkUtility
 from boardfarm3.lib.networking import IptablesFirewall, is_link_up
+from boardfarm3.lib.parsers.ip_json_parser import (
+    IP_JSON_ADDR_COMMAND,
+    parse_ip_json_addr,
+)
 from boardfarm3.templates.cpe.cpe_sw import CPESW
 
 if TYPE_CHECKING:
@@ -22,6 +26,7 @@ if TYPE_CHECKING:
 
     from boardfarm3.lib.boardfarm_pexpect import BoardfarmPexpect
     from boardfarm3.lib.custom_typing.jc import ParsedPSOutput
+    from boardfarm3.lib.dataclass.interface import InterfaceFacts
     from boardfarm3.templates.cpe.cpe_hw import CPEHW
 
 
@@ -39,6 +44,8 @@ class CPESwLibraries(CPESW):
         self._nw_utility = NetworkUtility(self._get_console("networking"))
         self._firewall = IptablesFirewall(self._get_console("networking"))
         self._dmcli = DMCLIAPI(hardware.get_console("console"))
+        # None until the first query tells if ``ip -json`` is available
+        self._ip_json_supported: bool | None = None
 
     @property
     def _console(self) -> BoardfarmPexpect:
@@ -110,6 +117,12 @@ class CPESwLibraries(CPESW):
             msg = f"Unsupported mode: {mode}"
             raise ValueError(msg)
         online: bool = True
+        if (facts := self.get_interface_facts(self.erouter_iface)) is not None:
+            if mode in ["dual", "ipv4"]:
+                online &= bool(facts.ipv4)
+            if mode in ["dual", "ipv6"]:
+                online &= any(address.is_global for address in facts.ipv6)
+            return online
         try:
             if mode in ["dual", "ipv4"]:
                 online &= bool(self.get_interface_ipv4addr(self.erouter_iface))
@@ -119,6 +132,27 @@ class CPESwLibraries(CPESW):
             online = False
         return online
 
+    def get_interface_facts(self, interface: str) -> InterfaceFacts | None:
+        """Return the addresses, MAC address and MTU of an interface at once.
+
+        The facts come from a single ``ip -json addr`` query. When the CPE has
+        no JSON capable ``ip`` (e.g. busybox) None is returned and the
+        interface getters fall back to ``ifconfig``.
+
+        :param interface: interface name
+        :type interface: str
+        :return: facts of the interface, None if ``ip -json`` is not available
+        :rtype: InterfaceFacts | None
+        """
+        if self._ip_json_supported is False:
+            return None
+        output = self._get_console("networking").execute_command(
+            f"{IP_JSON_ADDR_COMMAND} {interface}",
+        )
+        facts = parse_ip_json_addr(output, interface)
+        self._ip_json_supported = facts is not None
+        return facts
+
     def _get_nw_interface_ip_address(
         self,
         interface_name: str,
@@ -130,6 +164,8 @@ class CPESwLibraries(CPESW):
         :param is_ipv6: is ipv6 address
         :returns: IP address list
         """
+        if (facts := self.get_interface_facts(interface_name)) is not None:
+            return [str(ip.ip) for ip in (facts.ipv6 if is_ipv6 else facts.ipv4)]
         prefix = "inet6" if is_ipv6 else "inet"
         ip_regex = prefix + r"\s(?:addr:)?\s*([^\s/]+)"
         output = self._get_console("networking").execute_command(
@@ -190,6 +226,9 @@ class CPESwLibraries(CPESW):
         :return: netmask of the interface
         :rtype: IPv4Address
         """
+        facts = self.get_interface_facts(interface)
+        if facts is not None and facts.ipv4:
+            return facts.ipv4[0].netmask
         output = self._get_console("networking").execute_command(
             f"ifconfig {interface}",
         )
@@ -200,17 +239,30 @@ class CPESwLibraries(CPESW):
         self,
         interface: str,
         pattern: str = "BROADCAST,MULTICAST,UP",
+        timeout: float = 0,
     ) -> bool:
         """Check given interface is up or not.
 
+        With a timeout the link events of the interface are monitored until it
+        is up, see link_monitor.wait_for_interface.
+
         :param interface: interface name, defaults to "BROADCAST,MULTICAST,UP"
         :type interface: str
         :param pattern: interface state
         :type pattern: str
+        :param timeout: seconds to wait for the link to come up, defaults to 0
+            (checked once)
+        :type timeout: float
         :return: True if the link is up
         :rtype: bool
         """
-        return is_link_up(self._get_console("networking"), interface, pattern)
+        console = self._get_console("networking")
+        return wait_for_interface(
+            console,
+            interface,
+            lambda: is_link_up(console, interface, pattern),
+            timeout,
+        )
 
     def get_interface_mac_addr(self, interface: str) -> str:
         """Return given interface mac address.
@@ -218,12 +270,35 @@ class CPESwLibraries(CPESW):
         :param interface: interface name
         :return: mac address of the given interface
         """
+        facts = self.get_interface_facts(interface)
+        if facts is not None and facts.mac_address:
+            return facts.mac_address
         return (
             self._get_console("networking")
             .execute_command(f"cat /sys/class/net/{interface}/address")
             .strip()
         )
 
+    def get_interface_mtu_size(self, interface: str) -> int:
+        """Get the MTU size of the interface in bytes.
+
+        :param interface: name of the interface
+        :type interface: str
+        :return: size of the MTU in bytes
+        :rtype: int
+        :raises ValueError: when ifconfig data is not available
+        """
+        facts = self.get_interface_facts(interface)
+        if facts is not None and facts.mtu is not None:
+            return facts.mtu
+        if ifconfig_data := parse(
+            "ifconfig",
+            self._get_console("default_shell").execute_command(f"ifconfig {interface}"),
+        ):
+            return int(ifconfig_data[0]["mtu"])  # type: ignore[index]
+        msg = f"ifconfig {interface} is not available"
+        raise ValueError(msg)
+
     def is_tr069_connected(self) -> bool:
         """Is TR-69 agent is connected.
 
@@ -278,20 +353,22 @@ class CPESwLibraries(CPESW):
         """
         raise NotImplementedError
 
-    def get_board_logs(self, timeout: int = 300) -> str:
-        """Get the console log for the time period mentioned.
+    def get_board_logs(self, timeout: int = 300, idle_time: float = 2.0) -> str:
+        """Get the console log until the console goes quiet.
 
-        :param timeout: time value to collect the logs for, defaults to 300
+        :param timeout: maximum time to collect the logs for, defaults to 300
         :type timeout: int
-        :return: Console logs for a given time period
+        :param idle_time: seconds without console output after which the logs
+            are returned, defaults to 2
+        :type idle_time: float
+        :return: Console logs until the console went quiet
         :rtype: str
         :raises BoardfarmException: if the console is not initialised,
             i.e. board has no console connections
         """
         if self._console:
             self._console.sendline()
-            self._console.expect(pexpect.TIMEOUT, timeout=timeout)
-            return str(self._console.before)
+            return self._console.wait_until_quiet(idle_time, timeout)
         msg = "Console obj is not initialized"
         raise BoardfarmException(msg)
 
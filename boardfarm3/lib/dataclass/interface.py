@@ -2,11 +2,11 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from ipaddress import IPv4Address, IPv6Address
+    from ipaddress import IPv4Address, IPv4Interface, IPv6Address, IPv6Interface
 
 
 @dataclass
@@ -16,3 +16,16 @@ class IPAddresses:
     ipv4: IPv4Address | None
     ipv6: IPv6Address | None
     link_local_ipv6: IPv6Address | None
+
+
+@dataclass
+class InterfaceFacts:
+    """To store the facts of a network interface queried at once."""
+
+    name: str
+    mac_address: str = ""
+    mtu: int | None = None
+    state: str = ""
+    flags: list[str] = field(default_factory=list)
+    ipv4: list[IPv4Interface] = field(default_factory=list)
+    ipv6: list[IPv6Interface] = field(default_factory=list)
@@ -9,6 +9,10 @@ from time import sleep
 from boardfarm3.exceptions import BoardfarmException
 from boardfarm3.lib.boardfarm_pexpect import BoardfarmPexpect
 
+# shell variables of SPV_batch
+_SPV_FAILED = "_dmcli_spv_failed"
+_SPV_OUTPUT = "_dmcli_spv_output"
+
 
 class DMCLIError(BoardfarmException):
     """Raise this on DMCLI command line utility errors."""
@@ -47,6 +51,12 @@ class DMCLIAPI:
             timeout=60,
         )
         sleep(sleep_timeout)
+        return self._parse_dmcli_output(operation, param, command_output)
+
+    @staticmethod
+    def _parse_dmcli_output(
+        operation: str, param: str, command_output: str
+    ) -> DMCLIOut:
         regex_match = re.search(
             r"Execution (fail|succeed)(.*)|(Can't find destination component)",
             command_output,
@@ -111,3 +121,38 @@ class DMCLIAPI:
         :rtype: DMCLIOut
         """
         return self._trigger_dmcli_cmd("deltable", param)
+
+    def SPV_batch(  # pylint: disable=invalid-name
+        self, params: list[tuple[str, str, str]]
+    ) -> list[DMCLIOut]:
+        """Set the given parameters via dmcli in a single console round trip.
+
+        The parameters are set in the given order. As with a sequence of SPV
+        calls, the first failure stops the batch, the parameters after it are
+        left untouched.
+
+        :param params: list of (param, value, type) to be set
+        :type params: list[tuple[str, str, str]]
+        :return: dmcli output objects, one per parameter
+        :rtype: list[DMCLIOut]
+        :raises DMCLIError: on the first parameter which could not be set
+        """
+        # the shell skips the sets following a failed one
+        commands = [
+            f'if [ -z "${_SPV_FAILED}" ]; then'
+            f" {_SPV_OUTPUT}=$(dmcli eRT setvalues {param} {type_set} {value});"
+            f' echo "${_SPV_OUTPUT}";'
+            f' case "${_SPV_OUTPUT}" in *"Execution succeed"*) ;;'
+            f" *) {_SPV_FAILED}=1 ;; esac; fi"
+            for param, value, type_set in params
+        ]
+        if commands:
+            commands[0] = f"unset {_SPV_FAILED}; {commands[0]}"
+        return [
+            self._parse_dmcli_output(
+                "setvalues", f"{param} {type_set} {value}", command_output
+            )
+            for (param, value, type_set), (command_output, _) in zip(
+                params, self._console.execute_batch(commands, timeout=60)
+            )
+        ]
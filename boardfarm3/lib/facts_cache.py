@@ -0,0 +1,199 @@
+"""Cache of the facts queried from a device.
+
+Use cases ask the same devices the same questions (addresses, routes,
+hostname, ...) many times within a step. The answers are kept per kind of
+fact until a method changing that kind of fact is called on the device. The
+kinds which also change on their own, outside of the device object, are only
+reused for a few seconds.
+
+Getters are decorated with ``cached_fact`` and mutating methods with
+``invalidates_facts``, both expect the instance to have a ``facts_cache``
+attribute holding a FactsCache.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import time
+from threading import RLock
+from typing import TYPE_CHECKING, Any, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Hashable
+
+T = TypeVar("T")
+
+INTERFACES = "interfaces"
+ROUTES = "routes"
+HOSTNAME = "hostname"
+DATE = "date"
+PROCESSES = "processes"
+
+# processes come and go on their own, addresses and routes change with DHCP
+# renewals, SLAAC or a reboot of the CPE: their answers are only reused briefly.
+# The clock offset drifts or jumps on NTP sync and reboot, more slowly.
+_DEFAULT_MAX_AGE = {INTERFACES: 2.0, ROUTES: 2.0, PROCESSES: 2.0, DATE: 30.0}
+
+
+class FactsCache:
+    """Per device cache of facts, invalidated by kind of fact."""
+
+    def __init__(self, max_age: dict[str, float] | None = None) -> None:
+        """Initialize the facts cache.
+
+        :param max_age: seconds a kind of fact is reused at most, kinds not
+            listed are kept until invalidated. Defaults to 2 seconds for
+            interfaces, routes and processes and 30 seconds for the date
+        :type max_age: dict[str, float] | None
+        """
+        self._max_age = _DEFAULT_MAX_AGE if max_age is None else max_age
+        self._facts: dict[str, dict[Hashable, tuple[float, Any]]] = {}
+        self._lock = RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, kind: str, key: Hashable) -> tuple[bool, Any]:
+        with self._lock:
+            entry = self._facts.get(kind, {}).get(key)
+            max_age = self._max_age.get(kind)
+            if entry is not None and (
+                max_age is None or time.monotonic() - entry[0] <= max_age
+            ):
+                self.hits += 1
+                return True, entry[1]
+            self.misses += 1
+            return False, None
+
+    def _store(self, kind: str, key: Hashable, value: T) -> T:
+        with self._lock:
+            self._facts.setdefault(kind, {})[key] = (time.monotonic(), value)
+        return value
+
+    def get(self, kind: str, key: Hashable, fetch: Callable[[], T]) -> T:
+        """Return the cached fact, fetching it from the device on a miss.
+
+        :param kind: kind of fact, e.g. interfaces or routes
+        :type kind: str
+        :param key: identifies the fact within its kind
+        :type key: Hashable
+        :param fetch: queries the fact from the device
+        :type fetch: Callable[[], T]
+        :return: the fact
+        :rtype: T
+        """
+        found, value = self._lookup(kind, key)
+        if found:
+            return value
+        return self._store(kind, key, fetch())
+
+    async def get_async(
+        self,
+        kind: str,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[T]],
+    ) -> T:
+        """Return the cached fact, fetching it from the device on a miss.
+
+        :param kind: kind of fact, e.g. interfaces or routes
+        :type kind: str
+        :param key: identifies the fact within its kind
+        :type key: Hashable
+        :param fetch: queries the fact from the device
+        :type fetch: Callable[[], Awaitable[T]]
+        :return: the fact
+        :rtype: T
+        """
+        found, value = self._lookup(kind, key)
+        if found:
+            return value
+        return self._store(kind, key, await fetch())
+
+    def invalidate(self, *kinds: str) -> None:
+        """Forget the facts of the given kinds, all the facts if none given.
+
+        :param kinds: kinds of facts to forget
+        :type kinds: str
+        """
+        with self._lock:
+            if not kinds:
+                self._facts.clear()
+            for kind in kinds:
+                self._facts.pop(kind, None)
+
+
+def _fact_key(func: Callable[..., Any], args: tuple, kwargs: dict) -> Hashable:
+    return (func.__name__, args, tuple(sorted(kwargs.items())))
+
+
+def cached_fact(kind: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Cache the return value of the decorated getter as a fact of a kind.
+
+    :param kind: kind of fact returned by the getter
+    :type kind: str
+    :return: decorator of the getter
+    :rtype: Callable[[Callable[..., T]], Callable[..., T]]
+    """
+
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+                return await self.facts_cache.get_async(
+                    kind,
+                    _fact_key(func, args, kwargs),
+                    lambda: func(self, *args, **kwargs),
+                )
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> T:  # noqa: ANN401
+            return self.facts_cache.get(
+                kind,
+                _fact_key(func, args, kwargs),
+                lambda: func(self, *args, **kwargs),
+            )
+
+        return wrapper
+
+    return decorator
+
+
+def invalidates_facts(*kinds: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Forget the facts of the given kinds around the decorated method.
+
+    The facts are forgotten before the call, so that the method reads fresh
+    facts after its change, and after it, also when it failed half way.
+
+    :param kinds: kinds of facts changed by the method
+    :type kinds: str
+    :return: decorator of the mutating method
+    :rtype: Callable[[Callable[..., T]], Callable[..., T]]
+    """
+
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+                self.facts_cache.invalidate(*kinds)
+                try:
+                    return await func(self, *args, **kwargs)
+                finally:
+                    self.facts_cache.invalidate(*kinds)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> T:  # noqa: ANN401
+            self.facts_cache.invalidate(*kinds)
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                self.facts_cache.invalidate(*kinds)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,310 @@
+"""Checksummed, resumable and parallel file transfers with devices.
+
+Files are streamed over non-interactive SSH exec channels, which reuse the
+multiplexed (or key authenticated) connection of the device, instead of
+spawning an interactive ``scp`` session answering password prompts for each
+file. Any number of transfers run side by side, see run_transfers.
+
+A transfer is written to ``<path>.part`` first. An interrupted transfer is
+resumed from the size of its part file by the next transfer of the same file,
+and the sha256 digests of both ends are compared before the part file is
+renamed into place. A resumed transfer whose digests differ, e.g. the part
+file of an older version of the file, is restarted from scratch once. Like
+scp, an upload keeps the permissions of the local file. With compression the stream is gzipped on the fly on the
+device and (de)compressed locally.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import shlex
+import stat
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import IO, TYPE_CHECKING
+
+from boardfarm3.exceptions import SCPConnectionError
+
+if TYPE_CHECKING:
+    import subprocess
+    from collections.abc import Callable, Iterable
+
+_LOGGER = logging.getLogger(__name__)
+_CHUNK_SIZE = 256 * 1024
+_MAX_WORKERS = 4
+# exit code of the shell for a command which is not installed
+_COMMAND_NOT_FOUND = 127
+
+
+@dataclass
+class TransferResult:
+    """Outcome of a file transfer."""
+
+    source: str
+    destination: str
+    size: int
+    sha256: str | None
+    resumed_from: int = 0
+
+
+# process and flush functions of a streaming gzip (de)compressor
+_Codec = tuple["Callable[[bytes], bytes]", "Callable[[], bytes]"]
+
+
+def _gzip_codec(compress: bool) -> _Codec:
+    if compress:
+        compressor = zlib.compressobj(wbits=31)
+        return compressor.compress, compressor.flush
+    decompressor = zlib.decompressobj(wbits=31)
+    return decompressor.decompress, decompressor.flush
+
+
+def _sha256(path: Path) -> str:
+    with path.open("rb") as source:
+        return hashlib.file_digest(source, "sha256").hexdigest()
+
+
+class FileTransfer:
+    """Transfers files between the local host and a device."""
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[str, int], subprocess.CompletedProcess],
+        open_channel: Callable[[str], subprocess.Popen],
+        timeout: int = 300,
+    ) -> None:
+        """Initialize the file transfer service of a device.
+
+        :param name: device name, used in the error messages
+        :type name: str
+        :param run: runs a command on the device with a timeout, e.g.
+            SSHConnection.exec
+        :type run: Callable[[str, int], subprocess.CompletedProcess]
+        :param open_channel: starts a command on the device with binary stdin
+            and stdout pipes, e.g. SSHConnection.open_exec_channel
+        :type open_channel: Callable[[str], subprocess.Popen]
+        :param timeout: seconds a single transfer may take, defaults to 300
+        :type timeout: int
+        """
+        self._name = name
+        self._run = run
+        self._open_channel = open_channel
+        self._timeout = timeout
+
+    def _remote_size(self, path: str) -> int | None:
+        result = self._run(f"wc -c < {shlex.quote(path)}", 30)
+        return int(result.stdout) if result.returncode == 0 else None
+
+    def _remote_sha256(self, path: str) -> str | None:
+        result = self._run(f"sha256sum {shlex.quote(path)}", self._timeout)
+        if result.returncode == _COMMAND_NOT_FOUND:
+            _LOGGER.warning("%s: sha256sum not found, not verified", self._name)
+            return None
+        if result.returncode != 0:
+            msg = f"{self._name}: failed to checksum {path}: {result.stderr}"
+            raise SCPConnectionError(msg)
+        return result.stdout.split()[0]
+
+    def _pipe(
+        self,
+        command: str,
+        local_file: IO[bytes],
+        download: bool,
+        codec: _Codec | None,
+    ) -> None:
+        process = self._open_channel(command)
+        source, destination = (
+            (process.stdout, local_file) if download else (local_file, process.stdin)
+        )
+        # a hung transfer is killed, which ends the copy loop below
+        timer = threading.Timer(self._timeout, process.kill)
+        timer.start()
+        try:
+            for chunk in iter(lambda: source.read(_CHUNK_SIZE), b""):
+                destination.write(codec[0](chunk) if codec else chunk)
+            if codec:
+                destination.write(codec[1]())
+            if process.stdin is not None:
+                process.stdin.close()
+            exit_code = process.wait()
+        except (OSError, zlib.error) as exc:
+            process.kill()
+            process.wait()
+            msg = f"{self._name}: {command!r} failed: {exc}"
+            raise SCPConnectionError(msg) from exc
+        finally:
+            timer.cancel()
+            if process.stdout is not None:
+                process.stdout.close()
+        if exit_code != 0:
+            msg = f"{self._name}: {command!r} failed with exit code {exit_code}"
+            raise SCPConnectionError(msg)
+
+    def download(
+        self,
+        remote_path: str,
+        local_path: str | Path,
+        resume: bool = True,
+        compress: bool = False,
+        verify: bool = True,
+    ) -> TransferResult:
+        """Copy a file from the device.
+
+        :param remote_path: file on the device
+        :type remote_path: str
+        :param local_path: local file to write, or the directory to write it in
+        :type local_path: str | Path
+        :param resume: continue an interrupted download of the file, defaults
+            to True
+        :type resume: bool
+        :param compress: gzip the file on the device while it is sent
+        :type compress: bool
+        :param verify: compare the sha256 digests of both ends, defaults to True
+        :type verify: bool
+        :return: outcome of the transfer
+        :rtype: TransferResult
+        :raises SCPConnectionError: when the file is missing, the transfer
+            failed or the digests differ
+        """
+        local = Path(local_path)
+        if local.is_dir():
+            local /= PurePosixPath(remote_path).name
+        part = local.with_name(f"{local.name}.part")
+        size = self._remote_size(remote_path)
+        if size is None:
+            msg = f"{self._name}: {remote_path} not found"
+            raise SCPConnectionError(msg)
+        offset = part.stat().st_size if resume and part.exists() else 0
+        if offset > size:
+            offset = 0
+        command = (
+            f"tail -c +{offset + 1} {shlex.quote(remote_path)}"
+            if offset
+            else f"cat {shlex.quote(remote_path)}"
+        )
+        if compress:
+            command += " | gzip -c"
+        with part.open("ab" if offset else "wb") as destination:
+            self._pipe(
+                command,
+                destination,
+                download=True,
+                codec=_gzip_codec(compress=False) if compress else None,
+            )
+        digest = self._remote_sha256(remote_path) if verify else None
+        if digest is not None and _sha256(part) != digest:
+            part.unlink()
+            if offset:
+                _LOGGER.warning(
+                    "%s: stale part of %s, downloading it again", self._name, local
+                )
+                return self.download(remote_path, local, False, compress, verify)
+            msg = f"{self._name}: checksum mismatch on {remote_path}"
+            raise SCPConnectionError(msg)
+        part.replace(local)
+        return TransferResult(
+            remote_path, str(local), local.stat().st_size, digest, offset
+        )
+
+    def upload(
+        self,
+        local_path: str | Path,
+        remote_path: str,
+        resume: bool = True,
+        compress: bool = False,
+        verify: bool = True,
+    ) -> TransferResult:
+        """Copy a file to the device.
+
+        :param local_path: local file to copy
+        :type local_path: str | Path
+        :param remote_path: file to write on the device, or the directory to
+            write it in
+        :type remote_path: str
+        :param resume: continue an interrupted upload of the file, defaults
+            to True
+        :type resume: bool
+        :param compress: gzip the file while it is sent
+        :type compress: bool
+        :param verify: compare the sha256 digests of both ends, defaults to True
+        :type verify: bool
+        :return: outcome of the transfer
+        :rtype: TransferResult
+        :raises SCPConnectionError: when the transfer failed or the digests
+            differ
+        """
+        local = Path(local_path)
+        local_stat = local.stat()
+        size = local_stat.st_size
+        if self._run(f"test -d {shlex.quote(remote_path)}", 30).returncode == 0:
+            remote_path = f"{remote_path.rstrip('/')}/{local.name}"
+        part = shlex.quote(f"{remote_path}.part")
+        offset = (self._remote_size(f"{remote_path}.part") or 0) if resume else 0
+        if offset > size:
+            offset = 0
+        command = f"cat {'>>' if offset else '>'} {part}"
+        if compress:
+            command = f"gzip -dc {'>>' if offset else '>'} {part}"
+        with local.open("rb") as source:
+            source.seek(offset)
+            self._pipe(
+                command,
+                source,
+                download=False,
+                codec=_gzip_codec(compress=True) if compress else None,
+            )
+        digest = self._remote_sha256(f"{remote_path}.part") if verify else None
+        if digest is not None and _sha256(local) != digest:
+            self._run(f"rm -f {part}", 30)
+            if offset:
+                _LOGGER.warning(
+                    "%s: stale part of %s, uploading it again", self._name, remote_path
+                )
+                return self.upload(local, remote_path, False, compress, verify)
+            msg = f"{self._name}: checksum mismatch on {remote_path}"
+            raise SCPConnectionError(msg)
+        mode = stat.S_IMODE(local_stat.st_mode)
+        result = self._run(
+            f"chmod {mode:o} {part} && mv -f {part} {shlex.quote(remote_path)}", 30
+        )
+        if result.returncode != 0:
+            msg = f"{self._name}: failed to write {remote_path}: {result.stderr}"
+            raise SCPConnectionError(msg)
+        return TransferResult(str(local), remote_path, size, digest, offset)
+
+
+def run_transfers(
+    transfers: Iterable[Callable[[], TransferResult]],
+    max_workers: int = _MAX_WORKERS,
+) -> list[TransferResult]:
+    """Run transfers side by side, e.g. to pull the logs of several devices.
+
+    .. code-block:: python
+
+        run_transfers(
+            [
+                partial(lan.file_transfer.download, "/tmp/lan.pcap", "lan.pcap"),
+                partial(wan.file_transfer.download, "/tmp/wan.pcap", "wan.pcap"),
+            ]
+        )
+
+    :param transfers: transfers to run, e.g. partial FileTransfer.download
+    :type transfers: Iterable[Callable[[], TransferResult]]
+    :param max_workers: transfers running at once at most, defaults to 4
+    :type max_workers: int
+    :return: outcome of each transfer, in the given order
+    :rtype: list[TransferResult]
+    :raises SCPConnectionError: once all transfers completed, when any failed
+    """
+    with ThreadPoolExecutor(max_workers, thread_name_prefix="transfer") as executor:
+        futures = [executor.submit(transfer) for transfer in transfers]
+    errors = [str(exc) for future in futures if (exc := future.exception())]
+    if errors:
+        msg = "\n".join(errors)
+        raise SCPConnectionError(msg)
+    return [future.result() for future in futures]
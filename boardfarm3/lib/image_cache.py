@@ -0,0 +1,157 @@
+"""Content-addressed cache of the images staged on devices.
+
+Images are fetched by the devices themselves, the boardfarm host may not even
+reach the image server. What is cached locally is the sha256 digest of the
+content behind each URI, keyed by:
+
+- the URL and its ETag (or Last-Modified and Content-Length when the server
+  sends no ETag) for remote images, so a rebuilt image at the same URL is a
+  cache miss
+- the path, size and modification time for ``file://`` images, so a local
+  image is hashed only once
+
+A device compares the digest with a ``sha256sum`` of its own copy and skips
+the download or copy when they match. The index is a JSON file in
+``$BOARDFARM_IMAGE_CACHE``, ``~/.cache/boardfarm`` by default.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from functools import cache
+from pathlib import Path
+
+import requests
+
+_LOGGER = logging.getLogger(__name__)
+_INDEX_NAME = "images.json"
+_HEAD_TIMEOUT = 10
+
+
+def _file_path(uri: str) -> Path | None:
+    return Path(uri.removeprefix("file://")) if uri.startswith("file:///") else None
+
+
+def _sha256(path: Path) -> str:
+    with path.open("rb") as source:
+        return hashlib.file_digest(source, "sha256").hexdigest()
+
+
+class ImageCache:
+    """Remembers the sha256 digest of the images staged on devices."""
+
+    def __init__(self, directory: str | Path) -> None:
+        """Initialize the image cache.
+
+        :param directory: directory of the cache index, created when needed
+        :type directory: str | Path
+        """
+        self._index_path = Path(directory) / _INDEX_NAME
+        self._lock = threading.Lock()
+        self._index: dict[str, str] | None = None
+
+    def _load(self) -> dict[str, str]:
+        try:
+            return json.loads(self._index_path.read_text())
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            _LOGGER.warning("Ignoring corrupted image cache %s", self._index_path)
+            return {}
+
+    def key(self, uri: str) -> str | None:
+        """Get the cache key of the image behind a URI.
+
+        This sends a HEAD request for a remote image, callers doing both a
+        lookup and a remember should compute it once and pass it to both.
+
+        :param uri: image URI
+        :type uri: str
+        :return: cache key of the image, None when it cannot be cached
+        :rtype: str | None
+        """
+        if (path := _file_path(uri)) is not None:
+            stat = path.stat()
+            return f"{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+        try:
+            response = requests.head(uri, allow_redirects=True, timeout=_HEAD_TIMEOUT)
+        except requests.RequestException as exc:
+            _LOGGER.debug("Not caching %s: %s", uri, exc)
+            return None
+        if not response.ok:
+            return None
+        headers = response.headers
+        if "ETag" in headers:
+            return f"{uri} {headers['ETag']}"
+        if "Last-Modified" in headers and "Content-Length" in headers:
+            return f"{uri} {headers['Last-Modified']} {headers['Content-Length']}"
+        return None
+
+    def lookup(self, uri: str, key: str | None = None) -> str | None:
+        """Get the digest of the image behind a URI.
+
+        A local image is hashed on the first lookup. A remote image is known
+        once it was remembered and is unchanged on the server since.
+
+        :param uri: image URI
+        :type uri: str
+        :param key: cache key of the image, computed from the URI when not given
+        :type key: str | None
+        :return: sha256 digest of the image, None when unknown
+        :rtype: str | None
+        """
+        path = _file_path(uri)
+        if path is not None and not path.is_file():
+            return None
+        if key is None and (key := self.key(uri)) is None:
+            return None
+        with self._lock:
+            if self._index is None:
+                self._index = self._load()
+            digest = self._index.get(key)
+        if digest is None and path is not None:
+            digest = _sha256(path)
+            self._store(key, digest)
+        return digest
+
+    def remember(self, uri: str, digest: str, key: str | None = None) -> None:
+        """Record the digest of the image behind a URI.
+
+        :param uri: image URI
+        :type uri: str
+        :param digest: sha256 digest of the image
+        :type digest: str
+        :param key: cache key of the image, computed from the URI when not given
+        :type key: str | None
+        """
+        if key is not None or (key := self.key(uri)) is not None:
+            self._store(key, digest)
+
+    def _store(self, key: str, digest: str) -> None:
+        with self._lock:
+            # merge the entries written by other boardfarm processes meanwhile
+            self._index = self._load()
+            self._index[key] = digest
+            self._index_path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", dir=self._index_path.parent, delete=False
+            ) as temporary:
+                json.dump(self._index, temporary, indent=1, sort_keys=True)
+            Path(temporary.name).replace(self._index_path)
+
+
+@cache
+def image_cache() -> ImageCache:
+    """Get the image cache shared by all devices.
+
+    :return: image cache in ``$BOARDFARM_IMAGE_CACHE``, ``~/.cache/boardfarm``
+        by default
+    :rtype: ImageCache
+    """
+    directory = os.environ.get("BOARDFARM_IMAGE_CACHE")
+    return ImageCache(directory or Path.home() / ".cache" / "boardfarm")
@@ -0,0 +1,114 @@
+"""Event driven waits on the links and addresses of a device.
+
+Instead of sleeping a fixed time between two checks of a condition, e.g. an
+interface being up or having an address, ``ip monitor link address`` is
+streamed on the console and the condition is checked again as soon as an
+event about the interface shows up.
+
+An event happening between a check and the start of the monitor is not seen,
+so the condition is also checked again every ``recheck_interval`` seconds.
+Devices without ``ip monitor`` (e.g. busybox builds without it) fall back to
+checking every ``recheck_interval`` seconds.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import time
+from typing import TYPE_CHECKING, Protocol
+
+import pexpect
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from boardfarm3.lib.boardfarm_pexpect import CommandStream
+
+_LOGGER = logging.getLogger(__name__)
+
+IP_MONITOR_COMMAND = "ip monitor link address"
+_RECHECK_INTERVAL = 10.0
+
+
+class _StreamingConsole(Protocol):
+    """Console or device streaming the output of a command."""
+
+    def stream_command(
+        self,
+        command: str,
+        stop: Callable[[str], bool] | None = None,
+        timeout: float | None = -1,
+    ) -> CommandStream:
+        """Execute a command and stream its output lines as they are read.
+
+        :param command: command to execute
+        :type command: str
+        :param stop: stop the command once it returns True for a line
+        :type stop: Callable[[str], bool] | None
+        :param timeout: time limit of the whole command in seconds
+        :type timeout: float | None
+        """
+
+
+def _is_event_of(interface: str) -> Callable[[str], bool]:
+    # link and address events start with the index and the name of the
+    # interface, the name of a veth is followed by its peer, e.g. eth0@if4
+    pattern = re.compile(rf"^(?:Deleted )?\d+: {re.escape(interface)}[:@\s]")
+    return lambda line: pattern.match(line.lstrip()) is not None
+
+
+def wait_for_interface(
+    console: _StreamingConsole,
+    interface: str,
+    condition: Callable[[], bool],
+    timeout: float,
+    recheck_interval: float = _RECHECK_INTERVAL,
+) -> bool:
+    """Wait until a condition on an interface is met, reacting to its events.
+
+    .. code-block:: python
+
+        wait_for_interface(
+            console, "erouter0", lambda: is_link_up(console, "erouter0"), 60
+        )
+
+    :param console: console or device to monitor the interface on, it must
+        be free to run the condition checks
+    :type console: _StreamingConsole
+    :param interface: interface name
+    :type interface: str
+    :param condition: check of the interface state
+    :type condition: Callable[[], bool]
+    :param timeout: seconds to wait at most
+    :type timeout: float
+    :param recheck_interval: seconds after which the condition is checked
+        again without any event, defaults to 10
+    :type recheck_interval: float
+    :return: True if the condition was met, False on timeout
+    :rtype: bool
+    """
+    deadline = time.monotonic() + timeout
+    is_event = _is_event_of(interface)
+    monitor = True
+    while not condition():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        wait = min(recheck_interval, remaining)
+        if not monitor:
+            time.sleep(wait)
+            continue
+        try:
+            with console.stream_command(
+                IP_MONITOR_COMMAND, stop=is_event, timeout=wait
+            ) as events:
+                for _ in events:
+                    pass
+        except pexpect.TIMEOUT:
+            continue
+        if events.exit_status is not None:
+            # the monitor is not meant to exit on its own
+            _LOGGER.debug("%r is not supported, polling instead", IP_MONITOR_COMMAND)
+            monitor = False
+    return True
@@ -12,6 +12,7 @@ from bs4 import BeautifulSoup
 from jc.parsers import dig
 
 from boardfarm3.exceptions import SCPConnectionError, UseCaseFailure
+from boardfarm3.lib.connections.ssh_connection import SSH_MULTIPLEXING_OPTIONS
 from boardfarm3.lib.parsers.iptables_parser import IptablesParser
 from boardfarm3.lib.parsers.nslookup_parser import NslookupParser
 from boardfarm3.templates.cpe import CPE
@@ -193,22 +194,32 @@ def scp(  # pylint: disable=too-many-arguments  # noqa: PLR0913
     :raises SCPConnectionError: on failed to scp file
     """
     host = host if isinstance(ip_address(host), IPv4Address) else f"[{host}]"
-    if action == "download":
-        command = (
-            "scp -o StrictHostKeyChecking=no -o UserKnownHostsFile=/dev/null"
-            f" -P {port} {username}@{host}:{src_path} {dst_path}"
+    options = " ".join(
+        (
+            "-o StrictHostKeyChecking=no -o UserKnownHostsFile=/dev/null",
+            *SSH_MULTIPLEXING_OPTIONS,
         )
+    )
+    if action == "download":
+        command = f"scp {options} -P {port} {username}@{host}:{src_path} {dst_path}"
     else:
-        command = (
-            "scp -o StrictHostKeyChecking=no -o UserKnownHostsFile=/dev/null"
-            f" -P {port} {src_path} {username}@{host}:{dst_path}"
-        )
+        command = f"scp {options} -P {port} {src_path} {username}@{host}:{dst_path}"
     console.sendline(command)
-    if console.expect([pexpect.TIMEOUT, "continue connecting?"], timeout=10):
-        console.sendline("y")
-    if console.expect([pexpect.TIMEOUT, "assword:"], timeout=10):
-        console.sendline(password)
-    if console.expect_exact(["100%", pexpect.TIMEOUT], timeout=timeout):
+    # host key and password prompts are skipped when the master connection
+    # to the host is reused, hence wait for whichever comes first
+    index = None
+    for _ in range(3):
+        index = console.expect(
+            ["continue connecting?", "assword:", "100%", pexpect.TIMEOUT],
+            timeout=timeout,
+        )
+        if index == 0:
+            console.sendline("y")
+        elif index == 1:
+            console.sendline(password)
+        else:
+            break
+    if index != 2:  # noqa: PLR2004
         msg = f"Failed to scp from {src_path} to {dst_path}"
         raise SCPConnectionError(msg)
 
@@ -354,13 +365,12 @@ class IptablesFirewall:
         :type valid_ip: str
         :raises ValueError: on given iptables rule can't be added
         """
+        # check and insert in a single round trip, the rule is only inserted
+        # when the check fails
         iptables_output = self._console.execute_command(
-            f"iptables -C INPUT {option} {valid_ip} -j DROP",
+            f"iptables -C INPUT {option} {valid_ip} -j DROP || "
+            f"iptables -I INPUT 1 {option} {valid_ip} -j DROP",
         )
-        if "Bad rule" in iptables_output:
-            self._console.execute_command(
-                f"iptables -I INPUT 1 {option} {valid_ip} -j DROP",
-            )
         if re.search(rf"host\/network.*{valid_ip}.*not found", iptables_output):
             msg = (
                 "Firewall rule cannot be added as the ip address: "
@@ -379,13 +389,12 @@ class IptablesFirewall:
         :type valid_ip: str
         :raises ValueError: on given ip6tables rule can't be added
         """
+        # check and insert in a single round trip, the rule is only inserted
+        # when the check fails
         ip6tables_output = self._console.execute_command(
-            f"ip6tables -C INPUT {option} {valid_ip} -j DROP",
+            f"ip6tables -C INPUT {option} {valid_ip} -j DROP || "
+            f"ip6tables -I INPUT 1 {option} {valid_ip} -j DROP",
         )
-        if "Bad rule" in ip6tables_output:
-            self._console.execute_command(
-                f"ip6tables -I INPUT 1 {option} {valid_ip} -j DROP",
-            )
         if re.search(rf"host\/network.*{valid_ip}.*not found", ip6tables_output):
             msg = (
                 "Firewall rule cannot be added as the ip address: "
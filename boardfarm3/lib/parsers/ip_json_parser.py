@@ -0,0 +1,88 @@
+"""``ip -json addr`` command output parser module."""
+
+from __future__ import annotations
+
+import json
+import re
+from ipaddress import IPv4Interface, IPv6Interface
+from typing import Any
+
+from boardfarm3.lib.dataclass.interface import InterfaceFacts
+
+IP_JSON_ADDR_COMMAND = "ip -json addr show dev"
+# rejected option, e.g. by busybox or iproute2 older than 4.13
+_UNSUPPORTED_OPTION = re.compile(
+    r"is unknown|invalid option|unrecognized option|usage:", re.IGNORECASE
+)
+
+
+def is_ip_json_unsupported(exit_code: int, output: str) -> bool:
+    """Tell whether a failed ``ip -json`` query was rejected for its option.
+
+    Errors about the queried interface do not count, the next query of
+    another interface may succeed.
+
+    :param exit_code: exit code of the command
+    :type exit_code: int
+    :param output: command output, with the error message if it failed
+    :type output: str
+    :return: True if ``ip`` does not support ``-json``
+    :rtype: bool
+    """
+    return exit_code != 0 and _UNSUPPORTED_OPTION.search(output) is not None
+
+
+def parse_ip_json_addr(output: str, interface: str) -> InterfaceFacts | None:
+    """Parse the ``ip -json addr show dev <interface>`` output.
+
+    :param output: command output, with the error message if it failed
+    :type output: str
+    :param interface: name of the queried interface
+    :type interface: str
+    :return: facts of the interface, empty when the interface does not exist,
+        None when the output is not JSON, e.g. from a busybox ``ip``
+    :rtype: InterfaceFacts | None
+    """
+    output = output.strip()
+    if "does not exist" in output:
+        return InterfaceFacts(name=interface)
+    try:
+        links = json.loads(output)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(links, list):
+        return None
+    return facts_from_ip_json(links, interface)
+
+
+def facts_from_ip_json(links: list[dict[str, Any]], interface: str) -> InterfaceFacts:
+    """Build the interface facts from decoded ``ip -json addr`` output.
+
+    :param links: decoded ``ip -json addr`` output
+    :type links: list[dict[str, Any]]
+    :param interface: name of the queried interface
+    :type interface: str
+    :return: facts of the interface, empty when it is not in the links
+    :rtype: InterfaceFacts
+    """
+    # older iproute2 versions emit an empty object per filtered out link
+    link: dict[str, Any] = next(
+        (link for link in links if link.get("ifname") == interface), {}
+    )
+    facts = InterfaceFacts(
+        name=interface,
+        mac_address=link.get("address", ""),
+        mtu=link.get("mtu"),
+        state=link.get("operstate", ""),
+        flags=link.get("flags", []),
+    )
+    for address in link.get("addr_info", []):
+        if address.get("family") == "inet":
+            facts.ipv4.append(
+                IPv4Interface(f"{address['local']}/{address['prefixlen']}")
+            )
+        elif address.get("family") == "inet6":
+            facts.ipv6.append(
+                IPv6Interface(f"{address['local']}/{address['prefixlen']}")
+            )
+    return facts
@@ -0,0 +1,439 @@
+"""Client of the helper agent serving JSON-RPC requests on Linux devices.
+
+The agent (see remote_agent_helper) is a single Python file pushed to the
+device and run with ``python3``. It answers structured requests, e.g. file
+transfers, process lists, interface facts, route and iptables batches or
+captures, instead of shell commands whose output is scraped from the console.
+Requests and responses are JSON-RPC 2.0 objects, one per line, exchanged over
+an SSH exec channel or over a console session dedicated to the agent.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import os
+import re
+import select
+import subprocess
+import time
+from contextlib import suppress
+from pathlib import Path
+from threading import Lock
+from typing import TYPE_CHECKING, Any
+
+import pexpect
+
+from boardfarm3.exceptions import DeviceConnectionError, RemoteAgentError
+from boardfarm3.lib.parsers.ip_json_parser import facts_from_ip_json
+from boardfarm3.lib.remote_agent_helper import CONSOLE_PREFIX, VERSION
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from boardfarm3.lib.boardfarm_pexpect import BoardfarmPexpect
+    from boardfarm3.lib.connections.ssh_connection import SSHConnection
+    from boardfarm3.lib.dataclass.interface import InterfaceFacts
+
+_HELPER_PATH = Path(__file__).with_name("remote_agent_helper.py")
+# base64 characters pushed per command, below the 4 KiB line limit of a tty
+_PUSH_CHUNK_SIZE = 3072
+# bytes transferred per request by read_file and write_file
+_FILE_CHUNK_SIZE = 1024 * 1024
+_RESPONSE = re.compile(rf"{re.escape(CONSOLE_PREFIX)}(.+?)\r?\n")
+
+
+def install_agent(
+    run: Callable[[str], subprocess.CompletedProcess],
+    directory: str = "/tmp",  # noqa: S108
+) -> str:
+    """Push the agent to the device unless this version is already there.
+
+    :param run: executes a command on the device, e.g. LinuxDevice.exec
+    :type run: Callable[[str], subprocess.CompletedProcess]
+    :param directory: directory of the agent on the device, defaults to /tmp
+    :type directory: str
+    :return: path of the agent on the device
+    :rtype: str
+    :raises RemoteAgentError: when the agent could not be written
+    """
+    source = _HELPER_PATH.read_bytes()
+    path = f"{directory}/bf_agent_{hashlib.sha256(source).hexdigest()[:12]}.py"
+    if run(f"test -f {path}").returncode == 0:
+        return path
+    encoded = base64.b64encode(source).decode()
+    run(f"rm -f {path}.b64")
+    for start in range(0, len(encoded), _PUSH_CHUNK_SIZE):
+        run(f"printf %s {encoded[start : start + _PUSH_CHUNK_SIZE]} >> {path}.b64")
+    result = run(
+        f"python3 -m base64 -d {path}.b64 > {path}.tmp && mv {path}.tmp {path}"
+    )
+    run(f"rm -f {path}.b64 {path}.tmp")
+    if result.returncode != 0:
+        msg = f"Failed to push the agent to {path}: {result.stdout}{result.stderr}"
+        raise RemoteAgentError(msg)
+    return path
+
+
+class _ExecChannel:
+    """Agent started on an SSH exec channel, talking through its pipes."""
+
+    def __init__(self, process: subprocess.Popen) -> None:
+        self._process = process
+        self._buffer = b""
+
+    def send(self, line: str) -> None:
+        try:
+            self._process.stdin.write(line.encode() + b"\n")
+            self._process.stdin.flush()
+        except OSError as exc:
+            msg = "The agent exec channel is closed"
+            raise DeviceConnectionError(msg) from exc
+
+    def receive(self, timeout: float) -> str:
+        deadline = time.monotonic() + timeout
+        descriptor = self._process.stdout.fileno()
+        while b"\n" not in self._buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([descriptor], [], [], remaining)[0]:
+                msg = f"No response from the agent within {timeout}s"
+                raise RemoteAgentError(msg)
+            chunk = os.read(descriptor, 65536)
+            if not chunk:
+                msg = "The agent exited"
+                raise DeviceConnectionError(msg)
+            self._buffer += chunk
+        line, _, self._buffer = self._buffer.partition(b"\n")
+        return line.decode()
+
+    def close(self) -> None:
+        # the agent stops its captures and exits once its stdin is closed
+        with suppress(OSError):
+            self._process.stdin.close()
+        try:
+            self._process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+        self._process.stdout.close()
+
+
+class _ConsoleChannel:
+    """Agent running in the foreground of a console session of its own."""
+
+    def __init__(
+        self,
+        console: BoardfarmPexpect,
+        release: Callable[[BoardfarmPexpect], None],
+    ) -> None:
+        self._console = console
+        self._release = release
+
+    def send(self, line: str) -> None:
+        self._console.sendline(line)
+
+    def receive(self, timeout: float) -> str:
+        try:
+            self._console.expect(_RESPONSE, timeout=timeout)
+        except pexpect.TIMEOUT as exc:
+            msg = f"No response from the agent within {timeout}s"
+            raise RemoteAgentError(msg) from exc
+        except pexpect.EOF as exc:
+            msg = "The agent console is closed"
+            raise DeviceConnectionError(msg) from exc
+        return self._console.match.group(1)
+
+    def close(self) -> None:
+        # hanging up the session stops the agent and its captures, the pool
+        # replaces the dead session with a new one when needed
+        with suppress(pexpect.ExceptionPexpect, OSError):
+            self._console.close()
+        self._release(self._console)
+
+
+class RemoteAgent:
+    """Client of the helper agent running on a Linux device."""
+
+    def __init__(
+        self,
+        channel: _ExecChannel | _ConsoleChannel,
+        timeout: float = 30,
+    ) -> None:
+        """Wait for the agent to be ready on the channel.
+
+        Use over_exec_channel or over_console to start the agent.
+
+        :param channel: channel the agent was started on
+        :type channel: _ExecChannel | _ConsoleChannel
+        :param timeout: seconds to wait for a response, defaults to 30
+        :type timeout: float
+        :raises RemoteAgentError: when the agent did not start
+        """
+        self._channel = channel
+        self._timeout = timeout
+        self._lock = Lock()
+        self._last_id = 0
+        try:
+            ready = json.loads(channel.receive(timeout))
+        except (RemoteAgentError, DeviceConnectionError, ValueError) as exc:
+            channel.close()
+            msg = f"The agent did not start: {exc}"
+            raise RemoteAgentError(msg) from exc
+        if ready.get("method") != "ready":
+            channel.close()
+            msg = f"Unexpected agent greeting {ready}"
+            raise RemoteAgentError(msg)
+        self.version: int = ready["params"]["version"]
+        if self.version != VERSION:
+            channel.close()
+            msg = f"Agent version {self.version} does not match {VERSION}"
+            raise RemoteAgentError(msg)
+
+    @classmethod
+    def over_exec_channel(cls, connection: SSHConnection, path: str) -> RemoteAgent:
+        """Start the agent on an exec channel of a multiplexed SSH connection.
+
+        :param connection: multiplexed SSH connection to the device
+        :type connection: SSHConnection
+        :param path: path of the agent on the device, see install_agent
+        :type path: str
+        :return: client of the started agent
+        :rtype: RemoteAgent
+        """
+        return cls(_ExecChannel(connection.open_exec_channel(f"python3 -u {path}")))
+
+    @classmethod
+    def over_console(
+        cls,
+        console: BoardfarmPexpect,
+        path: str,
+        release: Callable[[BoardfarmPexpect], None],
+    ) -> RemoteAgent:
+        """Start the agent in the foreground of a console session.
+
+        The session is used by the agent only until the client is closed.
+
+        :param console: logged in console session, e.g. from a ConsolePool
+        :type console: BoardfarmPexpect
+        :param path: path of the agent on the device, see install_agent
+        :type path: str
+        :param release: called with the session once the client is closed
+        :type release: Callable[[BoardfarmPexpect], None]
+        :return: client of the started agent
+        :rtype: RemoteAgent
+        """
+        console.sendline(f"python3 -u {path} --console")
+        return cls(_ConsoleChannel(console, release))
+
+    def call(
+        self,
+        method: str,
+        params: dict[str, Any] | None = None,
+        timeout: float | None = None,
+    ) -> Any:  # noqa: ANN401
+        """Send a request to the agent and return its result.
+
+        :param method: method of the agent
+        :type method: str
+        :param params: parameters of the method
+        :type params: dict[str, Any] | None
+        :param timeout: seconds to wait for the response, defaults to the
+            timeout of the client
+        :type timeout: float | None
+        :return: result of the method
+        :rtype: Any
+        :raises RemoteAgentError: when the method failed on the device
+        """
+        with self._lock:
+            self._last_id += 1
+            request_id = self._last_id
+            self._channel.send(
+                json.dumps(
+                    {
+                        "jsonrpc": "2.0",
+                        "id": request_id,
+                        "method": method,
+                        "params": params or {},
+                    }
+                )
+            )
+            response: dict[str, Any] = {}
+            # responses of earlier requests which timed out are skipped
+            while response.get("id") != request_id:
+                response = json.loads(self._channel.receive(timeout or self._timeout))
+        if "error" in response:
+            msg = f"{method} failed: {response['error']['message']}"
+            raise RemoteAgentError(msg)
+        return response["result"]
+
+    def read_file(self, path: str) -> bytes:
+        """Read a file from the device.
+
+        :param path: file on the device
+        :type path: str
+        :return: content of the file
+        :rtype: bytes
+        """
+        content = b""
+        while True:
+            chunk = self.call(
+                "read_file",
+                {"path": path, "offset": len(content), "size": _FILE_CHUNK_SIZE},
+            )
+            content += base64.b64decode(chunk["data"])
+            if not chunk["data"] or len(content) >= chunk["size"]:
+                return content
+
+    def write_file(self, path: str, data: bytes, mode: int | None = None) -> None:
+        """Write a file on the device.
+
+        Files up to 1 MiB are replaced atomically.
+
+        :param path: file on the device
+        :type path: str
+        :param data: content of the file
+        :type data: bytes
+        :param mode: permissions of the file, e.g. 0o755
+        :type mode: int | None
+        """
+        for start in range(0, max(len(data), 1), _FILE_CHUNK_SIZE):
+            chunk = data[start : start + _FILE_CHUNK_SIZE]
+            self.call(
+                "write_file",
+                {
+                    "path": path,
+                    "data": base64.b64encode(chunk).decode(),
+                    "append": start > 0,
+                    "mode": mode,
+                },
+            )
+
+    def processes(self, name: str | None = None) -> list[dict[str, Any]]:
+        """List the processes running on the device.
+
+        :param name: only list the processes of this name, like ``pidof``
+        :type name: str | None
+        :return: pid, name and command line of each process
+        :rtype: list[dict[str, Any]]
+        """
+        return self.call("processes", {"name": name})
+
+    def interface_facts(self, interface: str) -> InterfaceFacts:
+        """Get the addresses, MAC address and MTU of an interface at once.
+
+        :param interface: interface name
+        :type interface: str
+        :return: facts of the interface, empty when it does not exist
+        :rtype: InterfaceFacts
+        """
+        return facts_from_ip_json(
+            self.call("interface_facts", {"name": interface}), interface
+        )
+
+    def ip_batch(
+        self, commands: list[str], force: bool = False
+    ) -> subprocess.CompletedProcess:
+        """Run ``ip`` commands, e.g. routes, in a single ``ip -batch`` process.
+
+        :param commands: ``ip`` commands without the leading ``ip``
+        :type commands: list[str]
+        :param force: run all the commands even after a failure
+        :type force: bool
+        :return: exit code and output of ``ip``
+        :rtype: subprocess.CompletedProcess
+        """
+        result = self.call("ip_batch", {"commands": commands, "force": force})
+        return subprocess.CompletedProcess(
+            commands, result["returncode"], result["output"], ""
+        )
+
+    def iptables_batch(
+        self,
+        rules: list[str],
+        table: str = "filter",
+        ipv6: bool = False,
+    ) -> subprocess.CompletedProcess:
+        """Apply iptables rules atomically with ``iptables-restore --noflush``.
+
+        :param rules: rules in ``iptables-save`` syntax, e.g. ``-A INPUT -j DROP``
+        :type rules: list[str]
+        :param table: table of the rules, defaults to filter
+        :type table: str
+        :param ipv6: apply the rules with ip6tables
+        :type ipv6: bool
+        :return: exit code and output of ``iptables-restore``
+        :rtype: subprocess.CompletedProcess
+        """
+        result = self.call(
+            "iptables_batch", {"rules": rules, "table": table, "ipv6": ipv6}
+        )
+        return subprocess.CompletedProcess(
+            rules, result["returncode"], result["output"], ""
+        )
+
+    def start_capture(
+        self,
+        interface: str,
+        path: str,
+        capture_filter: str = "",
+        options: str = "",
+    ) -> int:
+        """Start a tcpdump capture on the device.
+
+        :param interface: interface to capture on
+        :type interface: str
+        :param path: pcap file to write on the device
+        :type path: str
+        :param capture_filter: tcpdump filter expression
+        :type capture_filter: str
+        :param options: additional tcpdump options
+        :type options: str
+        :return: pid of tcpdump
+        :rtype: int
+        """
+        return self.call(
+            "start_capture",
+            {
+                "interface": interface,
+                "path": path,
+                "capture_filter": capture_filter,
+                "options": options,
+            },
+        )
+
+    def stop_capture(self, pid: int) -> subprocess.CompletedProcess:
+        """Stop a capture started with start_capture.
+
+        :param pid: pid of tcpdump
+        :type pid: int
+        :return: exit code and output of tcpdump, with the packet counts
+        :rtype: subprocess.CompletedProcess
+        """
+        result = self.call("stop_capture", {"pid": pid})
+        return subprocess.CompletedProcess(
+            "tcpdump", result["returncode"], result["output"], ""
+        )
+
+    def run(self, command: str, timeout: float = 30) -> subprocess.CompletedProcess:
+        """Run a shell command through the agent.
+
+        :param command: command to run
+        :type command: str
+        :param timeout: seconds after which the command is killed, defaults to 30
+        :type timeout: float
+        :return: stdout, stderr and exit code of the command
+        :rtype: subprocess.CompletedProcess
+        """
+        result = self.call(
+            "run", {"command": command, "timeout": timeout}, timeout=timeout + 5
+        )
+        return subprocess.CompletedProcess(
+            command, result["returncode"], result["stdout"], result["stderr"]
+        )
+
+    def close(self) -> None:
+        """Stop the agent, its captures are stopped too."""
+        with suppress(RemoteAgentError, DeviceConnectionError, OSError):
+            self._channel.send(json.dumps({"jsonrpc": "2.0", "method": "exit"}))
+        self._channel.close()
@@ -0,0 +1,398 @@
+"""Helper agent serving JSON-RPC requests on a Linux device.
+
+This file is pushed to the device by boardfarm and run there with ``python3``,
+see remote_agent. It reads one JSON-RPC 2.0 request per line on stdin and
+writes one response per line on stdout. Only the standard library is used.
+
+With ``--console`` the agent runs in an interactive terminal: echo and line
+editing are turned off, so requests of any length are read as they are sent,
+and every line written is prefixed, so it is told apart from the terminal
+output.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import os
+import shlex
+import signal
+import subprocess
+import sys
+import termios
+from pathlib import Path
+from typing import Any
+
+VERSION = 1
+CONSOLE_PREFIX = "BF-RPC: "
+
+PARSE_ERROR = -32700
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+_CAPTURES: dict[int, subprocess.Popen] = {}
+
+
+def read_file(path: str, offset: int = 0, size: int = -1) -> dict[str, Any]:
+    """Read a file, or a part of it.
+
+    :param path: file to read
+    :type path: str
+    :param offset: first byte to read, defaults to 0
+    :type offset: int
+    :param size: bytes to read at most, defaults to -1 (up to the end)
+    :type size: int
+    :return: base64 encoded content and total size of the file
+    :rtype: dict[str, Any]
+    """
+    with Path(path).open("rb") as source:
+        source.seek(offset)
+        data = source.read(size)
+    return {
+        "data": base64.b64encode(data).decode(),
+        "size": Path(path).stat().st_size,
+    }
+
+
+def write_file(
+    path: str,
+    data: str,
+    append: bool = False,
+    mode: int | None = None,
+) -> int:
+    """Write a file, atomically unless appending.
+
+    :param path: file to write
+    :type path: str
+    :param data: base64 encoded content
+    :type data: str
+    :param append: append to the file instead of replacing it
+    :type append: bool
+    :param mode: permissions of the file, e.g. 0o755
+    :type mode: int | None
+    :return: number of bytes written
+    :rtype: int
+    """
+    content = base64.b64decode(data)
+    target = Path(path)
+    if append:
+        with target.open("ab") as destination:
+            destination.write(content)
+    else:
+        temporary = target.with_name(f".{target.name}.bf-agent")
+        temporary.write_bytes(content)
+        temporary.replace(target)
+    if mode is not None:
+        target.chmod(mode)
+    return len(content)
+
+
+def processes(name: str | None = None) -> list[dict[str, Any]]:
+    """List the running processes.
+
+    :param name: only list the processes of this name, like ``pidof``
+    :type name: str | None
+    :return: pid, name and command line of each process
+    :rtype: list[dict[str, Any]]
+    """
+    result = []
+    for entry in Path("/proc").iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            comm = (entry / "comm").read_text().strip()
+            cmdline = (entry / "cmdline").read_bytes().decode(errors="replace")
+        except OSError:  # the process exited meanwhile
+            continue
+        args = [arg for arg in cmdline.split("\0") if arg]
+        if name is not None and name not in (
+            comm,
+            Path(args[0]).name if args else "",
+        ):
+            continue
+        result.append({"pid": int(entry.name), "name": comm, "cmdline": args})
+    return sorted(result, key=lambda process: process["pid"])
+
+
+def _sysfs_link(name: str) -> dict[str, Any]:
+    # same layout as ``ip -json addr``, without the IPv4 addresses which are
+    # not exposed in /sys or /proc
+    device = Path("/sys/class/net") / name
+    link: dict[str, Any] = {
+        "ifname": name,
+        "address": (device / "address").read_text().strip(),
+        "mtu": int((device / "mtu").read_text()),
+        "operstate": (device / "operstate").read_text().strip().upper(),
+        "addr_info": [],
+    }
+    with Path("/proc/net/if_inet6").open() as inet6:
+        for line in inet6:
+            address, _, prefix_length, _, _, interface = line.split()
+            if interface == name:
+                groups = [address[i : i + 4] for i in range(0, 32, 4)]
+                link["addr_info"].append(
+                    {
+                        "family": "inet6",
+                        "local": ":".join(groups),
+                        "prefixlen": int(prefix_length, 16),
+                    }
+                )
+    return link
+
+
+def interface_facts(name: str) -> list[dict[str, Any]]:
+    """Get the links and addresses of an interface.
+
+    :param name: interface name
+    :type name: str
+    :return: ``ip -json addr`` output, empty if the interface does not exist
+    :rtype: list[dict[str, Any]]
+    """
+    if not (Path("/sys/class/net") / name).exists():
+        return []
+    try:
+        output = subprocess.run(  # noqa: S603
+            ["ip", "-json", "addr", "show", "dev", name],  # noqa: S607
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        return json.loads(output)
+    except (OSError, ValueError, subprocess.CalledProcessError):
+        return [_sysfs_link(name)]
+
+
+def ip_batch(commands: list[str], force: bool = False) -> dict[str, Any]:
+    """Run ``ip`` commands, e.g. routes, in a single ``ip -batch`` process.
+
+    :param commands: ``ip`` commands without the leading ``ip``
+    :type commands: list[str]
+    :param force: run all the commands even after a failure
+    :type force: bool
+    :return: exit code and output of ``ip``
+    :rtype: dict[str, Any]
+    """
+    args = ["ip", *(["-force"] if force else []), "-batch", "-"]
+    result = subprocess.run(  # noqa: S603
+        args,
+        input="\n".join(commands) + "\n",
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        check=False,
+    )
+    return {"returncode": result.returncode, "output": result.stdout}
+
+
+def iptables_batch(
+    rules: list[str],
+    table: str = "filter",
+    ipv6: bool = False,
+) -> dict[str, Any]:
+    """Apply iptables rules atomically with ``iptables-restore --noflush``.
+
+    :param rules: rules in ``iptables-save`` syntax, e.g. ``-A INPUT -j DROP``
+    :type rules: list[str]
+    :param table: table of the rules, defaults to filter
+    :type table: str
+    :param ipv6: apply the rules with ip6tables
+    :type ipv6: bool
+    :return: exit code and output of ``iptables-restore``
+    :rtype: dict[str, Any]
+    """
+    command = "ip6tables-restore" if ipv6 else "iptables-restore"
+    result = subprocess.run(  # noqa: S603
+        [command, "--noflush"],
+        input="\n".join([f"*{table}", *rules, "COMMIT"]) + "\n",
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        check=False,
+    )
+    return {"returncode": result.returncode, "output": result.stdout}
+
+
+def start_capture(
+    interface: str,
+    path: str,
+    capture_filter: str = "",
+    options: str = "",
+) -> int:
+    """Start a tcpdump capture in the background.
+
+    :param interface: interface to capture on
+    :type interface: str
+    :param path: pcap file to write
+    :type path: str
+    :param capture_filter: tcpdump filter expression
+    :type capture_filter: str
+    :param options: additional tcpdump options
+    :type options: str
+    :return: pid of tcpdump
+    :rtype: int
+    """
+    args = ["tcpdump", "-U", "-i", interface, "-w", path, *shlex.split(options)]
+    if capture_filter:
+        args.append(capture_filter)
+    process = subprocess.Popen(  # noqa: S603
+        args,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    _CAPTURES[process.pid] = process
+    return process.pid
+
+
+def stop_capture(pid: int, timeout: float = 10) -> dict[str, Any]:
+    """Stop a capture started with start_capture.
+
+    :param pid: pid of tcpdump
+    :type pid: int
+    :param timeout: seconds given to tcpdump to write its file, defaults to 10
+    :type timeout: float
+    :return: exit code and output of tcpdump, with the packet counts
+    :rtype: dict[str, Any]
+    """
+    process = _CAPTURES.pop(pid)
+    process.send_signal(signal.SIGINT)
+    try:
+        _, output = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        _, output = process.communicate()
+    return {"returncode": process.returncode, "output": output}
+
+
+def run(command: str, timeout: float | None = None) -> dict[str, Any]:
+    """Run a shell command.
+
+    :param command: command to run
+    :type command: str
+    :param timeout: seconds after which the command is killed
+    :type timeout: float | None
+    :return: exit code, stdout and stderr of the command
+    :rtype: dict[str, Any]
+    """
+    result = subprocess.run(  # noqa: S602
+        command,
+        shell=True,
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+        check=False,
+    )
+    return {
+        "returncode": result.returncode,
+        "stdout": result.stdout,
+        "stderr": result.stderr,
+    }
+
+
+def ping() -> int:
+    """Tell the agent is alive.
+
+    :return: version of the agent
+    :rtype: int
+    """
+    return VERSION
+
+
+METHODS = {
+    method.__name__: method
+    for method in (
+        read_file,
+        write_file,
+        processes,
+        interface_facts,
+        ip_batch,
+        iptables_batch,
+        start_capture,
+        stop_capture,
+        run,
+        ping,
+    )
+}
+
+
+def _error(request_id: Any, code: int, message: str) -> dict[str, Any]:  # noqa: ANN401
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "error": {"code": code, "message": message},
+    }
+
+
+def handle(line: str) -> dict[str, Any] | None:
+    """Answer a JSON-RPC request.
+
+    :param line: JSON encoded request
+    :type line: str
+    :return: response to the request, None for the exit notification
+    :rtype: dict[str, Any] | None
+    """
+    try:
+        request = json.loads(line)
+    except ValueError as exc:
+        return _error(None, PARSE_ERROR, str(exc))
+    if request.get("method") == "exit":
+        return None
+    request_id = request.get("id")
+    method = METHODS.get(request.get("method"))
+    if method is None:
+        return _error(request_id, METHOD_NOT_FOUND, f"{request.get('method')}")
+    try:
+        result = method(**request.get("params", {}))
+    except TypeError as exc:
+        return _error(request_id, INVALID_PARAMS, str(exc))
+    except Exception as exc:  # noqa: BLE001
+        return _error(request_id, SERVER_ERROR, f"{type(exc).__name__}: {exc}")
+    return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+
+def serve(console: bool = False) -> None:
+    """Answer the requests read on stdin until it is closed or told to exit.
+
+    :param console: prefix the responses, for an interactive terminal
+    :type console: bool
+    """
+    prefix = CONSOLE_PREFIX if console else ""
+
+    def reply(message: dict[str, Any]) -> None:
+        sys.stdout.write(f"{prefix}{json.dumps(message)}\n")
+        sys.stdout.flush()
+
+    reply({"jsonrpc": "2.0", "method": "ready", "params": {"version": VERSION}})
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        response = handle(line)
+        if response is None:
+            break
+        reply(response)
+
+
+def main() -> None:
+    """Run the agent, restoring the terminal and stopping captures on exit."""
+    console = "--console" in sys.argv[1:]
+    settings = None
+    if console and os.isatty(0):
+        settings = termios.tcgetattr(0)
+        raw = termios.tcgetattr(0)
+        raw[3] &= ~(termios.ECHO | termios.ICANON)
+        raw[6][termios.VMIN] = 1
+        raw[6][termios.VTIME] = 0
+        termios.tcsetattr(0, termios.TCSANOW, raw)
+    try:
+        serve(console)
+    finally:
+        for pid in list(_CAPTURES):
+            stop_capture(pid)
+        if settings is not None:
+            termios.tcsetattr(0, termios.TCSANOW, settings)
+
+
+if __name__ == "__main__":
+    main()
@@ -25,6 +25,12 @@ from boardfarm3.devices.prplos_cpe import PrplDockerCPE
 from boardfarm3.devices.rpirdkb_cpe import RPiRDKBCPE
 from boardfarm3.exceptions import EnvConfigError
 from boardfarm3.lib.boardfarm_config import BoardfarmConfig, parse_boardfarm_config
+from boardfarm3.lib.boardfarm_pexpect import CONSOLE_LOG_FORMATS
+from boardfarm3.lib.boot_scheduler import DEFAULT_BOOT_WORKERS
+from boardfarm3.lib.connections.connect_and_run import (
+    RuntimeConnectable,
+    close_connection_manager,
+)
 from boardfarm3.lib.device_manager import DeviceManager
 from boardfarm3.plugins.hookspecs import devices as Devices
 
@@ -47,6 +53,22 @@ def _non_empty_str(arg: str) -> str:
     raise ArgumentTypeError(message)
 
 
+def _non_negative_int(arg: str) -> int:
+    """Type to check boardfarm/pytest command line arguments are counts.
+
+    :param arg: command line argument
+    :type arg: str
+    :raises ArgumentTypeError: raises argparse ArgumentTypeError
+                    for negative or non integer argument values
+    :return: arg as an integer
+    :rtype: int
+    """
+    if arg.isdigit():
+        return int(arg)
+    message = "Argument value should be a non negative integer"
+    raise ArgumentTypeError(message)
+
+
 @hookimpl
 def boardfarm_add_hookspecs(plugin_manager: PluginManager) -> None:
     """Add boardfarm core plugin hookspecs.
@@ -92,6 +114,34 @@ def boardfarm_add_cmdline_args(argparser: ArgumentParser) -> None:
         action="store_true",
         help="Skips the booting process, all devices will be used as they are",
     )
+    argparser.add_argument(
+        "--incremental-boot",
+        action="store_true",
+        help=(
+            "Skips the booting process of the devices unchanged since their last"
+            " successful boot which are still healthy"
+        ),
+    )
+    argparser.add_argument(
+        "--boot-scheduler",
+        choices=("stages", "dag"),
+        default="stages",
+        help=(
+            "Run the boot stages one after the other for all devices, or start"
+            " each device stage once the stages it depends on are done"
+        ),
+    )
+    argparser.add_argument(
+        "--boot-workers",
+        type=_non_negative_int,
+        default=DEFAULT_BOOT_WORKERS,
+        help=(
+            "Boot hooks of devices without an asyncio implementation running"
+            " at once in threads, next to the asyncio ones of the other devices,"
+            " 0 runs a stage sequentially when any device lacks an asyncio"
+            " implementation"
+        ),
+    )
     argparser.add_argument(
         "--skip-contingency-checks",
         action="store_true",
@@ -102,6 +152,24 @@ def boardfarm_add_cmdline_args(argparser: ArgumentParser) -> None:
         default="",  # does not save the logs by default
         help="Save the console logs at the give location",
     )
+    argparser.add_argument(
+        "--console-log-format",
+        choices=CONSOLE_LOG_FORMATS,
+        default="text",
+        help=(
+            "Format of the saved console logs: rotated plain text, a time"
+            " indexed compressed store which is never rotated, or both"
+        ),
+    )
+    argparser.add_argument(
+        "--boot-trace",
+        default="",  # does not trace the boot by default
+        help=(
+            "Save a Chrome trace (boot_trace.json, open it with"
+            " https://ui.perfetto.dev) and a summary table (boot_summary.txt)"
+            " of the boot of the devices at the given location"
+        ),
+    )
     argparser.add_argument(
         "--ignore-devices",
         default="",
@@ -232,4 +300,8 @@ def boardfarm_release_devices(
     :rtype: Generator[None,None,None]
     """
     plugin_manager.hook.boardfarm_shutdown_device(device_manager=device_manager)
+    # the keepalive must not reconnect the consoles closed by the shutdown
+    for device in device_manager.get_devices_by_type(BoardfarmDevice).values():
+        if isinstance(device, RuntimeConnectable):
+            close_connection_manager(device)
     yield
@@ -1,23 +1,52 @@
 """Boardfarm environment setup plugin."""
 
+from __future__ import annotations
+
 import asyncio
 import logging
 import time
-from argparse import Namespace
 from sys import version_info
-
-from pluggy import PluginManager
+from typing import TYPE_CHECKING
 
 from boardfarm3 import hookimpl
 from boardfarm3.devices.base_devices.boardfarm_device import BoardfarmDevice
-from boardfarm3.lib.boardfarm_config import BoardfarmConfig
-from boardfarm3.lib.device_manager import DeviceManager
+from boardfarm3.exceptions import NotSupportedError
+from boardfarm3.lib.boot_fingerprint import fingerprint_store, settled_devices
+from boardfarm3.lib.boot_scheduler import (
+    BOOT_STAGES,
+    DEFAULT_BOOT_WORKERS,
+    build_boot_graph,
+    run_boot_graph,
+    run_stage,
+    stage_steps,
+)
+from boardfarm3.lib.boot_trace import span, tracing
 from boardfarm3.lib.interactive_shell import get_interactive_console_options
 
+if TYPE_CHECKING:
+    from argparse import Namespace
+
+    from pluggy import HookCaller, PluginManager
+
+    from boardfarm3.lib.boardfarm_config import BoardfarmConfig
+    from boardfarm3.lib.device_manager import DeviceManager
+
 IS_TASKGROUP_AVAILABLE = version_info >= (3, 11)
 _LOGGER = logging.getLogger(__name__)
 
 
+def _boot_workers(cmdline_args: Namespace) -> int:
+    return getattr(cmdline_args, "boot_workers", DEFAULT_BOOT_WORKERS)
+
+
+def _hook_caller(
+    plugin_manager: PluginManager, hook_name: str, skip: frozenset[str]
+) -> HookCaller:
+    return plugin_manager.subset_hook_caller(
+        hook_name, [plugin_manager.get_plugin(name) for name in skip]
+    )
+
+
 def _is_async_hook_supported(hook_name: str, device_manager: DeviceManager) -> bool:
     if not IS_TASKGROUP_AVAILABLE:
         return False
@@ -49,17 +78,18 @@ def _is_async_hook_supported(hook_name: str, device_manager: DeviceManager) -> b
     return False
 
 
-async def _run_hook_async(
+async def _run_hook_async(  # pylint: disable=too-many-arguments  # noqa: PLR0913
     hook_name: str,
     plugin_manager: PluginManager,
     config: BoardfarmConfig,
     cmdline_args: Namespace,
     device_manager: DeviceManager,
+    skip: frozenset[str] = frozenset(),
 ) -> None:
     start_time = time.monotonic()
     async_hook_name = f"{hook_name}_async"
     async with asyncio.TaskGroup() as tg:
-        for device in getattr(plugin_manager.hook, async_hook_name)(
+        for device in _hook_caller(plugin_manager, async_hook_name, skip)(
             config=config,
             cmdline_args=cmdline_args,
             device_manager=device_manager,
@@ -68,15 +98,16 @@ async def _run_hook_async(
     _LOGGER.debug("%s ran for %ss.", hook_name, time.monotonic() - start_time)
 
 
-def _run_hook_sync(
+def _run_hook_sync(  # pylint: disable=too-many-arguments  # noqa: PLR0913
     hook_name: str,
     plugin_manager: PluginManager,
     config: BoardfarmConfig,
     cmdline_args: Namespace,
     device_manager: DeviceManager,
+    skip: frozenset[str] = frozenset(),
 ) -> None:
     start_time = time.monotonic()
-    getattr(plugin_manager.hook, hook_name)(
+    _hook_caller(plugin_manager, hook_name, skip)(
         config=config,
         cmdline_args=cmdline_args,
         device_manager=device_manager,
@@ -84,29 +115,224 @@ def _run_hook_sync(
     _LOGGER.debug("%s ran for %ss.", hook_name, time.monotonic() - start_time)
 
 
-async def _run_hook(
+async def _run_hook_mixed(  # pylint: disable=too-many-arguments  # noqa: PLR0913
     hook_name: str,
     plugin_manager: PluginManager,
     config: BoardfarmConfig,
     cmdline_args: Namespace,
     device_manager: DeviceManager,
+    skip: frozenset[str] = frozenset(),
+) -> bool:
+    # async implementations next to the blocking ones running in threads
+    try:
+        steps = stage_steps(plugin_manager, hook_name, skip)
+    except NotSupportedError:
+        _LOGGER.warning("%s has wrappers, running it sequentially", hook_name)
+        return False
+    # threads only for blocking implementations next to async ones
+    if {step.is_async for step in steps} != {True, False}:
+        return False
+    start_time = time.monotonic()
+    await run_stage(
+        steps,
+        {
+            "config": config,
+            "cmdline_args": cmdline_args,
+            "device_manager": device_manager,
+        },
+        max_workers=_boot_workers(cmdline_args),
+    )
+    _LOGGER.debug("%s ran for %ss.", hook_name, time.monotonic() - start_time)
+    return True
+
+
+async def _run_hook(  # pylint: disable=too-many-arguments  # noqa: PLR0913
+    hook_name: str,
+    plugin_manager: PluginManager,
+    config: BoardfarmConfig,
+    cmdline_args: Namespace,
+    device_manager: DeviceManager,
+    skip: frozenset[str] = frozenset(),
+) -> None:
+    with span(hook_name, "stage"):
+        if (
+            IS_TASKGROUP_AVAILABLE
+            and _boot_workers(cmdline_args) > 0
+            and await _run_hook_mixed(
+                hook_name=hook_name,
+                plugin_manager=plugin_manager,
+                config=config,
+                cmdline_args=cmdline_args,
+                device_manager=device_manager,
+                skip=skip,
+            )
+        ):
+            return
+        if _is_async_hook_supported(hook_name=hook_name, device_manager=device_manager):
+            await _run_hook_async(
+                hook_name=hook_name,
+                plugin_manager=plugin_manager,
+                config=config,
+                cmdline_args=cmdline_args,
+                device_manager=device_manager,
+                skip=skip,
+            )
+        else:
+            _run_hook_sync(
+                hook_name=hook_name,
+                plugin_manager=plugin_manager,
+                config=config,
+                cmdline_args=cmdline_args,
+                device_manager=device_manager,
+                skip=skip,
+            )
+
+
+async def _run_boot_graph(
+    plugin_manager: PluginManager,
+    config: BoardfarmConfig,
+    cmdline_args: Namespace,
+    device_manager: DeviceManager,
+    skip: frozenset[str] = frozenset(),
+) -> None:
+    start_time = time.monotonic()
+    await run_boot_graph(
+        build_boot_graph(plugin_manager, skip),
+        {
+            "config": config,
+            "cmdline_args": cmdline_args,
+            "device_manager": device_manager,
+        },
+        # blocking steps cannot be run sequentially in between the others
+        max_workers=max(_boot_workers(cmdline_args), 1),
+    )
+    _LOGGER.debug("Boot graph ran for %ss.", time.monotonic() - start_time)
+
+
+async def _keep_unchanged_devices(
+    config: BoardfarmConfig,
+    cmdline_args: Namespace,
+    plugin_manager: PluginManager,
+    device_manager: DeviceManager,
+) -> tuple[frozenset[str], dict[str, str | None]]:
+    # devices not booted again and the fingerprints of the devices booted
+    store = fingerprint_store()
+    board_name = getattr(cmdline_args, "board_name", None) or ""
+    current: dict[str, str] = {}
+    for name, device in device_manager.get_devices_by_type(BoardfarmDevice).items():
+        if (value := device.boot_fingerprint(config, device_manager)) is not None:
+            current[name] = value
+    keys = {name: f"{board_name}/{name}" for name in current}
+    unchanged = {
+        name for name, value in current.items() if store.lookup(keys[name]) == value
+    }
+    try:
+        steps = build_boot_graph(plugin_manager)
+    except NotSupportedError:
+        _LOGGER.warning("The boot hooks have wrappers, booting all the devices")
+        steps, unchanged = [], set()
+    kept = settled_devices(steps, unchanged)
+    if kept:
+        plugins = frozenset(name for name, _ in plugin_manager.list_name_plugin())
+        await _run_hook(
+            hook_name="boardfarm_skip_boot",
+            plugin_manager=plugin_manager,
+            config=config,
+            cmdline_args=cmdline_args,
+            device_manager=device_manager,
+            skip=plugins - kept,
+        )
+        healthy = {
+            name
+            for name in kept
+            if device_manager.get_device_by_name(name).boot_health_probe(device_manager)
+        }
+        if unhealthy := kept - settled_devices(steps, healthy):
+            _LOGGER.warning("Booting %s after all", ", ".join(sorted(unhealthy)))
+            _hook_caller(
+                plugin_manager, "boardfarm_shutdown_device", plugins - unhealthy
+            )(device_manager=device_manager)
+            kept -= unhealthy
+    if kept:
+        _LOGGER.info("Not booting the unchanged %s", ", ".join(sorted(kept)))
+    booted: dict[str, str | None] = {
+        keys[name]: value for name, value in current.items() if name not in kept
+    }
+    if booted:
+        # unknown until the boot succeeded
+        store.update(dict.fromkeys(booted))
+    return frozenset(kept), booted
+
+
+async def _boot_devices(
+    config: BoardfarmConfig,
+    cmdline_args: Namespace,
+    plugin_manager: PluginManager,
+    device_manager: DeviceManager,
+    skip: frozenset[str],
 ) -> None:
-    if _is_async_hook_supported(hook_name=hook_name, device_manager=device_manager):
-        await _run_hook_async(
-            hook_name=hook_name,
+    if getattr(cmdline_args, "boot_scheduler", "stages") == "dag":
+        if IS_TASKGROUP_AVAILABLE:
+            await _run_boot_graph(
+                plugin_manager=plugin_manager,
+                config=config,
+                cmdline_args=cmdline_args,
+                device_manager=device_manager,
+                skip=skip,
+            )
+            return
+        _LOGGER.warning("The dag boot scheduler needs Python 3.11, using stages")
+    for hook in BOOT_STAGES:
+        await _run_hook(
+            hook_name=hook,
             plugin_manager=plugin_manager,
             config=config,
             cmdline_args=cmdline_args,
             device_manager=device_manager,
+            skip=skip,
         )
-    else:
-        _run_hook_sync(
-            hook_name=hook_name,
+
+
+async def _boot(
+    config: BoardfarmConfig,
+    cmdline_args: Namespace,
+    plugin_manager: PluginManager,
+    device_manager: DeviceManager,
+) -> None:
+    if cmdline_args.skip_boot:
+        await _run_hook(
+            hook_name="boardfarm_skip_boot",
             plugin_manager=plugin_manager,
             config=config,
             cmdline_args=cmdline_args,
             device_manager=device_manager,
         )
+        return
+    await _run_hook(
+        hook_name="validate_device_requirements",
+        plugin_manager=plugin_manager,
+        config=config,
+        cmdline_args=cmdline_args,
+        device_manager=device_manager,
+    )
+    kept: frozenset[str] = frozenset()
+    booted: dict[str, str | None] = {}
+    if getattr(cmdline_args, "incremental_boot", False):
+        kept, booted = await _keep_unchanged_devices(
+            config=config,
+            cmdline_args=cmdline_args,
+            plugin_manager=plugin_manager,
+            device_manager=device_manager,
+        )
+    await _boot_devices(
+        config=config,
+        cmdline_args=cmdline_args,
+        plugin_manager=plugin_manager,
+        device_manager=device_manager,
+        skip=kept,
+    )
+    if booted:
+        fingerprint_store().update(booted)
 
 
 @hookimpl
@@ -129,30 +355,14 @@ async def boardfarm_setup_env(
     :return: device manager with all devices environment setup
     :rtype: DeviceManager
     """
-    if cmdline_args.skip_boot:
-        await _run_hook(
-            hook_name="boardfarm_skip_boot",
-            plugin_manager=plugin_manager,
+    with (
+        tracing(getattr(cmdline_args, "boot_trace", "")),
+        span("boardfarm_setup_env", "setup"),
+    ):
+        await _boot(
             config=config,
             cmdline_args=cmdline_args,
-            device_manager=device_manager,
-        )
-        return device_manager
-    hooks = (
-        "validate_device_requirements",
-        "boardfarm_server_boot",
-        "boardfarm_server_configure",
-        "boardfarm_device_boot",
-        "boardfarm_device_configure",
-        "boardfarm_attached_device_boot",
-        "boardfarm_attached_device_configure",
-    )
-    for hook in hooks:
-        await _run_hook(
-            hook_name=hook,
             plugin_manager=plugin_manager,
-            config=config,
-            cmdline_args=cmdline_args,
             device_manager=device_manager,
         )
     return device_manager
@@ -255,10 +255,11 @@ class CPESW(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def get_board_logs(self, timeout: int = 300) -> str:
-        """Return board console logs for given timeout.
+    def get_board_logs(self, timeout: int = 300, idle_time: float = 2.0) -> str:
+        """Return board console logs once the console goes quiet.
 
-        :param timeout: log capture time in seconds
+        :param timeout: maximum log capture time in seconds
+        :param idle_time: seconds without console output ending the capture
         :return: captured logs
         """
         raise NotImplementedError
@@ -0,0 +1,31 @@
+"""Shared fixtures for boardfarm lib unit tests."""
+
+import os
+from collections.abc import Iterator
+
+import pytest
+from pytest_mock import MockerFixture
+
+from boardfarm3.lib.boardfarm_pexpect import BoardfarmPexpect
+
+
+@pytest.fixture(name="bash_session")
+def fixture_bash_session(mocker: MockerFixture) -> Iterator[BoardfarmPexpect]:
+    """Spawn a local bash session with a known shell prompt.
+
+    :param mocker: pytest mock object
+    :type mocker: MockerFixture
+    :yield: boardfarm pexpect session
+    """
+    mocker.patch.multiple(BoardfarmPexpect, __abstractmethods__=set())
+    session = BoardfarmPexpect(
+        "bash_session",
+        "bash",
+        save_console_logs="",
+        args=["--norc", "--noprofile"],
+        env={"PATH": os.getenv("PATH"), "TERM": "dumb", "PS1": "bf-prompt> "},
+    )
+    session._shell_prompt = ["bf-prompt> "]
+    session.expect(session._shell_prompt)
+    yield session
+    session.close()
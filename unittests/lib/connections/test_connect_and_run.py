@@ -0,0 +1,160 @@
+"""Unit tests for the connect and run module."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pexpect
+import pytest
+
+from boardfarm3.exceptions import DeviceConnectionError
+from boardfarm3.lib.connections.connect_and_run import (
+    ConnectionManager,
+    close_connection_manager,
+    connect_and_run,
+    get_connection_manager,
+)
+
+if TYPE_CHECKING:
+    from pytest_mock import MockerFixture
+
+
+class _Console:
+    """Runtime connectable with a console failing the first connections."""
+
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.connected = False
+        self.connects = 0
+
+    def connect_console(self) -> None:
+        self.connects += 1
+        if self.connects <= self.failures:
+            msg = "connection refused"
+            raise DeviceConnectionError(msg)
+        self.connected = True
+
+    def disconnect_console(self) -> None:
+        self.connected = False
+
+    def is_console_connected(self) -> bool:
+        return self.connected
+
+    @connect_and_run
+    def run(self, output: str) -> str:
+        return output
+
+    @connect_and_run
+    def run_on_dead_console(self) -> None:
+        msg = "console died"
+        raise pexpect.EOF(msg)
+
+
+@pytest.fixture(autouse=True)
+def fixture_no_sleep(mocker: MockerFixture) -> None:
+    """Do not wait between the connection attempts.
+
+    :param mocker: pytest mock object
+    :type mocker: MockerFixture
+    """
+    mocker.patch("boardfarm3.lib.connections.connect_and_run.sleep")
+
+
+def test_connect_and_run_reuses_connection() -> None:
+    """Ensure the console is connected once and kept across calls."""
+    console = _Console()
+    assert console.run("first") == "first"
+    assert console.run("second") == "second"
+    assert console.connects == 1
+    assert console.connected
+
+
+def test_connect_and_run_reconnects_with_backoff(mocker: MockerFixture) -> None:
+    """Ensure failed connections are retried with a growing delay.
+
+    :param mocker: pytest mock object
+    :type mocker: MockerFixture
+    """
+    mocker.patch("random.uniform", side_effect=lambda _low, high: high)
+    sleep = mocker.patch("boardfarm3.lib.connections.connect_and_run.sleep")
+    console = _Console(failures=3)
+    assert console.run("output") == "output"
+    assert [call.args[0] for call in sleep.call_args_list] == [1.0, 2.0, 4.0]
+
+
+def test_connect_and_run_gives_up() -> None:
+    """Ensure the connection error is raised after the last attempt."""
+    console = _Console(failures=10)
+    with pytest.raises(DeviceConnectionError, match="connection refused"):
+        console.run("output")
+    assert console.connects == 5
+
+
+def test_connect_and_run_drops_dead_console() -> None:
+    """Ensure a console failing during a call is reconnected on the next one."""
+    console = _Console()
+    with pytest.raises(pexpect.EOF):
+        console.run_on_dead_console()
+    assert not console.connected
+    assert console.run("output") == "output"
+    assert console.connects == 2
+
+
+class _ProbedConsole(_Console):
+    """Runtime connectable with a console dying after its first connection."""
+
+    def keepalive_console(self) -> None:
+        if self.connects == 1:
+            msg = "console died"
+            raise pexpect.EOF(msg)
+
+
+def test_connection_manager_check_reconnects() -> None:
+    """Ensure the keepalive probe reconnects a dead console."""
+    console = _ProbedConsole()
+    manager = ConnectionManager(console, keepalive_interval=0)
+    manager.ensure_connected()
+    manager.check()
+    assert console.connected
+    assert console.connects == 2
+
+
+@pytest.mark.parametrize("console", [_Console(), _ProbedConsole()])
+def test_connection_manager_check_leaves_disconnected_console(
+    console: _Console,
+) -> None:
+    """Ensure the keepalive probe does not reopen a console closed on purpose.
+
+    :param console: runtime connectable instance
+    :type console: _Console
+    """
+    manager = ConnectionManager(console, keepalive_interval=0)
+    manager.ensure_connected()
+    console.disconnect_console()
+    manager.check()
+    assert not console.connected
+    assert console.connects == 1
+
+
+def test_close_connection_manager() -> None:
+    """Ensure closing the manager disconnects and the next call reconnects."""
+    console = _Console()
+    assert console.run("output") == "output"
+    manager = get_connection_manager(console)
+    close_connection_manager(console)
+    assert manager._stop.is_set()
+    assert not console.connected
+    assert console.run("output") == "output"
+    assert get_connection_manager(console) is not manager
+    assert console.connects == 2
+
+
+def test_connect_and_run_invalid_instance() -> None:
+    """Ensure the decorator is only used with runtime connectable instances."""
+
+    @connect_and_run
+    def run(_instance: object) -> None:
+        pass
+
+    with pytest.raises(TypeError, match="RuntimeConnectable"):
+        run(object())
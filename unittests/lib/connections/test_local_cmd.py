@@ -0,0 +1,73 @@
+"""Unit tests for the local command and serial connection modules."""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from boardfarm3.exceptions import DeviceConnectionError
+from boardfarm3.lib.connections.local_cmd import LocalCmd
+from boardfarm3.lib.connections.serial_connection import SerialConnection
+
+_SHELL_PROMPT = ["bf-prompt> "]
+_ENV = {"PATH": os.getenv("PATH"), "TERM": "dumb", "PS1": "bf-prompt> "}
+
+
+@pytest.mark.asyncio
+async def test_local_cmd_async() -> None:
+    """Ensure a local command session can be used with asyncio."""
+    session = LocalCmd(
+        "local.console",
+        "bash",
+        save_console_logs="",
+        shell_prompt=_SHELL_PROMPT,
+        args=["--norc", "--noprofile"],
+        env=_ENV,
+    )
+    try:
+        await session.login_to_server_async()
+        output = await session.execute_command_async("echo hello")
+        assert output == "hello"
+    finally:
+        session.close()
+
+
+@pytest.mark.asyncio
+async def test_serial_connection_async() -> None:
+    """Ensure the serial session waits for the terminal using asyncio."""
+    session = SerialConnection(
+        "serial.console",
+        "bash",
+        save_console_logs="",
+        shell_prompt=_SHELL_PROMPT,
+        args=[
+            "-c",
+            "echo Terminal ready; PS1='bf-prompt> ' exec bash --norc --noprofile -i",
+        ],
+        env=_ENV,
+    )
+    try:
+        await session.login_to_server_async()
+        await session.expect(_SHELL_PROMPT, async_=True)
+        output = await session.execute_command_async("echo $((6 * 7))")
+        assert output == "42"
+    finally:
+        session.close()
+
+
+@pytest.mark.asyncio
+async def test_serial_connection_async_failure() -> None:
+    """Ensure a serial command exiting before the terminal is ready fails."""
+    session = SerialConnection(
+        "serial.console",
+        "false",
+        save_console_logs="",
+        shell_prompt=_SHELL_PROMPT,
+        env=_ENV,
+    )
+    try:
+        with pytest.raises(DeviceConnectionError):
+            await session.login_to_server_async()
+    finally:
+        session.close()
@@ -0,0 +1,132 @@
+"""Unit tests for the direct serial connection, run against a local pty pair."""
+
+from __future__ import annotations
+
+import os
+import termios
+import threading
+from typing import TYPE_CHECKING
+
+import pytest
+
+from boardfarm3.exceptions import DeviceConnectionError
+from boardfarm3.lib.connections.serial_connection import DirectSerialConnection
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+_SHELL_PROMPT = ["root@board:~# "]
+
+
+def _fake_shell(master_fd: int) -> None:
+    """Answer every command line like a shell printing the command's argument.
+
+    :param master_fd: master side of the pty pair
+    :type master_fd: int
+    """
+    received = b""
+    while True:
+        try:
+            data = os.read(master_fd, 1024)
+        except OSError:
+            return
+        if not data:
+            return
+        received += data
+        while b"\n" in received:
+            line, received = received.split(b"\n", 1)
+            command = line.decode()
+            output = command.removeprefix("echo ")
+            os.write(master_fd, f"{command}\r\n{output}\r\nroot@board:~# ".encode())
+
+
+@pytest.fixture(name="pty_pair")
+def fixture_pty_pair() -> Iterator[tuple[int, str]]:
+    """Open a pty pair standing in for a serial line.
+
+    :yield: master fd and the path of the slave tty
+    """
+    master_fd, slave_fd = os.openpty()
+    yield master_fd, os.ttyname(slave_fd)
+    os.close(slave_fd)
+    os.close(master_fd)
+
+
+def test_direct_serial_configures_tty(pty_pair: tuple[int, str]) -> None:
+    """Ensure the tty is opened with the requested line settings.
+
+    :param pty_pair: master fd and slave tty path
+    :type pty_pair: tuple[int, str]
+    """
+    _, tty = pty_pair
+    connection = DirectSerialConnection(
+        "board.console", f"{tty} 9600 rtscts", save_console_logs=""
+    )
+    try:
+        iflag, _, cflag, lflag, ispeed, ospeed, _ = termios.tcgetattr(
+            connection.child_fd
+        )
+        assert ispeed == ospeed == termios.B9600
+        assert cflag & termios.CRTSCTS
+        assert not lflag & (termios.ECHO | termios.ICANON)
+        assert not iflag & termios.IXON
+    finally:
+        connection.close()
+    assert not connection.isalive()
+
+
+def test_direct_serial_execute_command(pty_pair: tuple[int, str]) -> None:
+    """Ensure commands are executed over the tty.
+
+    :param pty_pair: master fd and slave tty path
+    :type pty_pair: tuple[int, str]
+    """
+    master_fd, tty = pty_pair
+    threading.Thread(target=_fake_shell, args=(master_fd,), daemon=True).start()
+    connection = DirectSerialConnection(
+        "board.console", tty, save_console_logs="", shell_prompt=_SHELL_PROMPT
+    )
+    try:
+        connection.login_to_server()
+        assert connection.execute_command("echo hello") == "hello"
+        connection.sendcontrol("c")
+    finally:
+        connection.close()
+
+
+@pytest.mark.asyncio
+async def test_direct_serial_execute_command_async(pty_pair: tuple[int, str]) -> None:
+    """Ensure commands are executed over the tty using asyncio.
+
+    :param pty_pair: master fd and slave tty path
+    :type pty_pair: tuple[int, str]
+    """
+    master_fd, tty = pty_pair
+    threading.Thread(target=_fake_shell, args=(master_fd,), daemon=True).start()
+    connection = DirectSerialConnection(
+        "board.console", tty, save_console_logs="", shell_prompt=_SHELL_PROMPT
+    )
+    try:
+        await connection.login_to_server_async()
+        assert await connection.execute_command_async("echo hello") == "hello"
+    finally:
+        connection.close()
+
+
+def test_direct_serial_invalid_settings(pty_pair: tuple[int, str]) -> None:
+    """Ensure unsupported line settings and missing ttys are reported.
+
+    :param pty_pair: master fd and slave tty path
+    :type pty_pair: tuple[int, str]
+    """
+    _, tty = pty_pair
+    with pytest.raises(ValueError, match="Unsupported baud rate"):
+        DirectSerialConnection("board.console", f"{tty} 12345", save_console_logs="")
+    with pytest.raises(ValueError, match="Unsupported flow control"):
+        DirectSerialConnection(
+            "board.console", f"{tty} 9600 dtrdsr", save_console_logs=""
+        )
+    with pytest.raises(DeviceConnectionError, match="Failed to open"):
+        DirectSerialConnection(
+            "board.console", "/dev/no-such-tty", save_console_logs=""
+        )
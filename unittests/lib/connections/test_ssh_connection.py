@@ -0,0 +1,132 @@
+"""Unit tests for the SSH connection module."""
+
+from __future__ import annotations
+
+import subprocess
+from typing import TYPE_CHECKING
+
+import pexpect
+import pytest
+
+from boardfarm3.exceptions import NotSupportedError
+from boardfarm3.lib.connections.ssh_connection import SSHConnection
+
+if TYPE_CHECKING:
+    from pytest_mock import MockerFixture
+
+
+def _ssh_connection(mocker: MockerFixture, multiplex: bool = True) -> SSHConnection:
+    mocker.patch.object(pexpect.spawn, attribute="__init__", return_value=None)
+    mocker.patch.object(SSHConnection, "_configure_logging")
+    return SSHConnection(
+        "device.console",
+        "10.0.0.1",
+        "root",
+        ["root@device:~#"],
+        multiplex=multiplex,
+    )
+
+
+def test_ssh_connection_is_multiplexed(mocker: MockerFixture) -> None:
+    """Ensure the ssh session is started as a multiplexed master connection.
+
+    :param mocker: pytest mock object
+    :type mocker: MockerFixture
+    """
+    spawn_mock = mocker.patch.object(
+        pexpect.spawn, attribute="__init__", return_value=None
+    )
+    mocker.patch.object(SSHConnection, "_configure_logging")
+    SSHConnection("device.console", "10.0.0.1", "root", ["root@device:~#"])
+    assert "-o ControlMaster=auto" in spawn_mock.call_args.kwargs["args"]
+
+
+def test_exec(mocker: MockerFixture) -> None:
+    """Ensure exec runs the command on a separate non-interactive channel.
+
+    :param mocker: pytest mock object
+    :type mocker: MockerFixture
+    """
+    connection = _ssh_connection(mocker)
+    run_mock = mocker.patch(
+        "subprocess.run",
+        return_value=subprocess.CompletedProcess([], 0, "1234\n", ""),
+    )
+    sendline_mock = mocker.patch.object(connection, "sendline")
+    result = connection.exec("pidof dnsmasq")
+    assert (result.returncode, result.stdout) == (0, "1234\n")
+    args = run_mock.call_args.args[0]
+    assert args[0] == "ssh"
+    assert args[-1] == "pidof dnsmasq"
+    assert "-o BatchMode=yes" in args
+    sendline_mock.assert_not_called()
+
+
+def test_exec_without_multiplexing(mocker: MockerFixture) -> None:
+    """Ensure exec is refused when there is no master connection to reuse.
+
+    :param mocker: pytest mock object
+    :type mocker: MockerFixture
+    """
+    connection = _ssh_connection(mocker, multiplex=False)
+    assert not connection.is_exec_supported
+    with pytest.raises(NotSupportedError):
+        connection.exec("pidof dnsmasq")
+
+
+def test_exec_timeout(mocker: MockerFixture) -> None:
+    """Ensure an exec timing out raises the timeout of the consoles.
+
+    :param mocker: pytest mock object
+    :type mocker: MockerFixture
+    """
+    connection = _ssh_connection(mocker)
+    connection.name = "device.console"
+    mocker.patch(
+        "subprocess.run",
+        side_effect=subprocess.TimeoutExpired("ssh", 1),
+    )
+    with pytest.raises(pexpect.TIMEOUT, match="did not complete in 1s"):
+        connection.exec("sleep 5", timeout=1)
+
+
+def test_multiplexing_socket_per_local_user(mocker: MockerFixture) -> None:
+    """Ensure the master socket of another local user is never reused.
+
+    :param mocker: pytest mock object
+    :type mocker: MockerFixture
+    """
+    spawn_mock = mocker.patch.object(
+        pexpect.spawn, attribute="__init__", return_value=None
+    )
+    mocker.patch.object(SSHConnection, "_configure_logging")
+    SSHConnection("device.console", "10.0.0.1", "root", ["root@device:~#"])
+    (control_path,) = [
+        arg
+        for arg in spawn_mock.call_args.kwargs["args"]
+        if arg.startswith("-o ControlPath=")
+    ]
+    assert "%i" in control_path
+
+
+@pytest.mark.parametrize("returncode", [0, 255])
+def test_is_exec_supported_checks_the_master(
+    mocker: MockerFixture, returncode: int
+) -> None:
+    """Ensure exec is only used while the master connection is up.
+
+    :param mocker: pytest mock object
+    :type mocker: MockerFixture
+    :param returncode: exit code of ``ssh -O check``
+    :type returncode: int
+    """
+    connection = _ssh_connection(mocker)
+    run_mock = mocker.patch(
+        "subprocess.run",
+        return_value=subprocess.CompletedProcess([], returncode, b"", b""),
+    )
+    assert connection.is_exec_supported is (returncode == 0)
+    assert connection.is_exec_supported is (returncode == 0)
+    assert run_mock.call_args.args[0][-2:] == ["-O", "check"]
+    # a master connection found stays up with the console
+    assert run_mock.call_count == (1 if returncode == 0 else 2)
@@ -1,6 +1,8 @@
 """Unit tests for boardfarm pexpect module."""
 
 import logging
+import threading
+import time
 from io import StringIO
 from pathlib import Path
 
@@ -126,6 +128,295 @@ def test_write_in_log_wrapper(input_line: str, expected_output: str) -> None:
     logger.setLevel(logging.DEBUG)
     log_wrapper = _LogWrapper(logger)
     log_wrapper.write(input_line)
+    log_wrapper.close()
     stream.seek(0)
     captured_logs = stream.read()
     assert captured_logs == expected_output
+
+
+def test_log_wrapper_across_chunks() -> None:
+    """Ensure sequences split over two console reads are sanitized."""
+    logger = logging.getLogger("__name__")
+    stream = StringIO()
+    logger.addHandler(logging.StreamHandler(stream))
+    logger.setLevel(logging.DEBUG)
+    log_wrapper = _LogWrapper(logger)
+    chunks = [
+        b"\x1b[1;3",
+        b"2mOK\x1b[0m\r",
+        b"\n 10%\x08",
+        b"\x1b[K\x08\x1b[K\x08 ",
+        b"\x08\x08 \x0899%\r",
+        "\n\u00e9t\u00e9\n".encode()[:2],
+        "\n\u00e9t\u00e9\n".encode()[2:],
+    ]
+    for chunk in chunks:
+        log_wrapper.write(chunk)
+    log_wrapper.close()
+    stream.seek(0)
+    assert stream.read() == "OK\n99%\n\u00e9t\u00e9\n"
+
+
+class _BlockedHandler(logging.Handler):
+    """Log handler which waits for an event before storing the records."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.event = threading.Event()
+        self.lines: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.event.wait()
+        self.lines.append(record.getMessage())
+
+
+@pytest.mark.parametrize(
+    ("overflow_policy", "expected_lines"),
+    [
+        ("block", [f"line {index}" for index in range(5)]),
+        (
+            "drop",
+            [
+                "line 0",
+                "line 1",
+                "3 console output chunks were dropped from the log",
+            ],
+        ),
+        ("spill", [f"line {index}" for index in range(5)]),
+    ],
+)
+def test_log_wrapper_overflow_policy(
+    overflow_policy: str,
+    expected_lines: list[str],
+) -> None:
+    """Ensure a full console log queue is handled as per the overflow policy.
+
+    :param overflow_policy: overflow policy of the log queue
+    :type overflow_policy: str
+    :param expected_lines: lines expected in the log
+    :type expected_lines: list[str]
+    """
+    logger = logging.getLogger(f"pexpect.overflow_{overflow_policy}")
+    logger.propagate = False
+    handler = _BlockedHandler()
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    log_wrapper = _LogWrapper(logger, 1, overflow_policy)
+    if overflow_policy == "block":
+        threading.Timer(0.2, handler.event.set).start()
+    log_wrapper.write("line 0\n")
+    # wait for the writer thread to pick the first line up
+    while log_wrapper._queue.qsize():
+        time.sleep(0.01)
+    for index in range(1, 5):
+        log_wrapper.write(f"line {index}\n")
+    handler.event.set()
+    log_wrapper.close()
+    assert handler.lines == expected_lines
+    assert log_wrapper.dropped_chunks == (3 if overflow_policy == "drop" else 0)
+
+
+def test_log_wrapper_invalid_overflow_policy() -> None:
+    """Ensure an unknown overflow policy is rejected."""
+    with pytest.raises(ValueError, match="Invalid console log overflow policy"):
+        _LogWrapper(logging.getLogger("__name__"), overflow_policy="ignore")
+
+
+def test_execute_framed_command(bash_session: BoardfarmPexpect) -> None:
+    """Ensure framed execution returns the command output and exit status.
+
+    :param bash_session: local bash session
+    :type bash_session: BoardfarmPexpect
+    """
+    assert bash_session.execute_framed_command("echo hello; echo world") == (
+        "hello\r\nworld",
+        0,
+    )
+    assert bash_session.execute_framed_command("sh -c 'exit 3'") == ("", 3)
+    assert bash_session.execute_framed_command("true &")[1] == 0
+
+
+@pytest.mark.parametrize(
+    ("command", "output"),
+    [
+        ("echo hello # trailing comment", "hello"),
+        ("echo hello;", "hello"),
+        ("for word in hello world\ndo echo $word\ndone", "hello\r\nworld"),
+        ("cat <<EOF\nhello\nEOF", "hello"),
+    ],
+)
+def test_execute_framed_command_shell_syntax(
+    bash_session: BoardfarmPexpect, command: str, output: str
+) -> None:
+    """Ensure comments, multi-line commands and heredocs do not hide the end.
+
+    :param bash_session: local bash session
+    :type bash_session: BoardfarmPexpect
+    :param command: command to execute
+    :type command: str
+    :param output: expected output of the command
+    :type output: str
+    """
+    assert bash_session.execute_framed_command(command, timeout=5) == (output, 0)
+    with bash_session.stream_command(command, timeout=5) as lines:
+        assert "\r\n".join(lines) == output
+    assert lines.exit_status == 0
+
+
+def test_enable_framed_execution(bash_session: BoardfarmPexpect) -> None:
+    """Ensure framed execution is enabled on a POSIX shell.
+
+    :param bash_session: local bash session
+    :type bash_session: BoardfarmPexpect
+    """
+    assert not bash_session.framed_execution
+    assert bash_session.enable_framed_execution()
+    assert bash_session.framed_execution
+
+
+def test_execute_batch(bash_session: BoardfarmPexpect) -> None:
+    """Ensure a batch returns the output and exit status of each command.
+
+    :param bash_session: local bash session
+    :type bash_session: BoardfarmPexpect
+    """
+    commands = ["echo one", "false", "sleep 0.1 &", *[f"echo {i}" for i in range(12)]]
+    results = bash_session.execute_batch(commands)
+    assert results[:3] == [("one", 0), ("", 1), (results[2][0], 0)]
+    assert [output for output, _ in results[3:]] == [str(i) for i in range(12)]
+    assert bash_session.execute_framed_command("echo done") == ("done", 0)
+
+
+def test_set_search_window(bash_session: BoardfarmPexpect) -> None:
+    """Ensure a bounded search window still finds the prompt after long output.
+
+    :param bash_session: local bash session
+    :type bash_session: BoardfarmPexpect
+    """
+    bash_session.set_search_window(search_window=1024, buffer_size=8192)
+    bash_session.sendline("seq 1 100000")
+    bash_session.expect(bash_session._shell_prompt)
+    assert bash_session.before.rstrip().endswith("99999\r\n100000")
+    assert len(bash_session.before) <= 2 * 8192
+    # every chunk read is searched once within the window
+    assert bash_session.scanned_chars < 1024 * 1000
+
+
+def test_set_buffer_size_only(bash_session: BoardfarmPexpect) -> None:
+    """Ensure the buffer is bounded without a search window.
+
+    :param bash_session: local bash session
+    :type bash_session: BoardfarmPexpect
+    """
+    bash_session.set_search_window(search_window=None, buffer_size=8192)
+    bash_session.sendline("seq 1 100000")
+    bash_session.expect(bash_session._shell_prompt)
+    assert bash_session.before.rstrip().endswith("99999\r\n100000")
+    assert len(bash_session.before) <= 2 * 8192
+    assert bash_session.searchwindowsize is None
+
+
+def test_set_search_window_invalid_buffer_size(
+    bash_session: BoardfarmPexpect,
+) -> None:
+    """Ensure a buffer smaller than the search window is rejected.
+
+    :param bash_session: local bash session
+    :type bash_session: BoardfarmPexpect
+    """
+    with pytest.raises(ValueError, match="is smaller than the search window"):
+        bash_session.set_search_window(search_window=1024, buffer_size=512)
+
+
+def test_stream_command(bash_session: BoardfarmPexpect) -> None:
+    """Ensure the output lines and the exit status of a command are streamed.
+
+    :param bash_session: local bash session
+    :type bash_session: BoardfarmPexpect
+    """
+    stream = bash_session.stream_command("seq 1 3; false")
+    assert list(stream) == ["1", "2", "3"]
+    assert stream.exit_status == 1
+    assert bash_session.execute_framed_command("echo done") == ("done", 0)
+
+
+def test_wait_until_quiet_search_window(bash_session: BoardfarmPexpect) -> None:
+    """Ensure no output is lost when it is longer than the search window.
+
+    :param bash_session: local bash session
+    :type bash_session: BoardfarmPexpect
+    """
+    expected = bash_session.execute_framed_command("seq 1 3000")[0]
+    bash_session.set_search_window(100)
+    bash_session.sendline("seq 1 3000")
+    output = bash_session.wait_until_quiet(idle_time=0.5, timeout=30)
+    assert expected in output
+
+
+def test_stream_command_stop(bash_session: BoardfarmPexpect) -> None:
+    """Ensure the command is interrupted once the stop predicate matches.
+
+    :param bash_session: local bash session
+    :type bash_session: BoardfarmPexpect
+    """
+    # bash may exit on a ^C landing while it runs the loop itself
+    with bash_session.stream_command(
+        "sh -c 'for i in $(seq 1 100); do echo line $i; sleep 0.1; done'",
+        stop=lambda line: line == "line 3",
+    ) as stream:
+        assert list(stream) == ["line 1", "line 2", "line 3"]
+    assert stream.exit_status is None
+    assert bash_session.execute_framed_command("echo done") == ("done", 0)
+
+
+def test_stream_command_timeout(bash_session: BoardfarmPexpect) -> None:
+    """Ensure the command is interrupted on timeout.
+
+    :param bash_session: local bash session
+    :type bash_session: BoardfarmPexpect
+    """
+    stream = bash_session.stream_command("echo start; sleep 30", timeout=1)
+    assert next(stream) == "start"
+    with pytest.raises(pexpect.TIMEOUT):
+        next(stream)
+    assert bash_session.execute_framed_command("echo done") == ("done", 0)
+
+
+def test_wait_until_quiet(bash_session: BoardfarmPexpect) -> None:
+    """Ensure the wait ends once the output stops, well before the timeout.
+
+    :param bash_session: local bash session
+    :type bash_session: BoardfarmPexpect
+    """
+    bash_session.sendline("for i in 1 2 3; do echo tick $i; sleep 0.2; done")
+    start = time.monotonic()
+    output = bash_session.wait_until_quiet(idle_time=0.5, timeout=30)
+    assert time.monotonic() - start < 5
+    assert "tick 3" in output
+    assert output.endswith("bf-prompt> ")
+
+
+def test_wait_until_quiet_timeout(bash_session: BoardfarmPexpect) -> None:
+    """Ensure the wait is capped by the timeout on a chatty console.
+
+    :param bash_session: local bash session
+    :type bash_session: BoardfarmPexpect
+    """
+    bash_session.sendline("while true; do echo chatty; sleep 0.1; done")
+    start = time.monotonic()
+    output = bash_session.wait_until_quiet(idle_time=1, timeout=1.5)
+    assert time.monotonic() - start < 3
+    assert "chatty" in output
+    bash_session._interrupt_command()
+
+
+@pytest.mark.asyncio
+async def test_wait_until_quiet_async(bash_session: BoardfarmPexpect) -> None:
+    """Ensure the asyncio wait ends once the output stops.
+
+    :param bash_session: local bash session
+    :type bash_session: BoardfarmPexpect
+    """
+    bash_session.sendline("echo async tick")
+    output = await bash_session.wait_until_quiet_async(idle_time=0.5, timeout=30)
+    assert "async tick" in output
@@ -0,0 +1,99 @@
+"""Unit tests for the boot fingerprint module."""
+
+from __future__ import annotations
+
+from argparse import Namespace
+from typing import TYPE_CHECKING, ClassVar
+
+from pluggy import PluginManager
+
+from boardfarm3 import PROJECT_NAME, hookimpl
+from boardfarm3.devices.base_devices.boardfarm_device import BoardfarmDevice
+from boardfarm3.lib.boot_fingerprint import (
+    FingerprintStore,
+    fingerprint,
+    settled_devices,
+)
+from boardfarm3.lib.boot_scheduler import (
+    BootDependencies,
+    BootDependency,
+    build_boot_graph,
+)
+from boardfarm3.plugins.hookspecs import devices as device_hookspecs
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_fingerprint_store_round_trip(tmp_path: Path) -> None:
+    """Ensure the fingerprints are recorded, merged and forgotten.
+
+    :param tmp_path: temporary directory
+    :type tmp_path: Path
+    """
+    store = FingerprintStore(tmp_path / "cache")
+    assert store.lookup("board/wan") is None
+    store.update({"board/wan": fingerprint("wan", {"ipaddr": "10.0.0.1"})})
+    # another process sharing the store
+    FingerprintStore(tmp_path / "cache").update({"board/lan": "lan"})
+    assert store.lookup("board/wan") == fingerprint("wan", {"ipaddr": "10.0.0.1"})
+    assert store.lookup("board/wan") != fingerprint("wan", {"ipaddr": "10.0.0.2"})
+    store.update({"board/wan": None})
+    assert store.lookup("board/wan") is None
+    assert store.lookup("board/lan") == "lan"
+
+
+def test_fingerprint_store_ignores_corrupted_index(tmp_path: Path) -> None:
+    """Ensure a corrupted index boots every device.
+
+    :param tmp_path: temporary directory
+    :type tmp_path: Path
+    """
+    (tmp_path / "fingerprints.json").write_text("{")
+    assert FingerprintStore(tmp_path).lookup("board/wan") is None
+
+
+class _Server:
+    """Server template."""
+
+
+class _FakeDevice(BoardfarmDevice):
+    def __init__(self, name: str) -> None:
+        super().__init__({"name": name}, Namespace())
+
+
+class _FakeServer(_FakeDevice, _Server):
+    boot_dependencies: ClassVar[BootDependencies] = {"boardfarm_server_boot": ()}
+
+    @hookimpl
+    def boardfarm_server_boot(self) -> None:
+        """Boot the server."""
+
+
+class _FakeCPE(_FakeDevice):
+    boot_dependencies: ClassVar[BootDependencies] = {
+        "boardfarm_device_boot": (BootDependency(_Server, "boardfarm_server_boot"),),
+    }
+
+    @hookimpl
+    def boardfarm_device_boot(self) -> None:
+        """Boot the CPE."""
+
+
+class _FakeLAN(_FakeDevice):
+    # waits for every earlier step
+    @hookimpl
+    def boardfarm_attached_device_boot(self) -> None:
+        """Boot the LAN."""
+
+
+def test_settled_devices_boot_the_dependents_of_booted_devices() -> None:
+    """Ensure a device waiting for a booted device is booted too."""
+    plugin_manager = PluginManager(PROJECT_NAME)
+    plugin_manager.add_hookspecs(device_hookspecs)
+    for device in (_FakeServer("wan"), _FakeCPE("cpe"), _FakeLAN("lan")):
+        plugin_manager.register(device, device.device_name)
+    steps = build_boot_graph(plugin_manager)
+    assert settled_devices(steps, {"wan", "cpe", "lan"}) == {"wan", "cpe", "lan"}
+    assert settled_devices(steps, {"cpe", "lan"}) == set()
+    assert settled_devices(steps, {"wan", "lan"}) == {"wan"}
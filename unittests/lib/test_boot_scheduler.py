@@ -0,0 +1,305 @@
+"""Unit tests for the boot scheduler module."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from argparse import Namespace
+from typing import ClassVar
+from unittest import mock
+
+import pytest
+from pluggy import PluginManager
+
+from boardfarm3 import PROJECT_NAME, hookimpl
+from boardfarm3.devices.bananapirdkb_cpe import BananaPiRDKBCPE
+from boardfarm3.devices.base_devices.boardfarm_device import BoardfarmDevice
+from boardfarm3.devices.linux_router import LinuxRouter
+from boardfarm3.lib.boot_scheduler import (
+    BootDependencies,
+    BootDependency,
+    build_boot_graph,
+    run_boot_graph,
+    run_stage,
+    stage_steps,
+)
+from boardfarm3.lib.device_manager import _get_attribute_with_ignore_exception
+from boardfarm3.plugins.hookspecs import devices as device_hookspecs
+from boardfarm3.plugins.setup_environment import _run_hook
+
+
+class _Provisioner:
+    """Provisioner template."""
+
+
+class _CPE:
+    """CPE template."""
+
+
+class _FakeDevice(BoardfarmDevice):
+    """Device recording the boot steps it ran."""
+
+    def __init__(self, name: str, steps: list[str]) -> None:
+        super().__init__({"name": name}, Namespace())
+        self.steps = steps
+
+
+class _SlowServer(_FakeDevice):
+    # not needed by the CPE, boots until the CPE booted
+    cpe_booted: asyncio.Event
+    loop: asyncio.AbstractEventLoop
+
+    @hookimpl
+    async def boardfarm_server_boot_async(self) -> None:
+        await asyncio.wait_for(self.cpe_booted.wait(), timeout=5)
+        self.steps.append("acs server_boot")
+
+
+class _FakeProvisioner(_FakeDevice, _Provisioner):
+    # waits for its own stages only
+    boot_dependencies: ClassVar[BootDependencies] = {
+        "boardfarm_server_configure": (),
+    }
+
+    @hookimpl
+    def boardfarm_server_configure(self) -> None:
+        self.steps.append("provisioner server_configure")
+
+
+class _FakeCPE(_FakeDevice, _CPE):
+    boot_dependencies: ClassVar[BootDependencies] = {
+        "boardfarm_device_boot": (
+            BootDependency(_Provisioner, "boardfarm_server_configure"),
+        ),
+    }
+
+    def __init__(self, name: str, steps: list[str], server: _SlowServer) -> None:
+        super().__init__(name, steps)
+        self.server = server
+
+    @hookimpl
+    def boardfarm_device_boot(self, device_manager: object) -> None:
+        assert device_manager == "device manager"
+        self.steps.append("cpe device_boot")
+        # blocking hooks run in a worker thread
+        self.server.loop.call_soon_threadsafe(self.server.cpe_booted.set)
+
+
+class _FakeLAN(_FakeDevice):
+    boot_dependencies: ClassVar[BootDependencies] = {
+        "boardfarm_attached_device_boot": (
+            BootDependency(_CPE, "boardfarm_device_boot"),
+        ),
+    }
+
+    @hookimpl
+    async def boardfarm_attached_device_boot_async(self) -> None:
+        self.steps.append("lan attached_device_boot")
+
+    @hookimpl
+    def boardfarm_attached_device_configure(self) -> None:
+        self.steps.append("lan attached_device_configure")
+
+
+def _plugin_manager(*devices: BoardfarmDevice) -> PluginManager:
+    plugin_manager = PluginManager(PROJECT_NAME)
+    plugin_manager.add_hookspecs(device_hookspecs)
+    for device in devices:
+        # like DeviceManager.register_device, for the properties of real devices
+        with mock.patch.object(
+            type(device), "__getattribute__", _get_attribute_with_ignore_exception
+        ):
+            plugin_manager.register(device, device.device_name)
+    return plugin_manager
+
+
+def test_boot_graph_skips_unrelated_barriers() -> None:
+    """Ensure devices only wait for the devices they depend on."""
+    steps: list[str] = []
+    server = _SlowServer("acs", steps)
+    plugin_manager = _plugin_manager(
+        server,
+        _FakeProvisioner("provisioner", steps),
+        _FakeCPE("cpe", steps, server),
+        _FakeLAN("lan", steps),
+    )
+
+    async def boot() -> None:
+        server.cpe_booted = asyncio.Event()
+        server.loop = asyncio.get_running_loop()
+        await run_boot_graph(
+            build_boot_graph(plugin_manager),
+            {"config": None, "cmdline_args": None, "device_manager": "device manager"},
+        )
+
+    asyncio.run(boot())
+    assert steps.index("cpe device_boot") < steps.index("acs server_boot")
+    assert steps.index("provisioner server_configure") < steps.index("cpe device_boot")
+    assert steps.index("cpe device_boot") < steps.index("lan attached_device_boot")
+    # the LAN configuration did not declare anything, it waits for all devices
+    assert steps[-1] == "lan attached_device_configure"
+
+
+def test_boot_graph_cpe_waits_for_router() -> None:
+    """Ensure the BananaPi CPE boots once the router is configured."""
+    router = LinuxRouter({"name": "router", "type": "linux_router"}, Namespace())
+    cpe = BananaPiRDKBCPE({"name": "board", "type": "bpi"}, Namespace())
+    steps = build_boot_graph(_plugin_manager(router, cpe))
+    cpe_boot = next(
+        step
+        for step in steps
+        if step.plugin is cpe and step.stage == "boardfarm_device_boot"
+    )
+    assert {(step.plugin_name, step.stage) for step in cpe_boot.requires} >= {
+        ("router", "boardfarm_server_boot"),
+        ("router", "boardfarm_server_configure"),
+    }
+
+
+def test_boot_graph_rejects_later_stages() -> None:
+    """Ensure a stage cannot wait for a later stage, which could deadlock."""
+
+    class _BadCPE(_FakeCPE):
+        boot_dependencies: ClassVar[BootDependencies] = {
+            "boardfarm_device_boot": (
+                BootDependency(_CPE, "boardfarm_attached_device_boot"),
+            ),
+        }
+
+    steps: list[str] = []
+    server = _SlowServer("acs", steps)
+    plugin_manager = _plugin_manager(server, _BadCPE("cpe", steps, server))
+    with pytest.raises(ValueError, match="can only wait for earlier stages"):
+        build_boot_graph(plugin_manager)
+
+
+class _LegacyDevice(_FakeDevice):
+    """Device without async implementation, tracking the threads in use."""
+
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    @hookimpl
+    def boardfarm_device_configure(self) -> None:
+        with self.lock:
+            _LegacyDevice.running += 1
+            _LegacyDevice.peak = max(_LegacyDevice.peak, _LegacyDevice.running)
+        time.sleep(0.2)
+        with self.lock:
+            _LegacyDevice.running -= 1
+        self.steps.append(f"{self.device_name} {threading.current_thread().name}")
+
+
+class _AsyncDevice(_FakeDevice):
+    @hookimpl
+    def boardfarm_device_configure(self) -> None:
+        msg = "the async implementation is preferred"
+        raise AssertionError(msg)
+
+    @hookimpl
+    async def boardfarm_device_configure_async(self) -> None:
+        await asyncio.sleep(0.1)
+        self.steps.append(f"{self.device_name} asyncio")
+
+
+def test_run_stage_mixes_modes(caplog: pytest.LogCaptureFixture) -> None:
+    """Ensure blocking implementations run in bounded threads next to asyncio.
+
+    :param caplog: log capture fixture
+    :type caplog: pytest.LogCaptureFixture
+    """
+    steps: list[str] = []
+    plugin_manager = _plugin_manager(
+        _AsyncDevice("wan", steps),
+        *(_LegacyDevice(f"legacy{index}", steps) for index in range(3)),
+    )
+    caplog.set_level(logging.INFO)
+    asyncio.run(
+        run_stage(
+            stage_steps(plugin_manager, "boardfarm_device_configure"),
+            {"config": None, "cmdline_args": None, "device_manager": None},
+            max_workers=2,
+        )
+    )
+    # side by side, but not more than the workers
+    assert _LegacyDevice.peak == 2
+    assert steps[0] == "wan asyncio"
+    assert all("boot_" in step for step in steps[1:])
+    assert "boardfarm_device_configure ran in asyncio mode: wan" in caplog.text
+    assert (
+        "boardfarm_device_configure ran in thread mode: legacy0, legacy1, legacy2"
+        in caplog.text
+    )
+
+
+class _FirstCPE(_FakeDevice):
+    @hookimpl(tryfirst=True)
+    def boardfarm_device_boot(self) -> None:
+        time.sleep(0.2)
+        self.steps.append(f"{self.device_name} first")
+
+
+class _RegularDevice(_FakeDevice):
+    @hookimpl
+    async def boardfarm_device_boot_async(self) -> None:
+        self.steps.append(f"{self.device_name} regular")
+
+
+class _LastDevice(_FakeDevice):
+    @hookimpl(trylast=True)
+    def boardfarm_device_boot(self) -> None:
+        self.steps.append(f"{self.device_name} last")
+
+
+@pytest.mark.parametrize("graph", [False, True])
+def test_tryfirst_and_trylast_order_the_stage(graph: bool) -> None:
+    """Ensure tryfirst steps complete before the others and trylast ones after.
+
+    :param graph: True to run the boot graph, False the stage only
+    :type graph: bool
+    """
+    steps: list[str] = []
+    plugin_manager = _plugin_manager(
+        _LastDevice("lan", steps),
+        _FirstCPE("cpe", steps),
+        _RegularDevice("wan", steps),
+    )
+    hook_kwargs = {"config": None, "cmdline_args": None, "device_manager": None}
+    if graph:
+        asyncio.run(run_boot_graph(build_boot_graph(plugin_manager), hook_kwargs))
+    else:
+        asyncio.run(
+            run_stage(stage_steps(plugin_manager, "boardfarm_device_boot"), hook_kwargs)
+        )
+    assert steps == ["cpe first", "wan regular", "lan last"]
+
+
+@pytest.mark.parametrize("with_async_device", [False, True])
+def test_run_hook_threads_only_mixed_stages(with_async_device: bool) -> None:
+    """Ensure blocking implementations only run in threads next to async ones.
+
+    :param with_async_device: True if a device has an async implementation
+    :type with_async_device: bool
+    """
+    steps: list[str] = []
+    devices: list[BoardfarmDevice] = [_LegacyDevice("legacy", steps)]
+    if with_async_device:
+        devices.append(_AsyncDevice("wan", steps))
+    device_manager = mock.Mock()
+    device_manager.get_devices_by_type.return_value = {
+        device.device_name: device for device in devices
+    }
+    asyncio.run(
+        _run_hook(
+            hook_name="boardfarm_device_configure",
+            plugin_manager=_plugin_manager(*devices),
+            config=mock.Mock(),
+            cmdline_args=Namespace(boot_workers=2),
+            device_manager=device_manager,
+        )
+    )
+    thread = "boot_0" if with_async_device else "MainThread"
+    assert f"legacy {thread}" in steps
@@ -0,0 +1,127 @@
+"""Unit tests for the boot trace module."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from argparse import Namespace
+from typing import TYPE_CHECKING
+
+from pluggy import PluginManager
+
+from boardfarm3 import PROJECT_NAME, hookimpl
+from boardfarm3.devices.base_devices.boardfarm_device import BoardfarmDevice
+from boardfarm3.lib.boardfarm_pexpect import traced_command
+from boardfarm3.lib.boot_scheduler import run_stage, stage_steps
+from boardfarm3.lib.boot_trace import (
+    SUMMARY_FILE_NAME,
+    TRACE_FILE_NAME,
+    BootTrace,
+    Span,
+    span,
+    tracing,
+)
+from boardfarm3.plugins.hookspecs import devices as device_hookspecs
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+class _FakeConsole:
+    """Console running framed commands on behalf of execute_command."""
+
+    _session_name = "board.console"
+
+    @traced_command
+    def execute_command(self, command: str) -> str:
+        return self.execute_framed_command(command)[0]
+
+    @traced_command
+    def execute_framed_command(self, command: str) -> tuple[str, int]:
+        return command, 0
+
+
+class _FakeBoard(BoardfarmDevice):
+    def __init__(self) -> None:
+        super().__init__({"name": "board"}, Namespace())
+        self.console = _FakeConsole()
+
+    @hookimpl
+    def boardfarm_device_boot(self) -> None:
+        self.console.execute_command("uptime")
+
+
+def test_tracing_writes_device_timeline(tmp_path: Path) -> None:
+    """Ensure the commands of a boot step run in a thread belong to its device.
+
+    :param tmp_path: temporary directory
+    :type tmp_path: Path
+    """
+    plugin_manager = PluginManager(PROJECT_NAME)
+    plugin_manager.add_hookspecs(device_hookspecs)
+    plugin_manager.register(_FakeBoard(), "board")
+    with tracing(str(tmp_path)), span("boardfarm_setup_env", "setup"):
+        asyncio.run(
+            run_stage(
+                stage_steps(plugin_manager, "boardfarm_device_boot"),
+                {"config": None, "cmdline_args": None, "device_manager": None},
+            )
+        )
+    events = json.loads((tmp_path / TRACE_FILE_NAME).read_text())["traceEvents"]
+    names = {
+        (event["name"], event["pid"], event.get("tid")): event["args"]["name"]
+        for event in events
+        if event["ph"] == "M"
+    }
+    assert names == {
+        ("process_name", 0, None): "boardfarm",
+        ("process_name", 1, None): "board",
+        ("thread_name", 0, 0): "boot",
+        ("thread_name", 1, 0): "boot",
+        ("thread_name", 1, 2): "board.console",
+    }
+    spans = [
+        (event["name"], event["cat"], event["pid"], event["tid"])
+        for event in events
+        if event["ph"] == "X"
+    ]
+    # the framed command run for execute_command is not recorded again
+    assert spans == [
+        ("boardfarm_setup_env", "setup", 0, 0),
+        ("boardfarm_device_boot", "hook", 1, 0),
+        ("uptime", "command", 1, 2),
+    ]
+    # start, duration, commands, time in commands, device / step
+    summary = (tmp_path / SUMMARY_FILE_NAME).read_text().splitlines()
+    assert summary[3].split()[2:] == [
+        "1",
+        "0.0s",
+        "boardfarm",
+        "/",
+        "boardfarm_setup_env",
+    ]
+    assert summary[4].split()[0] == "*"
+    assert summary[4].split()[3:] == [
+        "1",
+        "0.0s",
+        "board",
+        "/",
+        "boardfarm_device_boot",
+    ]
+
+
+def test_critical_path() -> None:
+    """Ensure the critical path goes through the steps waited for last."""
+    trace = BootTrace()
+    trace.spans = [
+        Span("boardfarm_server_boot", "hook", "wan", "boot", 0, 10),
+        Span("boardfarm_server_boot", "hook", "acs", "boot", 0, 30),
+        Span("boardfarm_device_boot", "hook", "board", "boot", 10, 60),
+        Span("boardfarm_attached_device_boot", "hook", "lan", "boot", 70, 5),
+        Span("boardfarm_server_configure", "hook", "acs", "boot", 30, 5),
+    ]
+    assert [(step.process, step.start) for step in trace.critical_path()] == [
+        ("wan", 0),
+        ("board", 10),
+        ("lan", 70),
+    ]
@@ -34,3 +34,40 @@ def test_connection_factory_valid_connection_type(mocker: MockerFixture) -> None
         password="",
     )
     assert isinstance(connection, SSHConnection)
+
+
+def test_connection_factory_search_window(mocker: MockerFixture) -> None:
+    """Ensure the search window tunables are applied to the connection.
+
+    :param mocker: pytest mock object
+    :type mocker: MockerFixture
+    """
+    mocker.patch.object(SSHConnection, attribute="__init__", return_value=None)
+    set_search_window = mocker.patch.object(SSHConnection, "set_search_window")
+    connection_factory(
+        "ssh_connection",
+        "connection",
+        username="root",
+        password="",
+        search_window=4096,
+        buffer_size=65536,
+    )
+    set_search_window.assert_called_once_with(4096, 65536)
+
+
+def test_connection_factory_buffer_size_only(mocker: MockerFixture) -> None:
+    """Ensure the buffer size is applied without a search window.
+
+    :param mocker: pytest mock object
+    :type mocker: MockerFixture
+    """
+    mocker.patch.object(SSHConnection, attribute="__init__", return_value=None)
+    set_search_window = mocker.patch.object(SSHConnection, "set_search_window")
+    connection_factory(
+        "ssh_connection",
+        "connection",
+        username="root",
+        password="",
+        buffer_size=65536,
+    )
+    set_search_window.assert_called_once_with(None, 65536)
@@ -0,0 +1,163 @@
+"""Unit tests for the console log store module."""
+
+from __future__ import annotations
+
+import logging
+from importlib.util import find_spec
+from typing import TYPE_CHECKING
+
+import pytest
+
+from boardfarm3.lib.boardfarm_pexpect import BoardfarmPexpect
+from boardfarm3.lib.console_log_store import ConsoleLogStore, ConsoleLogStoreHandler
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pytest_mock import MockerFixture
+
+_ZSTD = pytest.param(
+    "zstd",
+    marks=pytest.mark.skipif(
+        find_spec("zstandard") is None, reason="zstandard is not installed"
+    ),
+)
+
+
+def _write_lines(
+    handler: ConsoleLogStoreHandler, lines: list[tuple[float, str]]
+) -> None:
+    for timestamp, text in lines:
+        record = logging.makeLogRecord({"msg": text, "created": timestamp})
+        handler.handle(record)
+
+
+@pytest.mark.parametrize("codec", ["zlib", _ZSTD])
+def test_console_log_store_seek_by_time(tmp_path: Path, codec: str) -> None:
+    """Ensure lines are found by time across segments.
+
+    :param tmp_path: temporary directory
+    :type tmp_path: Path
+    :param codec: compression codec
+    :type codec: str
+    """
+    path = tmp_path / "board_console.clog"
+    handler = ConsoleLogStoreHandler(path, codec=codec, segment_size=200)
+    _write_lines(handler, [(1000.0 + i, f"line {i}") for i in range(100)])
+    handler.close()
+    store = ConsoleLogStore(path)
+    assert store.codec == codec
+    assert store.time_range == (1000.0, 1099.0)
+    assert len(store._entries) == 10
+    assert [text for _, text in store.read(1042.0, 1045.0)] == [
+        "line 42",
+        "line 43",
+        "line 44",
+        "line 45",
+    ]
+    assert len(list(store.read())) == 100
+
+
+def test_console_log_store_append_and_segment_age(tmp_path: Path) -> None:
+    """Ensure a store is appended to and old lines are not kept in memory.
+
+    :param tmp_path: temporary directory
+    :type tmp_path: Path
+    """
+    path = tmp_path / "board_console.clog"
+    handler = ConsoleLogStoreHandler(path, segment_age=10)
+    _write_lines(handler, [(0.0, "boot"), (5.0, "login"), (20.0, "shell")])
+    # the first segment is written once it spans the segment age
+    assert [text for _, text in ConsoleLogStore(path).read()] == [
+        "boot",
+        "login",
+        "shell",
+    ]
+    handler.close()
+    handler = ConsoleLogStoreHandler(path, codec="zstd")
+    assert handler.codec == ConsoleLogStore(path).codec
+    _write_lines(handler, [(30.0, "reconnected\nsecond line")])
+    handler.close()
+    assert list(ConsoleLogStore(path).read(start=21)) == [
+        (30.0, "reconnected"),
+        (30.0, "second line"),
+    ]
+
+
+def test_console_log_store_drops_unindexed_data(tmp_path: Path) -> None:
+    """Ensure a segment without an index entry is dropped on reopen.
+
+    :param tmp_path: temporary directory
+    :type tmp_path: Path
+    """
+    path = tmp_path / "board_console.clog"
+    handler = ConsoleLogStoreHandler(path)
+    _write_lines(handler, [(1.0, "kept")])
+    handler.close()
+    with path.open("ab") as data_file:
+        data_file.write(b"garbage of a crashed run")
+    handler = ConsoleLogStoreHandler(path)
+    _write_lines(handler, [(2.0, "appended")])
+    handler.close()
+    assert [text for _, text in ConsoleLogStore(path).read()] == ["kept", "appended"]
+
+
+def test_console_log_store_export(tmp_path: Path) -> None:
+    """Ensure a time range is exported as plain text.
+
+    :param tmp_path: temporary directory
+    :type tmp_path: Path
+    """
+    path = tmp_path / "board_console.clog"
+    handler = ConsoleLogStoreHandler(path)
+    _write_lines(handler, [(1000.25, "first"), (1001.5, "second"), (1002.0, "third")])
+    handler.close()
+    export = tmp_path / "export.txt"
+    assert ConsoleLogStore(path).export(export, start=1001, end=1001.5) == 1
+    assert export.read_text().endswith(",500 second\n")
+
+
+def test_console_log_store_invalid(tmp_path: Path) -> None:
+    """Ensure unknown codecs and index files are reported.
+
+    :param tmp_path: temporary directory
+    :type tmp_path: Path
+    """
+    path = tmp_path / "board_console.clog"
+    with pytest.raises(ValueError, match="Unknown console log store codec"):
+        ConsoleLogStoreHandler(path, codec="lzma")
+    path.write_bytes(b"")
+    (tmp_path / "board_console.clog.idx").write_bytes(b"not an index file")
+    with pytest.raises(ValueError, match="not a console log store index"):
+        ConsoleLogStore(path)
+
+
+def test_pexpect_console_log_store(tmp_path: Path, mocker: MockerFixture) -> None:
+    """Ensure the console output is saved in the store.
+
+    :param tmp_path: temporary directory
+    :type tmp_path: Path
+    :param mocker: pytest mock object
+    :type mocker: MockerFixture
+    """
+    mocker.patch.multiple(BoardfarmPexpect, __abstractmethods__=set())
+    mocker.patch.object(
+        logging.getLogger("pexpect.store.console"), "level", logging.DEBUG
+    )
+    session = BoardfarmPexpect(
+        "store.console",
+        "echo",
+        str(tmp_path),
+        ["stored output"],
+        console_log_format="store",
+    )
+    session.expect_exact("stored output")
+    session.close()
+    assert not (tmp_path / "store_console.txt").exists()
+    lines = ConsoleLogStore(tmp_path / "store_console.clog").read()
+    assert [text for _, text in lines] == ["stored output"]
+    # the format of a session does not leak into the next ones
+    other = BoardfarmPexpect("text.console", "echo", str(tmp_path), ["text"])
+    other.close()
+    assert (tmp_path / "text_console.txt").exists()
+    assert not (tmp_path / "text_console.clog").exists()
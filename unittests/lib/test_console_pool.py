@@ -0,0 +1,79 @@
+"""Unit tests for the console pool module."""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from boardfarm3.exceptions import DeviceConnectionError
+from boardfarm3.lib.console_pool import ConsolePool
+
+
+class _Session:
+    """Console session standing in for a logged in BoardfarmPexpect."""
+
+    def __init__(self, index: int) -> None:
+        self.name = f"device.console{index}"
+        self.alive = True
+
+    def isalive(self) -> bool:
+        return self.alive
+
+    def close(self) -> None:
+        self.alive = False
+
+
+def test_console_pool_reuses_released_sessions() -> None:
+    """Ensure released sessions are handed out again instead of new ones."""
+    pool = ConsolePool(_Session, max_size=2)
+    first = pool.acquire()
+    second = pool.acquire()
+    assert first is not second
+    assert second.name == "device.console2"
+    pool.release(first)
+    assert pool.acquire() is first
+    assert pool.size == 2
+
+
+def test_console_pool_exhausted() -> None:
+    """Ensure a full pool waits for a session and then gives up."""
+    pool = ConsolePool(_Session, max_size=1)
+    session = pool.acquire()
+    with pytest.raises(DeviceConnectionError, match="No console session available"):
+        pool.acquire(timeout=0.1)
+    threading.Timer(0.1, pool.release, args=(session,)).start()
+    assert pool.acquire(timeout=5) is session
+
+
+def test_console_pool_disabled() -> None:
+    """Ensure a pool without sessions never opens one."""
+    pool = ConsolePool(_Session, max_size=0)
+    with pytest.raises(DeviceConnectionError):
+        pool.acquire(timeout=0)
+    assert pool.size == 0
+
+
+def test_console_pool_discards_dead_sessions() -> None:
+    """Ensure a session which died while idle is replaced by a new one."""
+    pool = ConsolePool(_Session, max_size=1)
+    with pool.session() as session:
+        pass
+    session.alive = False
+    with pool.session() as new_session:
+        assert new_session is not session
+        assert new_session.name == "device.console2"
+
+
+def test_console_pool_close() -> None:
+    """Ensure closing the pool closes idle and in use sessions."""
+    pool = ConsolePool(_Session, max_size=2)
+    idle = pool.acquire()
+    in_use = pool.acquire()
+    pool.release(idle)
+    pool.close()
+    assert not idle.isalive()
+    assert not in_use.isalive()
+    assert pool.size == 0
+    with pytest.raises(ValueError, match="not in use"):
+        pool.release(in_use)
@@ -1,13 +1,16 @@
 """Unit tests for the Boardfarm device manager module."""
 
 import re
+from argparse import Namespace
 
 import pytest
 from pluggy import PluginManager
 from pytest_mock import MockerFixture
 
-from boardfarm3.devices.base_devices import BoardfarmDevice
+from boardfarm3.devices.base_devices import BoardfarmDevice, LinuxDevice
+from boardfarm3.devices.linux_lan import LinuxLAN
 from boardfarm3.devices.linux_tftp import LinuxTFTP
+from boardfarm3.devices.linux_wan import LinuxWAN
 from boardfarm3.exceptions import DeviceNotFound
 from boardfarm3.lib.device_manager import DeviceManager, get_device_manager
 from boardfarm3.main import get_plugin_manager
@@ -239,3 +242,23 @@ def test_get_device_by_name_missing_raises() -> None:
 
     with pytest.raises(DeviceNotFound):
         dm.get_device_by_name("nope")
+
+
+@pytest.mark.parametrize("device_class", [LinuxLAN, LinuxWAN])
+def test_register_device_not_connected_linux_device(
+    device_manager: DeviceManager,
+    device_class: type[LinuxDevice],
+) -> None:
+    """Ensure reading the properties of a device not connected yet is harmless.
+
+    :param device_manager: device manager instance
+    :type device_manager: DeviceManager
+    :param device_class: linux device class
+    :type device_class: type[LinuxDevice]
+    """
+    device = device_class(
+        {"name": f"unconnected_{device_class.__name__}", "type": "linux"},
+        Namespace(save_console_logs=""),
+    )
+    device_manager.register_device(device)
+    assert get_plugin_manager().get_plugin(device.device_name) is device
@@ -0,0 +1,73 @@
+"""Unit tests for the dmcli module."""
+
+import pytest
+
+from boardfarm3.lib.boardfarm_pexpect import BoardfarmPexpect
+from boardfarm3.lib.dmcli import DMCLIAPI, DMCLIError
+
+# fails to set any Device.Fail parameter, logs the parameters it sets
+_FAKE_DMCLI = (
+    'dmcli() {{ echo "$3" >> {log};'
+    ' case "$3" in Device.Fail*) echo "Execution fail(error code:9005)" ;;'
+    ' *) echo "Execution succeed." ;; esac; }}'
+)
+
+
+@pytest.fixture(name="dmcli")
+def fixture_dmcli(
+    bash_session: BoardfarmPexpect, tmp_path_factory: pytest.TempPathFactory
+) -> tuple[DMCLIAPI, BoardfarmPexpect]:
+    """Get a local bash session with a fake dmcli.
+
+    :param bash_session: local bash session
+    :type bash_session: BoardfarmPexpect
+    :param tmp_path_factory: temporary directory factory
+    :type tmp_path_factory: pytest.TempPathFactory
+    :return: dmcli API of the session and the session
+    :rtype: tuple[DMCLIAPI, BoardfarmPexpect]
+    """
+    log = tmp_path_factory.mktemp("dmcli") / "sets.log"
+    bash_session.execute_framed_command(_FAKE_DMCLI.format(log=log))
+    bash_session.execute_framed_command(f"cd {log.parent}")
+    return DMCLIAPI(bash_session), bash_session
+
+
+def test_spv_batch(dmcli: tuple[DMCLIAPI, BoardfarmPexpect]) -> None:
+    """Ensure every parameter of a batch is set.
+
+    :param dmcli: dmcli API and its session
+    :type dmcli: tuple[DMCLIAPI, BoardfarmPexpect]
+    """
+    api, session = dmcli
+    results = api.SPV_batch([("Device.A", "1", "uint"), ("Device.B", "on", "string")])
+    assert [result.status for result in results] == ["Execution succeed."] * 2
+    assert session.execute_framed_command("cat sets.log")[0].split() == [
+        "Device.A",
+        "Device.B",
+    ]
+
+
+def test_spv_batch_stops_at_first_failure(
+    dmcli: tuple[DMCLIAPI, BoardfarmPexpect],
+) -> None:
+    """Ensure the parameters after a failed one are not set.
+
+    :param dmcli: dmcli API and its session
+    :type dmcli: tuple[DMCLIAPI, BoardfarmPexpect]
+    """
+    api, session = dmcli
+    with pytest.raises(DMCLIError, match="Execution fail"):
+        api.SPV_batch(
+            [
+                ("Device.A", "1", "uint"),
+                ("Device.Fail", "2", "uint"),
+                ("Device.B", "on", "string"),
+            ]
+        )
+    assert session.execute_framed_command("cat sets.log")[0].split() == [
+        "Device.A",
+        "Device.Fail",
+    ]
+    # the next batch is not affected by the failure
+    api.SPV_batch([("Device.C", "3", "uint")])
+    assert session.execute_framed_command("tail -n 1 sets.log")[0] == "Device.C"
@@ -0,0 +1,115 @@
+"""Unit tests for the facts cache module."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from boardfarm3.lib.facts_cache import (
+    DATE,
+    HOSTNAME,
+    INTERFACES,
+    PROCESSES,
+    ROUTES,
+    FactsCache,
+    cached_fact,
+    invalidates_facts,
+)
+
+if TYPE_CHECKING:
+    from pytest_mock import MockerFixture
+
+
+class _Device:
+    """Device answering from a mutable state, counting its queries."""
+
+    def __init__(self) -> None:
+        self.facts_cache = FactsCache()
+        self.addresses = {"eth1": "192.168.1.10"}
+        self.queries = 0
+
+    @cached_fact(INTERFACES)
+    def get_address(self, interface: str) -> str:
+        self.queries += 1
+        return self.addresses[interface]
+
+    @cached_fact(INTERFACES)
+    async def get_address_async(self, interface: str) -> str:
+        self.queries += 1
+        return self.addresses[interface]
+
+    @invalidates_facts(INTERFACES, ROUTES)
+    def set_static_ip(self, interface: str, address: str) -> None:
+        self.addresses[interface] = address
+        # a mutating method verifies its change with a fresh query
+        assert self.get_address(interface) == address
+
+    @invalidates_facts(INTERFACES)
+    async def release_dhcp_async(self, interface: str) -> None:
+        self.addresses[interface] = ""
+
+
+def test_cached_fact_hits_and_misses() -> None:
+    """Ensure repeated questions are answered from the cache."""
+    device = _Device()
+    assert device.get_address("eth1") == "192.168.1.10"
+    assert device.get_address("eth1") == "192.168.1.10"
+    assert device.get_address(interface="eth1") == "192.168.1.10"
+    assert device.queries == 2
+    assert device.facts_cache.hits == 1
+    assert device.facts_cache.misses == 2
+
+
+def test_invalidates_facts() -> None:
+    """Ensure a mutating call invalidates the facts before and after it."""
+    device = _Device()
+    device.get_address("eth1")
+    device.set_static_ip("eth1", "10.0.0.1")
+    assert device.get_address("eth1") == "10.0.0.1"
+    assert device.queries == 3
+    device.facts_cache.invalidate()
+    device.get_address("eth1")
+    assert device.queries == 4
+
+
+@pytest.mark.asyncio
+async def test_cached_fact_async() -> None:
+    """Ensure asyncio getters and mutating methods use the cache."""
+    device = _Device()
+    assert await device.get_address_async("eth1") == "192.168.1.10"
+    assert await device.get_address_async("eth1") == "192.168.1.10"
+    assert device.queries == 1
+    await device.release_dhcp_async("eth1")
+    assert await device.get_address_async("eth1") == ""
+    assert device.queries == 2
+
+
+def test_facts_cache_max_age(mocker: MockerFixture) -> None:
+    """Ensure the facts of a kind with a max age expire.
+
+    :param mocker: pytest mock object
+    :type mocker: MockerFixture
+    """
+    monotonic = mocker.patch("boardfarm3.lib.facts_cache.time.monotonic")
+    monotonic.return_value = 100.0
+    cache = FactsCache()
+    fetch = mocker.Mock(side_effect=[["42"], ["43"]])
+    assert cache.get(PROCESSES, "dropbear", fetch) == ["42"]
+    monotonic.return_value = 101.0
+    assert cache.get(PROCESSES, "dropbear", fetch) == ["42"]
+    monotonic.return_value = 103.0
+    assert cache.get(PROCESSES, "dropbear", fetch) == ["43"]
+    # e.g. a DHCP renewal by the CPE, unknown to the device object
+    assert cache.get(INTERFACES, "eth1", lambda: "leased") == "leased"
+    monotonic.return_value = 106.0
+    assert cache.get(INTERFACES, "eth1", lambda: "renewed") == "renewed"
+    assert cache.get(HOSTNAME, "hostname", lambda: "kept") == "kept"
+    # e.g. an NTP sync by the CPE, the clock offset is reused a bit longer
+    assert cache.get(DATE, "offset", lambda: 3600.0) == 3600.0
+    monotonic.return_value = 130.0
+    assert cache.get(DATE, "offset", lambda: 0.0) == 3600.0
+    monotonic.return_value = 137.0
+    assert cache.get(DATE, "offset", lambda: 0.0) == 0.0
+    monotonic.return_value = 10000.0
+    assert cache.get(HOSTNAME, "hostname", lambda: "refetched") == "kept"
@@ -0,0 +1,194 @@
+"""Unit tests for the file transfer module."""
+
+from __future__ import annotations
+
+import stat
+import subprocess
+from functools import partial
+from typing import TYPE_CHECKING
+
+import pytest
+
+from boardfarm3.exceptions import SCPConnectionError
+from boardfarm3.lib.file_transfer import FileTransfer, run_transfers
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+_CONTENT = bytes(range(256)) * 4096
+
+
+def _run(command: str, timeout: int) -> subprocess.CompletedProcess:
+    return subprocess.run(  # noqa: S602
+        command,
+        shell=True,
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+        check=False,
+    )
+
+
+def _open_channel(command: str) -> subprocess.Popen:
+    return subprocess.Popen(  # noqa: S602
+        command, shell=True, stdin=subprocess.PIPE, stdout=subprocess.PIPE
+    )
+
+
+@pytest.fixture(name="transfer")
+def fixture_transfer() -> FileTransfer:
+    """File transfer service running its commands locally.
+
+    :return: file transfer service
+    """
+    return FileTransfer("device", _run, _open_channel, timeout=30)
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_download_and_upload(
+    transfer: FileTransfer, tmp_path: Path, compress: bool
+) -> None:
+    """Ensure files are copied both ways and verified.
+
+    :param transfer: file transfer service
+    :type transfer: FileTransfer
+    :param tmp_path: temporary directory
+    :type tmp_path: Path
+    :param compress: compress the transferred stream
+    :type compress: bool
+    """
+    remote = tmp_path / "remote.pcap"
+    remote.write_bytes(_CONTENT)
+    result = transfer.download(str(remote), tmp_path / "local.pcap", compress=compress)
+    assert (tmp_path / "local.pcap").read_bytes() == _CONTENT
+    assert (result.size, result.resumed_from) == (len(_CONTENT), 0)
+    transfer.upload(tmp_path / "local.pcap", str(tmp_path / "copy"), compress=compress)
+    assert (tmp_path / "copy").read_bytes() == _CONTENT
+    # like scp, a directory destination keeps the name of the file
+    (tmp_path / "device").mkdir()
+    (tmp_path / "host").mkdir()
+    transfer.upload(tmp_path / "local.pcap", str(tmp_path / "device"))
+    transfer.download(str(tmp_path / "device/local.pcap"), tmp_path / "host")
+    assert (tmp_path / "host/local.pcap").read_bytes() == _CONTENT
+    for directory in ("device", "host"):
+        assert [path.name for path in (tmp_path / directory).iterdir()] == [
+            "local.pcap"
+        ]
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "copy",
+        "device",
+        "host",
+        "local.pcap",
+        "remote.pcap",
+    ]
+
+
+def test_resume(transfer: FileTransfer, tmp_path: Path) -> None:
+    """Ensure interrupted transfers continue from their part file.
+
+    :param transfer: file transfer service
+    :type transfer: FileTransfer
+    :param tmp_path: temporary directory
+    :type tmp_path: Path
+    """
+    remote = tmp_path / "remote.log"
+    remote.write_bytes(_CONTENT)
+    (tmp_path / "local.log.part").write_bytes(_CONTENT[:1000])
+    result = transfer.download(str(remote), tmp_path / "local.log")
+    assert result.resumed_from == 1000
+    assert (tmp_path / "local.log").read_bytes() == _CONTENT
+    (tmp_path / "copy.log.part").write_bytes(_CONTENT[:5000])
+    result = transfer.upload(remote, str(tmp_path / "copy.log"))
+    assert result.resumed_from == 5000
+    assert (tmp_path / "copy.log").read_bytes() == _CONTENT
+
+
+def test_stale_part_restarted(transfer: FileTransfer, tmp_path: Path) -> None:
+    """Ensure a transfer resumed from a stale part file starts again from scratch.
+
+    :param transfer: file transfer service
+    :type transfer: FileTransfer
+    :param tmp_path: temporary directory
+    :type tmp_path: Path
+    """
+    remote = tmp_path / "remote.log"
+    remote.write_bytes(_CONTENT)
+    (tmp_path / "local.log.part").write_bytes(b"corrupted")
+    result = transfer.download(str(remote), tmp_path / "local.log")
+    assert result.resumed_from == 0
+    assert (tmp_path / "local.log").read_bytes() == _CONTENT
+    (tmp_path / "copy.log.part").write_bytes(b"corrupted")
+    result = transfer.upload(remote, str(tmp_path / "copy.log"))
+    assert result.resumed_from == 0
+    assert (tmp_path / "copy.log").read_bytes() == _CONTENT
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_checksum_mismatch(tmp_path: Path) -> None:
+    """Ensure a corrupted transfer is detected and its part file dropped.
+
+    :param tmp_path: temporary directory
+    :type tmp_path: Path
+    """
+
+    def run(command: str, timeout: int) -> subprocess.CompletedProcess:
+        if command.startswith("sha256sum "):
+            return subprocess.CompletedProcess(command, 0, f"{'0' * 64}  file\n", "")
+        return _run(command, timeout)
+
+    transfer = FileTransfer("device", run, _open_channel, timeout=30)
+    remote = tmp_path / "remote.log"
+    remote.write_bytes(_CONTENT)
+    with pytest.raises(SCPConnectionError, match="checksum mismatch"):
+        transfer.download(str(remote), tmp_path / "local.log")
+    with pytest.raises(SCPConnectionError, match="checksum mismatch"):
+        transfer.upload(remote, str(tmp_path / "copy.log"))
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["remote.log"]
+
+
+def test_upload_keeps_the_permissions(transfer: FileTransfer, tmp_path: Path) -> None:
+    """Ensure an uploaded script stays executable.
+
+    :param transfer: file transfer service
+    :type transfer: FileTransfer
+    :param tmp_path: temporary directory
+    :type tmp_path: Path
+    """
+    script = tmp_path / "script.sh"
+    script.write_text("#!/bin/sh\necho ok\n")
+    script.chmod(0o751)
+    transfer.upload(script, str(tmp_path / "copy.sh"))
+    assert stat.S_IMODE((tmp_path / "copy.sh").stat().st_mode) == 0o751
+
+
+def test_run_transfers(transfer: FileTransfer, tmp_path: Path) -> None:
+    """Ensure transfers run side by side and failures are all reported.
+
+    :param transfer: file transfer service
+    :type transfer: FileTransfer
+    :param tmp_path: temporary directory
+    :type tmp_path: Path
+    """
+    for index in range(3):
+        (tmp_path / f"device{index}.log").write_bytes(_CONTENT)
+    results = run_transfers(
+        partial(
+            transfer.download,
+            str(tmp_path / f"device{index}.log"),
+            tmp_path / f"local{index}.log",
+        )
+        for index in range(3)
+    )
+    assert [result.destination for result in results] == [
+        str(tmp_path / f"local{index}.log") for index in range(3)
+    ]
+    with pytest.raises(SCPConnectionError, match="missing.log not found"):
+        run_transfers(
+            [
+                partial(transfer.download, str(tmp_path / "missing.log"), "x"),
+                partial(
+                    transfer.download, str(tmp_path / "device0.log"), tmp_path / "y"
+                ),
+            ]
+        )
+    assert (tmp_path / "y").read_bytes() == _CONTENT
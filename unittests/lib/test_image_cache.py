@@ -0,0 +1,82 @@
+"""Unit tests for the image cache module."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from typing import TYPE_CHECKING
+
+import pytest
+import requests
+
+from boardfarm3.lib.image_cache import ImageCache
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pytest_mock import MockerFixture
+
+_URL = "http://images.example/cpe.bin"
+
+
+def test_local_image_hashed_once(mocker: MockerFixture, tmp_path: Path) -> None:
+    """Ensure a local image is hashed again only once it changed.
+
+    :param mocker: pytest mock object
+    :type mocker: MockerFixture
+    :param tmp_path: temporary directory
+    :type tmp_path: Path
+    """
+    image = tmp_path / "cpe.bin"
+    image.write_bytes(b"firmware v1")
+    uri = f"file://{image}"
+    sha256 = mocker.patch(
+        "boardfarm3.lib.image_cache._sha256",
+        side_effect=lambda path: hashlib.sha256(path.read_bytes()).hexdigest(),
+    )
+    cache = ImageCache(tmp_path / "cache")
+    assert cache.lookup(uri) == hashlib.sha256(b"firmware v1").hexdigest()
+    assert ImageCache(tmp_path / "cache").lookup(uri) == cache.lookup(uri)
+    assert sha256.call_count == 1
+    image.write_bytes(b"firmware v2")
+    os.utime(image, ns=(0, 0))
+    assert cache.lookup(uri) == hashlib.sha256(b"firmware v2").hexdigest()
+    assert cache.lookup(f"file://{tmp_path}/missing.bin") is None
+
+
+@pytest.mark.parametrize(
+    ("headers", "cached"),
+    [
+        ({"ETag": '"v1"'}, True),
+        (
+            {"Last-Modified": "Mon, 12 Oct 2026 10:00:00 GMT", "Content-Length": "9"},
+            True,
+        ),
+        ({"Content-Length": "9"}, False),
+    ],
+)
+def test_remote_image(
+    mocker: MockerFixture, tmp_path: Path, headers: dict[str, str], cached: bool
+) -> None:
+    """Ensure a remote image is known while the server validators are unchanged.
+
+    :param mocker: pytest mock object
+    :type mocker: MockerFixture
+    :param tmp_path: temporary directory
+    :type tmp_path: Path
+    :param headers: response headers of the server
+    :type headers: dict[str, str]
+    :param cached: the digest is expected to be remembered
+    :type cached: bool
+    """
+    head = mocker.patch("boardfarm3.lib.image_cache.requests.head")
+    head.return_value.ok = True
+    head.return_value.headers = headers
+    cache = ImageCache(tmp_path)
+    assert cache.lookup(_URL) is None
+    cache.remember(_URL, "a" * 64)
+    assert cache.lookup(_URL) == ("a" * 64 if cached else None)
+    head.return_value.headers = {**headers, "ETag": '"v2"'}
+    assert cache.lookup(_URL) is None
+    head.side_effect = requests.ConnectionError
+    assert cache.lookup(_URL) is None
@@ -0,0 +1,64 @@
+"""Unit tests for the ip -json parser module."""
+
+from __future__ import annotations
+
+from ipaddress import IPv4Interface, IPv6Interface
+
+from boardfarm3.lib.parsers.ip_json_parser import (
+    is_ip_json_unsupported,
+    parse_ip_json_addr,
+)
+
+_IP_JSON_ADDR = (
+    '[{},{"ifindex":2,"ifname":"eth1","flags":["BROADCAST","MULTICAST","UP",'
+    '"LOWER_UP"],"mtu":1500,"operstate":"UP","link_type":"ether",'
+    '"address":"02:42:ac:11:00:02","addr_info":[{"family":"inet",'
+    '"local":"192.168.1.10","prefixlen":24,"scope":"global"},'
+    '{"family":"inet6","local":"2001:dead:beef::10","prefixlen":64,'
+    '"scope":"global"},{"family":"inet6","local":"fe80::42:acff:fe11:2",'
+    '"prefixlen":64,"scope":"link"}]}]'
+)
+
+
+def test_parse_ip_json_addr() -> None:
+    """Ensure all the facts of the interface are parsed from one output."""
+    facts = parse_ip_json_addr(_IP_JSON_ADDR, "eth1")
+    assert facts is not None
+    assert facts.mac_address == "02:42:ac:11:00:02"
+    assert facts.mtu == 1500
+    assert facts.state == "UP"
+    assert "LOWER_UP" in facts.flags
+    assert facts.ipv4 == [IPv4Interface("192.168.1.10/24")]
+    assert str(facts.ipv4[0].netmask) == "255.255.255.0"
+    assert facts.ipv6 == [
+        IPv6Interface("2001:dead:beef::10/64"),
+        IPv6Interface("fe80::42:acff:fe11:2/64"),
+    ]
+
+
+def test_parse_ip_json_addr_missing_interface() -> None:
+    """Ensure a missing interface has no facts."""
+    facts = parse_ip_json_addr('Device "eth9" does not exist.', "eth9")
+    assert facts is not None
+    assert not facts.ipv4
+    assert not facts.mac_address
+    assert facts.mtu is None
+
+
+def test_parse_ip_json_addr_not_supported() -> None:
+    """Ensure the output of an ip without JSON support is detected."""
+    busybox_output = "ip: invalid option -- 'j'\nBusyBox v1.36.1 multi-call binary."
+    assert parse_ip_json_addr(busybox_output, "eth1") is None
+    assert (
+        parse_ip_json_addr('Option "-json" is unknown, try "ip -help".', "eth1") is None
+    )
+
+
+def test_is_ip_json_unsupported() -> None:
+    """Ensure only a rejected -json option means ip -json is unsupported."""
+    assert is_ip_json_unsupported(255, 'Option "-json" is unknown, try "ip -help".')
+    assert is_ip_json_unsupported(
+        1, "ip: invalid option -- 'j'\nBusyBox v1.36.1 multi-call binary.\n"
+    )
+    assert not is_ip_json_unsupported(1, 'Device "eth9" does not exist.')
+    assert not is_ip_json_unsupported(0, "garbled console output")
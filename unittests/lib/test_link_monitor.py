@@ -0,0 +1,101 @@
+"""Unit tests for the link monitor module."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pexpect
+
+from boardfarm3.lib.boardfarm_pexpect import CommandStream
+from boardfarm3.lib.link_monitor import IP_MONITOR_COMMAND, wait_for_interface
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Generator
+
+    from pytest_mock import MockerFixture
+
+
+class _FakeConsole:
+    """Console replaying canned ``ip monitor`` outputs."""
+
+    def __init__(self, outputs: list[list[str] | int | None]) -> None:
+        # lines of the monitor, exit status of an unsupported monitor or None
+        # for a monitor timing out
+        self.outputs = outputs
+        self.commands: list[str] = []
+
+    def stream_command(
+        self,
+        command: str,
+        stop: Callable[[str], bool] | None = None,
+        timeout: float | None = -1,  # noqa: ARG002
+    ) -> CommandStream:
+        self.commands.append(command)
+        output = self.outputs.pop(0)
+
+        def lines() -> Generator[str, None, int | None]:
+            if output is None:
+                raise pexpect.TIMEOUT(IP_MONITOR_COMMAND)
+            if isinstance(output, int):
+                yield 'Command "monitor" is unknown, try "ip help".'
+                return output
+            for line in output:
+                yield line
+                if stop is not None and stop(line):
+                    return None
+            raise pexpect.TIMEOUT(IP_MONITOR_COMMAND)
+
+        return CommandStream(lines())
+
+
+def test_wait_reacts_to_events(mocker: MockerFixture) -> None:
+    """Ensure the condition is checked again on the events of the interface.
+
+    :param mocker: pytest mock object
+    :type mocker: MockerFixture
+    """
+    condition = mocker.Mock(side_effect=[False, False, True])
+    console = _FakeConsole(
+        [
+            [
+                "3: eth10: <BROADCAST,MULTICAST,UP> mtu 1500",
+                "Deleted 4: eth1@if5: <BROADCAST> mtu 1500",
+            ],
+            ["4: eth1    inet 10.0.0.2/24 scope global eth1"],
+        ]
+    )
+    assert wait_for_interface(console, "eth1", condition, timeout=60)
+    assert console.commands == [IP_MONITOR_COMMAND] * 2
+    assert not console.outputs
+
+
+def test_wait_times_out(mocker: MockerFixture) -> None:
+    """Ensure False is returned once the timeout expired without the condition.
+
+    :param mocker: pytest mock object
+    :type mocker: MockerFixture
+    """
+    monotonic = mocker.patch(
+        "boardfarm3.lib.link_monitor.time.monotonic", side_effect=[0, 5, 15, 25]
+    )
+    condition = mocker.Mock(return_value=False)
+    console = _FakeConsole([None, None])
+    assert not wait_for_interface(console, "eth1", condition, timeout=20)
+    assert condition.call_count == 3
+    assert monotonic.call_count == 4
+
+
+def test_wait_without_monitor(mocker: MockerFixture) -> None:
+    """Ensure devices without ``ip monitor`` are polled.
+
+    :param mocker: pytest mock object
+    :type mocker: MockerFixture
+    """
+    sleep = mocker.patch("boardfarm3.lib.link_monitor.time.sleep")
+    condition = mocker.Mock(side_effect=[False, False, False, True])
+    console = _FakeConsole([1])
+    assert wait_for_interface(
+        console, "eth1", condition, timeout=60, recheck_interval=5
+    )
+    assert console.commands == [IP_MONITOR_COMMAND]
+    assert sleep.call_args_list == [mocker.call(5), mocker.call(5)]
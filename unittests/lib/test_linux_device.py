@@ -0,0 +1,286 @@
+"""Unit tests for the batched updates and boot probes of the linux devices."""
+
+from __future__ import annotations
+
+import asyncio
+import subprocess
+import threading
+from argparse import Namespace
+from typing import TYPE_CHECKING
+
+import pytest
+
+from boardfarm3.devices.base_devices.linux_device import (
+    _IP_BATCH_SIZE,
+    LinuxDevice,
+    _ip_batch_scripts,
+)
+from boardfarm3.devices.linux_lan import LinuxLAN
+from boardfarm3.devices.linux_wan import LinuxWAN
+from boardfarm3.lib.image_cache import image_cache
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+    from unittest.mock import MagicMock
+
+    from pytest_mock import MockerFixture
+
+# prints the batch fed to ``ip`` one command per line
+_FAKE_IP = 'ip() { echo "ip $*"; cat; }; '
+
+
+def _run_bash(script: str) -> str:
+    return subprocess.run(  # noqa: S603
+        ["bash", "--norc", "--noprofile", "-c", script],  # noqa: S607
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+
+def test_ip_batch_scripts_quote_the_commands() -> None:
+    """Ensure the commands reach ``ip -force -batch`` unchanged."""
+    commands = [
+        "route replace 10.0.0.0/8 via 192.168.1.1",
+        "addr add 10.1.0.1/24 dev eth1 label 'eth1:a b'",
+        'link set eth1 alias "$HOME; echo unsafe"',
+    ]
+    (script,) = _ip_batch_scripts(commands)
+    assert _run_bash(_FAKE_IP + script).splitlines() == [
+        "ip -force -batch -",
+        *commands,
+    ]
+
+
+def test_ip_batch_scripts_chunks() -> None:
+    """Ensure a long batch is split in order, each part below the tty limit."""
+    commands = [f"route replace 10.{i}.0.0/16 via 192.168.1.1" for i in range(300)]
+    scripts = _ip_batch_scripts(commands)
+    assert len(scripts) > 1
+    assert all(len(script) < _IP_BATCH_SIZE + 100 for script in scripts)
+    output = _run_bash(_FAKE_IP + "; ".join(scripts)).splitlines()
+    assert [line for line in output if not line.startswith("ip ")] == commands
+
+
+def test_ip_batch_async_uses_the_agent(mocker: MockerFixture) -> None:
+    """Ensure the ``rpc-agent`` option routes the async batch to the agent.
+
+    The blocking agent runs in a thread, not in the event loop.
+
+    :param mocker: pytest mock object
+    :type mocker: MockerFixture
+    """
+    device = LinuxDevice(
+        {"name": "linux", "type": "linux", "options": "rpc-agent"},
+        Namespace(save_console_logs=""),
+    )
+    threads: list[threading.Thread] = []
+
+    def get_agent() -> MagicMock:
+        threads.append(threading.current_thread())
+        agent = mocker.MagicMock()
+        agent.ip_batch.return_value = subprocess.CompletedProcess([], 0, "", "")
+        return agent
+
+    mocker.patch.object(device, "get_agent", side_effect=get_agent)
+    exec_async = mocker.patch.object(device, "exec_async")
+    asyncio.run(device._ip_batch_async(["route replace 10.0.0.0/8 via 10.1.1.1"]))
+    assert threads
+    assert threading.main_thread() not in threads
+    exec_async.assert_not_called()
+
+
+def _lan_with_hosts(mocker: MockerFixture, hosts: str) -> LinuxLAN:
+    lan = LinuxLAN({"name": "lan", "type": "debian_lan"}, Namespace())
+    lan._console = mocker.Mock()
+    lan._console.execute_command.return_value = hosts
+    return lan
+
+
+def _written_hosts(lan: LinuxLAN, tmp_path: Path, mv_fails: bool = False) -> str:
+    """Run the command writing the hosts file against a copy of it.
+
+    :param lan: LAN device whose console sent the command
+    :type lan: LinuxLAN
+    :param tmp_path: temporary directory holding the copy
+    :type tmp_path: Path
+    :param mv_fails: True to fail the rename, like over a bind mount
+    :type mv_fails: bool
+    :return: content of the hosts file once written
+    :rtype: str
+    """
+    hosts = tmp_path / "hosts"
+    hosts.write_text("stale\n")
+    (command,), _ = lan._console.sendline.call_args
+    fake_mv = "mv() { return 1; }\n" if mv_fails else ""
+    _run_bash(fake_mv + command.replace("/etc/hosts", str(hosts)))
+    assert list(tmp_path.iterdir()) == [hosts]
+    return hosts.read_text()
+
+
+def test_update_hosts_entries(mocker: MockerFixture, tmp_path: Path) -> None:
+    """Ensure the entries are added and removed in a single write.
+
+    :param mocker: pytest mock object
+    :type mocker: MockerFixture
+    :param tmp_path: temporary directory
+    :type tmp_path: Path
+    """
+    lan = _lan_with_hosts(
+        mocker, "127.0.0.1    localhost\n10.0.0.2    wan\n10.0.0.3    acs"
+    )
+    lan._update_hosts_entries(
+        add=[("10.0.0.4", "proxy"), ("10.0.0.3", "acs")],
+        remove=[("10.0.0.2", "wan")],
+    )
+    lan._console.sendline.assert_called_once()
+    assert _written_hosts(lan, tmp_path) == (
+        "127.0.0.1    localhost\n10.0.0.3    acs\n10.0.0.4    proxy\n"
+    )
+
+
+def test_update_hosts_entries_bind_mount(mocker: MockerFixture, tmp_path: Path) -> None:
+    """Ensure the hosts file is copied over when it cannot be replaced.
+
+    :param mocker: pytest mock object
+    :type mocker: MockerFixture
+    :param tmp_path: temporary directory
+    :type tmp_path: Path
+    """
+    lan = _lan_with_hosts(mocker, "127.0.0.1    localhost")
+    lan.add_hosts_entry("10.0.0.4", "proxy")
+    assert _written_hosts(lan, tmp_path, mv_fails=True) == (
+        "127.0.0.1    localhost\n10.0.0.4    proxy\n"
+    )
+
+
+def test_update_hosts_entries_unchanged(mocker: MockerFixture) -> None:
+    """Ensure the hosts file is not written when nothing changes.
+
+    :param mocker: pytest mock object
+    :type mocker: MockerFixture
+    """
+    lan = _lan_with_hosts(mocker, "127.0.0.1    localhost\n10.0.0.3    acs")
+    lan._update_hosts_entries(
+        add=[("10.0.0.3", "acs")], remove=[("10.0.0.9", "absent")]
+    )
+    lan.delete_hosts_entry("absent", "10.0.0.9")
+    lan._console.sendline.assert_not_called()
+
+
+_WAN_OUTPUTS = {
+    "ip route show 10.0.0.0/8": "10.0.0.0/8 via 172.25.1.1 dev eth1",
+    "cat /etc/dnsmasq.hosts": (
+        "172.25.1.2    wan.boardfarm.com\n172.25.1.2    wan-ipv4.boardfarm.com\n"
+    ),
+}
+
+
+@pytest.mark.parametrize(
+    ("outputs", "healthy"),
+    [
+        ({}, True),
+        ({"ip route show 10.0.0.0/8": "10.0.0.0/8 via 172.25.1.11 dev eth1"}, False),
+        ({"cat /etc/dnsmasq.hosts": "172.25.1.9    wan.boardfarm.com\n"}, False),
+    ],
+)
+def test_wan_boot_health_probe(
+    mocker: MockerFixture, outputs: dict[str, str], healthy: bool
+) -> None:
+    """Ensure the WAN is booted again when its routes or DNS entries changed.
+
+    :param mocker: pytest mock object
+    :type mocker: MockerFixture
+    :param outputs: output of the commands differing from the booted WAN
+    :type outputs: dict[str, str]
+    :param healthy: True if the WAN does not need to be booted
+    :type healthy: bool
+    """
+    wan = LinuxWAN(
+        {
+            "name": "wan",
+            "type": "debian_wan",
+            "options": "wan-static-ip:172.25.1.2/24,"
+            "static-route:10.0.0.0/8-172.25.1.1,dns-server",
+        },
+        Namespace(),
+    )
+    wan._console = mocker.Mock()
+    wan._console.execute_command.return_value = "BOOT_OK"
+    outputs = _WAN_OUTPUTS | outputs
+    mocker.patch.object(
+        wan,
+        "exec",
+        side_effect=lambda command: subprocess.CompletedProcess(
+            command, 0, outputs[command], ""
+        ),
+    )
+    mocker.patch.object(wan, "is_link_up", return_value=True)
+    mocker.patch.object(wan, "get_process_id", return_value=["42"])
+    device_manager = mocker.Mock()
+    device_manager.get_devices_by_type.return_value = {"wan": wan}
+    assert wan.boot_health_probe(device_manager) is healthy
+
+
+@pytest.fixture
+def tftp_wan(mocker: MockerFixture, tmp_path: Path) -> Iterator[LinuxWAN]:
+    """Get a WAN with a mocked console and an image cache in a temporary dir.
+
+    :param mocker: pytest mock object
+    :type mocker: MockerFixture
+    :param tmp_path: temporary directory
+    :type tmp_path: Path
+    :yield: WAN device
+    :rtype: Iterator[LinuxWAN]
+    """
+    mocker.patch.dict("os.environ", {"BOARDFARM_IMAGE_CACHE": str(tmp_path)})
+    image_cache.cache_clear()
+    wan = LinuxWAN({"name": "wan", "type": "debian_wan"}, Namespace())
+    wan._console = mocker.Mock()
+    wan._console.execute_command.return_value = "'cpe.bin' saved [9/9]"
+    yield wan
+    image_cache.cache_clear()
+
+
+def test_download_image_to_tftpboot_single_head(
+    mocker: MockerFixture, tftp_wan: LinuxWAN
+) -> None:
+    """Ensure the image server is asked for the image validators only once.
+
+    :param mocker: pytest mock object
+    :type mocker: MockerFixture
+    :param tftp_wan: WAN device
+    :type tftp_wan: LinuxWAN
+    """
+    wan = tftp_wan
+    head = mocker.patch("boardfarm3.lib.image_cache.requests.head")
+    head.return_value.ok = True
+    head.return_value.headers = {"ETag": '"v1"'}
+    mocker.patch.object(wan, "_remote_sha256", return_value="a" * 64)
+    assert wan.download_image_to_tftpboot("http://images.example/cpe.bin") == "a" * 10
+    assert head.call_count == 1
+    head.reset_mock()
+    assert wan.download_image_to_tftpboot("http://images.example/cpe.bin") == "a" * 10
+    assert head.call_count == 1
+
+
+def test_copy_local_file_to_tftpboot_keeps_the_name(
+    mocker: MockerFixture, tftp_wan: LinuxWAN, tmp_path: Path
+) -> None:
+    """Ensure a symlinked image is copied under the name of the link.
+
+    :param mocker: pytest mock object
+    :type mocker: MockerFixture
+    :param tftp_wan: WAN device
+    :type tftp_wan: LinuxWAN
+    :param tmp_path: temporary directory
+    :type tmp_path: Path
+    """
+    wan = tftp_wan
+    (tmp_path / "cpe-1.2.3.bin").write_bytes(b"firmware")
+    (tmp_path / "cpe.bin").symlink_to(tmp_path / "cpe-1.2.3.bin")
+    mocker.patch.object(wan, "_remote_sha256", return_value=None)
+    scp = mocker.patch.object(wan, "scp_local_file_to_device")
+    wan.copy_local_file_to_tftpboot(str(tmp_path / "cpe.bin"))
+    scp.assert_called_once_with(str(tmp_path / "cpe.bin"), "/tftpboot")
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import pytest
 
@@ -18,6 +19,9 @@ from boardfarm3.lib.networking import (
     tcpdump_read,
 )
 
+if TYPE_CHECKING:
+    from pytest_mock import MockerFixture
+
 _TEST_DATA = Path(__file__).parents[1] / "testdata"
 
 _DNS_LOOKUP_REPLY = _TEST_DATA / "dns_lookup"
@@ -205,6 +209,28 @@ def test_scp_conn_error_raises() -> None:
         )
 
 
+def test_scp_reuses_multiplexed_connection(mocker: MockerFixture) -> None:
+    """Ensure scp completes without a password prompt over a master connection.
+
+    :param mocker: pytest mock object
+    :type mocker: MockerFixture
+    """
+    console = MyLinuxConsole("")
+    mocker.patch.object(console, "expect", return_value=2)
+    sendline_mock = mocker.patch.object(console, "sendline")
+    scp(
+        console=console,
+        host="10.10.10.10",
+        port="22",
+        username="root",
+        password="bigfoot1",  # noqa: S106
+        src_path="/tmp/file",  # noqa: S108
+        dst_path="/tmp/file",  # noqa: S108
+    )
+    sendline_mock.assert_called_once()
+    assert "-o ControlMaster=auto" in sendline_mock.call_args.args[0]
+
+
 def test_traceroute_host_v4() -> None:
     console = MyLinuxConsole
     host_ip = "10.10.10.10"
@@ -0,0 +1,132 @@
+"""Unit tests for the remote agent module."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pexpect
+import pytest
+
+from boardfarm3.exceptions import RemoteAgentError
+from boardfarm3.lib import remote_agent_helper
+from boardfarm3.lib.remote_agent import (
+    RemoteAgent,
+    _ConsoleChannel,
+    _ExecChannel,
+    install_agent,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from pytest_mock import MockerFixture
+
+_HELPER = remote_agent_helper.__file__
+
+
+def _run_locally(command: str) -> subprocess.CompletedProcess:
+    return subprocess.run(  # noqa: S602
+        command, shell=True, capture_output=True, text=True, check=False
+    )
+
+
+@pytest.fixture(name="agent")
+def fixture_agent() -> Iterator[RemoteAgent]:
+    """Run the agent locally, talking to it through its pipes.
+
+    :yield: client of the agent
+    """
+    process = subprocess.Popen(  # noqa: S603
+        [sys.executable, "-u", _HELPER],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    )
+    agent = RemoteAgent(_ExecChannel(process), timeout=10)
+    yield agent
+    agent.close()
+    assert process.returncode == 0
+
+
+def test_remote_agent_files(agent: RemoteAgent, tmp_path: Path) -> None:
+    """Ensure files are written and read back through the agent.
+
+    :param agent: client of the agent
+    :type agent: RemoteAgent
+    :param tmp_path: temporary directory
+    :type tmp_path: Path
+    """
+    path = str(tmp_path / "script.sh")
+    agent.write_file(path, b"#!/bin/sh\necho from agent\n", mode=0o755)
+    assert agent.read_file(path) == b"#!/bin/sh\necho from agent\n"
+    result = agent.run(path)
+    assert (result.returncode, result.stdout) == (0, "from agent\n")
+    with pytest.raises(RemoteAgentError, match="FileNotFoundError"):
+        agent.read_file(str(tmp_path / "missing"))
+
+
+def test_remote_agent_processes_and_facts(agent: RemoteAgent) -> None:
+    """Ensure processes and interface facts are returned as structured data.
+
+    :param agent: client of the agent
+    :type agent: RemoteAgent
+    """
+    processes = agent.processes(Path(sys.executable).name)
+    assert any(_HELPER in process["cmdline"] for process in processes)
+    assert agent.interface_facts("bf-missing0").mac_address == ""
+    assert agent.call("ping") == remote_agent_helper.VERSION
+    with pytest.raises(RemoteAgentError, match="unknown_method failed"):
+        agent.call("unknown_method")
+    with pytest.raises(RemoteAgentError, match="unexpected keyword"):
+        agent.call("ping", {"verbose": True})
+
+
+def test_remote_agent_over_console(mocker: MockerFixture, tmp_path: Path) -> None:
+    """Ensure the agent is driven through a terminal, long requests included.
+
+    :param mocker: pytest mock object
+    :type mocker: MockerFixture
+    :param tmp_path: temporary directory
+    :type tmp_path: Path
+    """
+    console = pexpect.spawn(
+        sys.executable, ["-u", _HELPER, "--console"], encoding="utf-8"
+    )
+    release = mocker.Mock()
+    agent = RemoteAgent(_ConsoleChannel(console, release), timeout=10)
+    # longer than the 4 KiB line limit of a terminal in canonical mode
+    content = b"0123456789abcdef" * 1024
+    agent.write_file(str(tmp_path / "large"), content)
+    assert agent.read_file(str(tmp_path / "large")) == content
+    agent.close()
+    release.assert_called_once_with(console)
+    assert not console.isalive()
+
+
+def test_install_agent(mocker: MockerFixture, tmp_path: Path) -> None:
+    """Ensure the agent is pushed in chunks and only once.
+
+    :param mocker: pytest mock object
+    :type mocker: MockerFixture
+    :param tmp_path: temporary directory
+    :type tmp_path: Path
+    """
+    run = mocker.Mock(side_effect=_run_locally)
+    path = install_agent(run, directory=str(tmp_path))
+    assert Path(path).read_bytes() == Path(_HELPER).read_bytes()
+    assert run.call_count > 3
+    assert sorted(tmp_path.iterdir()) == [Path(path)]
+    run.reset_mock()
+    assert install_agent(run, directory=str(tmp_path)) == path
+    run.assert_called_once_with(f"test -f {path}")
+
+
+def test_remote_agent_helper_errors() -> None:
+    """Ensure malformed requests are answered with JSON-RPC errors."""
+    assert remote_agent_helper.handle("not json")["error"]["code"] == -32700
+    response = remote_agent_helper.handle('{"id": 3, "method": "nope"}')
+    assert response["id"] == 3
+    assert response["error"]["code"] == -32601
+    assert remote_agent_helper.handle('{"method": "exit"}') is None